@@ -1,11 +1,29 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, g, jsonify, make_response
 from functools import wraps
 from datetime import datetime, timedelta
+import hashlib
+import hmac
+import os
+import archive
+import backup
+import bookingqueue
+import events
+import forecast
+import icsfeed
+import search
+import sharedcache
 import utils
-from models import User
+from models import User, DEFAULT_HOTEL_ID
 
 app = Flask(__name__)
 app.secret_key = 'hotel_booking_secret_key_2025'  # Change this in production
+app.config['SSE_PORT'] = None  # Diisi saat SSE hub dijalankan (lihat start_event_hub)
+
+# Detik yang disarankan ke client saat antrian booking penuh (HTTP 429) / commit lambat (HTTP 503)
+BOOKING_RETRY_AFTER = 2
+
+# Setiap penulisan data dicatat ke journal backup (aktif setelah snapshot pertama)
+backup.install_journal()
 
 # Decorator untuk require login
 def login_required(f):
@@ -32,6 +50,28 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# ==================== PROPERTY ROUTING ====================
+
+@app.before_request
+def bind_hotel():
+    """Arahkan semua operasi utils ke partisi property milik session"""
+    g.hotel_token = utils.set_current_hotel(session.get('hotel_id', DEFAULT_HOTEL_ID))
+
+@app.teardown_request
+def unbind_hotel(exc=None):
+    token = g.pop('hotel_token', None)
+    if token is not None:
+        utils.reset_current_hotel(token)
+
+@app.context_processor
+def inject_hotels():
+    if 'user_id' not in session:
+        return {}
+    return {
+        'current_hotel': utils.get_hotel_by_id(utils.get_current_hotel()),
+        'hotels': utils.load_hotels(),
+    }
+
 # ==================== AUTHENTICATION ROUTES ====================
 
 @app.route('/')
@@ -52,6 +92,7 @@ def login():
             session['username'] = user.username
             session['role'] = user.role
             session['full_name'] = user.full_name
+            session['hotel_id'] = user.hotel_id or DEFAULT_HOTEL_ID
             
             flash(f'Selamat datang, {user.full_name}!', 'success')
             return redirect(url_for('dashboard'))
@@ -81,7 +122,7 @@ def dashboard():
     # Statistics
     total_rooms = len(rooms)
     available_rooms = len([r for r in rooms if r.is_available])
-    total_bookings = len(bookings)
+    total_bookings = len(bookings) + archive.archive_summary()['count']
     active_bookings = len([b for b in bookings if b.status == 'active'])
     
     # User-specific data
@@ -160,13 +201,13 @@ def bookings():
     else:
         all_bookings = utils.get_user_bookings(user.user_id)
     
-    # Get room info for each booking
+    # Get room info for each booking (satu load_rooms, bukan satu lookup per booking)
+    rooms_by_id = {room.room_id: room for room in utils.load_rooms()}
     bookings_with_rooms = []
     for booking in all_bookings:
-        room = utils.get_room_by_id(booking.room_id)
         bookings_with_rooms.append({
             'booking': booking,
-            'room': room
+            'room': rooms_by_id.get(booking.room_id)
         })
     
     # Render different template based on user role
@@ -175,10 +216,21 @@ def bookings():
     else:
         return render_template('bookings_user.html', bookings=bookings_with_rooms, user=user)
 
+@app.route('/bookings/search')
+@admin_required
+def search_bookings():
+    query = request.args.get('q', '').strip()
+    page = request.args.get('page', '1')
+    page = int(page) if page.isdigit() else 1
+    
+    result = search.search_bookings(query, page=page) if query else None
+    return render_template('search.html', query=query, result=result)
+
 @app.route('/bookings/add', methods=['GET', 'POST'])
 @login_required
 def add_booking():
     if request.method == 'POST':
+        room_type = request.form.get('room_type')
         room_id = request.form.get('room_id')
         check_in = request.form.get('check_in')
         check_out = request.form.get('check_out')
@@ -194,32 +246,60 @@ def add_booking():
             flash('Tanggal check-out harus setelah check-in', 'danger')
             return redirect(url_for('add_booking'))
         
-        new_booking = utils.create_booking(
-            user_id=session['user_id'],
-            room_id=room_id,
-            check_in=check_in,
-            check_out=check_out,
-            nights=nights,
-            guest_name=guest_name,
-            guest_phone=guest_phone,
-            username=session['username']
-        )
-        
-        if new_booking:
-            flash(f'Booking berhasil! Total: Rp {new_booking._total_price:,.0f}', 'success')
-            return redirect(url_for('bookings'))
+        # Booking per tipe kamar (kamar fisik dipilih engine assignment);
+        # room_id tetap didukung untuk booking kamar spesifik. Semua booking
+        # lewat antrian writer: beberapa request di-commit sekaligus
+        try:
+            new_booking = bookingqueue.create_booking(
+                user_id=session['user_id'],
+                room_type=room_type or None,
+                room_id=room_id,
+                check_in=check_in,
+                check_out=check_out,
+                nights=nights,
+                guest_name=guest_name,
+                guest_phone=guest_phone,
+                username=session['username']
+            )
+        except bookingqueue.QueueFull:
+            flash('Sedang banyak pemesanan, silakan coba lagi dalam beberapa detik', 'warning')
+            response = make_response(_render_add_booking(), 429)
+            response.headers['Retry-After'] = str(BOOKING_RETRY_AFTER)
+            return response
+        except bookingqueue.CommitTimeout:
+            # Bisa saja tetap tersimpan jika batch-nya sudah sedang di-commit
+            flash('Booking belum selesai diproses, periksa daftar booking sebelum mencoba lagi', 'warning')
+            response = make_response(_render_add_booking(), 503)
+            response.headers['Retry-After'] = str(BOOKING_RETRY_AFTER)
+            return response
+        except Exception:
+            flash('Booking gagal disimpan, silakan coba lagi', 'danger')
         else:
-            flash('Kamar tidak tersedia', 'danger')
-    
-    # Get available rooms
-    available_rooms = [r for r in utils.load_rooms() if r.is_available]
+            if new_booking:
+                flash(f'Booking berhasil! Total: Rp {new_booking._total_price:,.0f}', 'success')
+                return redirect(url_for('bookings'))
+            flash('Kamar tidak tersedia untuk tanggal tersebut', 'danger')
     
+    return _render_add_booking()
+
+def _render_add_booking():
+    """Form booking dengan inventory per tipe kamar untuk malam ini"""
     # Set default dates
     today = datetime.now().date()
     tomorrow = today + timedelta(days=1)
     
+    # Inventory per tipe kamar untuk malam ini
+    room_types = []
+    rooms = utils.load_rooms()
+    for room_type in utils.ROOM_TYPES:
+        sample = next((r for r in rooms if r.get_room_type() == room_type), None)
+        if sample:
+            inventory = utils.room_type_inventory(room_type, str(today), str(tomorrow))
+            room_types.append({'room': sample, 'total': inventory['total'],
+                               'available': inventory['available']})
+    
     return render_template('add_booking.html', 
-                         rooms=available_rooms,
+                         room_types=room_types,
                          today=today,
                          tomorrow=tomorrow)
 
@@ -239,6 +319,9 @@ def edit_booking(booking_id):
     
     if request.method == 'POST':
         status = request.form.get('status')
+        if status not in utils.BOOKING_STATUSES:
+            flash('Status booking tidak valid', 'danger')
+            return redirect(url_for('edit_booking', booking_id=booking_id))
         utils.update_booking_status(booking_id, status, session['username'])
         flash('Booking berhasil diupdate', 'success')
         return redirect(url_for('bookings'))
@@ -340,12 +423,198 @@ def booking_detail(booking_id):
     # Check permission
     user = utils.get_user_by_id(session['user_id'])
     if not user.is_admin() and booking.user_id != user.user_id:
+        utils.log_activity(f"Akses ditolak ke booking {booking_id}", user=session['username'], status="WARNING")
         flash('Anda tidak memiliki akses untuk melihat booking ini', 'danger')
         return redirect(url_for('bookings'))
     
     room = utils.get_room_by_id(booking.room_id)
     return render_template('booking_detail.html', booking=booking, room=room, user=user)
 
+# ==================== GROUP BOOKING ====================
+
+@app.route('/groups')
+@login_required
+def groups():
+    user = utils.get_user_by_id(session['user_id'])
+    all_groups = utils.load_groups() if user.is_admin() else utils.get_user_groups(user.user_id)
+    return render_template('groups.html', groups=all_groups, user=user)
+
+@app.route('/groups/add', methods=['GET', 'POST'])
+@login_required
+def add_group_booking():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        check_in = request.form.get('check_in')
+        check_out = request.form.get('check_out')
+        guest_name = request.form.get('guest_name')
+        guest_phone = request.form.get('guest_phone')
+        room_ids = request.form.getlist('room_ids')
+        room_requests = {}
+        for room_type in utils.ROOM_TYPES:
+            count = request.form.get(f'count_{room_type}', '0') or '0'
+            room_requests[room_type] = int(count) if count.isdigit() else 0
+        
+        # Calculate nights
+        check_in_date = datetime.strptime(check_in, '%Y-%m-%d')
+        check_out_date = datetime.strptime(check_out, '%Y-%m-%d')
+        nights = (check_out_date - check_in_date).days
+        
+        if nights <= 0:
+            flash('Tanggal check-out harus setelah check-in', 'danger')
+            return redirect(url_for('add_group_booking'))
+        
+        group = utils.create_group_booking(
+            user_id=session['user_id'],
+            name=name,
+            room_requests=room_requests,
+            room_ids=room_ids,
+            check_in=check_in,
+            check_out=check_out,
+            nights=nights,
+            guest_name=guest_name,
+            guest_phone=guest_phone,
+            username=session['username']
+        )
+        
+        if group:
+            flash(f'Group booking {group.group_id} berhasil! {len(group.booking_ids)} kamar dipesan', 'success')
+            return redirect(url_for('groups'))
+        else:
+            flash('Sebagian kamar tidak tersedia untuk tanggal tersebut, tidak ada kamar yang dipesan', 'danger')
+    
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+    
+    room_types = []
+    for room_type in utils.ROOM_TYPES:
+        inventory = utils.room_type_inventory(room_type, str(today), str(tomorrow))
+        if inventory['total']:
+            room_types.append(inventory)
+    available_rooms = [r for r in utils.load_rooms() if r.is_available]
+    
+    return render_template('add_group_booking.html',
+                         room_types=room_types,
+                         rooms=available_rooms,
+                         today=today,
+                         tomorrow=tomorrow)
+
+@app.route('/groups/status/<group_id>', methods=['POST'])
+@login_required
+def update_group_status(group_id):
+    group = utils.get_group_by_id(group_id)
+    if not group:
+        flash('Group booking tidak ditemukan', 'danger')
+        return redirect(url_for('groups'))
+    
+    # Admin boleh ubah ke status apa pun, pemilik hanya boleh membatalkan
+    user = utils.get_user_by_id(session['user_id'])
+    status = request.form.get('status')
+    if not user.is_admin() and (group.user_id != user.user_id or status != 'cancelled'):
+        flash('Anda tidak memiliki akses untuk mengubah group booking ini', 'danger')
+        return redirect(url_for('groups'))
+    
+    if status in utils.BOOKING_STATUSES and utils.update_group_status(group_id, status, session['username']):
+        flash(f'Status {len(group.booking_ids)} booking di group {group_id} berhasil diupdate', 'success')
+    else:
+        flash('Gagal mengupdate group booking', 'danger')
+    return redirect(url_for('groups'))
+
+# ==================== PROPERTY MANAGEMENT ====================
+
+@app.route('/hotels/switch/<hotel_id>', methods=['POST'])
+@login_required
+def switch_hotel(hotel_id):
+    user = utils.get_user_by_id(session['user_id'])
+    hotel = utils.get_hotel_by_id(hotel_id)
+    if not hotel or not user.can_access_hotel(hotel_id):
+        flash('Property tidak ditemukan atau akses ditolak', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    session['hotel_id'] = hotel_id
+    flash(f'Property aktif: {hotel.name}', 'info')
+    return redirect(url_for('dashboard'))
+
+@app.route('/hotels', methods=['GET', 'POST'])
+@admin_required
+def hotels():
+    """Rollup statistik lintas property - hanya admin pusat (tanpa hotel_id)"""
+    user = utils.get_user_by_id(session['user_id'])
+    if user.hotel_id is not None:
+        flash('Hanya admin pusat yang dapat melihat semua property', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    if request.method == 'POST':
+        hotel_id = request.form.get('hotel_id', '')
+        name = request.form.get('name', '')
+        address = request.form.get('address', '')
+        
+        if utils.create_hotel(hotel_id, name, address, session['username']):
+            flash(f'Property {name} berhasil ditambahkan', 'success')
+            return redirect(url_for('hotels'))
+        else:
+            flash('ID property sudah ada atau tidak valid (huruf kecil, angka, - dan _)', 'danger')
+    
+    stats = utils.rollup_stats()
+    totals = {
+        key: sum(stat[key] for stat in stats)
+        for key in ('total_rooms', 'available_rooms', 'total_bookings', 'active_bookings', 'revenue')
+    }
+    return render_template('hotels.html', stats=stats, totals=totals)
+
+# ==================== CALENDAR FEED (ICS) ====================
+
+def calendar_token(hotel_id: str, kind: str, name: str) -> str:
+    """Token per feed (HMAC secret key) supaya URL feed bisa dipasang di channel manager tanpa login"""
+    message = f"{hotel_id}/{kind}/{name}".encode('utf-8')
+    return hmac.new(app.secret_key.encode('utf-8'), message, hashlib.sha256).hexdigest()[:32]
+
+@app.template_global()
+def calendar_feed_url(kind: str, name: str) -> str:
+    hotel_id = utils.get_current_hotel()
+    return url_for('calendar_feed', hotel_id=hotel_id, kind=kind, name=name,
+                   token=calendar_token(hotel_id, kind, name), _external=True)
+
+@app.route('/calendar/<hotel_id>/<any(room, type):kind>/<name>.ics')
+def calendar_feed(hotel_id, kind, name):
+    """Feed ICS tanggal terisi per kamar / tipe kamar, ?start=&end= untuk jendela tanggal"""
+    if not hmac.compare_digest(request.args.get('token', ''), calendar_token(hotel_id, kind, name)):
+        return make_response('Token feed tidak valid', 403)
+    try:
+        start, end = icsfeed.parse_window(request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return make_response(str(e), 400)
+    
+    feed = icsfeed.get_feed(kind, name, start, end, hotel_id=hotel_id) if utils.get_hotel_by_id(hotel_id) else None
+    if feed is None:
+        return make_response('Feed tidak ditemukan', 404)
+    
+    body, etag = feed
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        response.mimetype = 'text/calendar'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# ==================== FORECAST ====================
+
+@app.route('/forecast')
+@admin_required
+def forecast_view():
+    """Forecast okupansi per tipe kamar (cache per hari, ?refresh=1 untuk hitung ulang)"""
+    result = forecast.get_forecast(days=request.args.get('days', forecast.DEFAULT_HORIZON, type=int),
+                                   refresh=request.args.get('refresh') == '1')
+    return render_template('forecast.html', forecast=result, horizons=(30, 60, 90, 180))
+
+@app.route('/forecast/json')
+@admin_required
+def forecast_data():
+    result = forecast.get_forecast(days=request.args.get('days', forecast.DEFAULT_HORIZON, type=int),
+                                   refresh=request.args.get('refresh') == '1')
+    return jsonify(result)
+
 # ==================== ADMIN LOGS ====================
 
 @app.route('/logs')
@@ -361,5 +630,28 @@ def view_logs():
     
     return render_template('logs.html', logs=logs)
 
+@app.route('/logs/io')
+@admin_required
+def io_stats():
+    """Antrian booking, cache bersama, dan cache feed ICS (untuk monitoring)"""
+    return jsonify(dict(shared_cache=sharedcache.stats(), booking_queue=bookingqueue.writer.stats(),
+                        calendar_feeds=icsfeed.stats()))
+
+# ==================== LIVE UPDATES (SSE) ====================
+
+def start_event_hub(host: str, port: int) -> events.SSEHub:
+    """Jalankan SSE hub di background thread untuk proses ini"""
+    hub = events.SSEHub(events.session_authenticator(app))
+    events.bus.subscribe(hub.submit)
+    hub.start(host, port)
+    app.config['SSE_PORT'] = port
+    return hub
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Debug hanya aktif jika FLASK_DEBUG=1 (lihat run.bat untuk development)
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    sse_port = int(os.environ.get('SSE_PORT', 5001))
+    # Dengan reloader, hanya proses child yang menjalankan aplikasi
+    if sse_port and (not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        start_event_hub('0.0.0.0', sse_port)
+    app.run(debug=debug, host='0.0.0.0', port=5000)
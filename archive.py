@@ -0,0 +1,265 @@
+"""
+Arsip booking (hot/cold tiering) untuk Sistem Pemesanan Hotel
+
+Booking berstatus completed/cancelled yang check-out-nya lebih lama dari N hari
+dipindah dari bookings.json ke segment JSON-lines ber-gzip yang append-only:
+
+    data/<hotel_id>/archive/seg-000001.jsonl.gz
+    data/<hotel_id>/archive/index.json
+
+index.json menyimpan ringkasan tiap segment (range booking_id, range tanggal,
+user_id, jumlah & pendapatan) sehingga lookup hanya membuka segment yang
+relevan dan laporan tidak perlu dekompresi sama sekali.
+
+Segment + index ditulis sebelum bookings.json, dengan pending.json mencatat
+nama segment dan booking_id-nya. Jika proses mati sebelum bookings.json
+disimpan, record ada di hot dan arsip sekaligus: pembaca men-dedup per
+booking_id (hot menang) dan run berikutnya mengeluarkan segment itu dari index
+sebelum mengarsipkan ulang. Jika proses mati setelah bookings.json disimpan,
+record hanya ada di segment, jadi segment dipertahankan.
+
+Usage:
+    python archive.py --days 90            # arsipkan semua property sekali
+    python archive.py --days 90 --every 24 # jalan terus, tiap 24 jam
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import backup
+import utils
+from models import Booking
+
+CLOSED_STATUSES = ('completed', 'cancelled')
+
+
+def archive_dir(hotel_id: Optional[str] = None) -> str:
+    return os.path.join(utils.hotel_data_dir(hotel_id), 'archive')
+
+
+def _index_file(hotel_id: Optional[str] = None) -> str:
+    return os.path.join(archive_dir(hotel_id), 'index.json')
+
+
+def _pending_file(hotel_id: Optional[str] = None) -> str:
+    return os.path.join(archive_dir(hotel_id), 'pending.json')
+
+
+def booking_id_key(booking_id: str) -> tuple:
+    """Urutan booking ID numerik (B0999 < B1000 < B10000)"""
+    return (len(booking_id), booking_id)
+
+
+def load_index(hotel_id: Optional[str] = None) -> List[Dict]:
+    """Load index segment arsip (memakai cache JSON utils)"""
+    path = _index_file(hotel_id)
+    if not os.path.exists(path):
+        return []
+    try:
+        return utils.read_json(path)
+    except Exception as e:
+        utils.log_activity(f"Error loading archive index: {str(e)}", status="ERROR")
+        return []
+
+
+def max_archived_booking_id(hotel_id: Optional[str] = None) -> Optional[str]:
+    index = load_index(hotel_id)
+    if not index:
+        return None
+    return max((segment['booking_id_max'] for segment in index), key=booking_id_key)
+
+
+def archive_summary(hotel_id: Optional[str] = None) -> Dict:
+    """Ringkasan arsip untuk laporan, dihitung dari index saja"""
+    index = load_index(hotel_id)
+    status_counts: Dict[str, int] = {}
+    for segment in index:
+        for status, count in segment['status_counts'].items():
+            status_counts[status] = status_counts.get(status, 0) + count
+    return {
+        'segments': len(index),
+        'count': sum(segment['count'] for segment in index),
+        'revenue': sum(segment['revenue'] for segment in index),
+        'status_counts': status_counts,
+    }
+
+
+def _read_segment(hotel_id: Optional[str], segment: Dict) -> Iterator[Dict]:
+    path = os.path.join(archive_dir(hotel_id), segment['segment'])
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_archived_records(start: Optional[str] = None, hotel_id: Optional[str] = None) -> Iterator[Dict]:
+    """Record mentah (dict) arsip dengan check-out >= start, untuk pemindaian massal"""
+    for segment in load_index(hotel_id):
+        if start is not None and segment['check_out_max'] < start:
+            continue
+        for record in _read_segment(hotel_id, segment):
+            if start is None or record['check_out'] >= start:
+                yield record
+
+
+def iter_archived_bookings(user_id: Optional[str] = None, booking_id: Optional[str] = None,
+                           start: Optional[str] = None, end: Optional[str] = None,
+                           hotel_id: Optional[str] = None) -> Iterator[Booking]:
+    """Iterate booking arsip; segment yang tidak cocok dengan index dilewati"""
+    for segment in load_index(hotel_id):
+        if user_id is not None and user_id not in segment['user_ids']:
+            continue
+        if booking_id is not None and not (
+                booking_id_key(segment['booking_id_min']) <= booking_id_key(booking_id)
+                <= booking_id_key(segment['booking_id_max'])):
+            continue
+        if start is not None and segment['check_out_max'] < start:
+            continue
+        if end is not None and segment['check_in_min'] > end:
+            continue
+
+        for record in _read_segment(hotel_id, segment):
+            if user_id is not None and record['user_id'] != user_id:
+                continue
+            if booking_id is not None and record['booking_id'] != booking_id:
+                continue
+            if start is not None and record['check_out'] < start:
+                continue
+            if end is not None and record['check_in'] > end:
+                continue
+            yield Booking(**record)
+
+
+def find_archived_booking(booking_id: str, hotel_id: Optional[str] = None) -> Optional[Booking]:
+    return next(iter_archived_bookings(booking_id=booking_id, hotel_id=hotel_id), None)
+
+
+def merge_hot(archived: Iterator, hot: List, key=lambda booking: booking.booking_id) -> Iterator:
+    """Arsip lalu hot, tanpa booking arsip yang masih ada di hot (hot menang)"""
+    hot_ids = {key(booking) for booking in hot}
+    for booking in archived:
+        if key(booking) not in hot_ids:
+            yield booking
+    yield from hot
+
+
+def _next_segment_name(hotel_id: str) -> str:
+    return f"seg-{len(load_index(hotel_id)) + 1:06d}.jsonl.gz"
+
+
+def _write_segment(hotel_id: str, records: List[Dict]) -> Dict:
+    directory = archive_dir(hotel_id)
+    os.makedirs(directory, exist_ok=True)
+    name = _next_segment_name(hotel_id)
+    index = list(load_index(hotel_id))
+
+    path = os.path.join(directory, name)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+    utils.notify_write(path)
+
+    status_counts: Dict[str, int] = {}
+    for record in records:
+        status_counts[record['status']] = status_counts.get(record['status'], 0) + 1
+
+    booking_ids = [record['booking_id'] for record in records]
+    segment = {
+        'segment': name,
+        'count': len(records),
+        'booking_id_min': min(booking_ids, key=booking_id_key),
+        'booking_id_max': max(booking_ids, key=booking_id_key),
+        'check_in_min': min(record['check_in'] for record in records),
+        'check_out_max': max(record['check_out'] for record in records),
+        'user_ids': sorted({record['user_id'] for record in records}),
+        'revenue': sum(record['total_price'] for record in records if record['status'] != 'cancelled'),
+        'status_counts': status_counts,
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    index.append(segment)
+    utils.write_json(_index_file(hotel_id), index)
+    return segment
+
+
+def _recover_pending(hotel_id: str, user: str):
+    """Bereskan segment dari run yang mati sebelum pending.json dikosongkan
+
+    Jika booking segment itu masih ada di hot, bookings.json belum sempat
+    disimpan: hot menang, jadi segment cukup dikeluarkan dari index dan run ini
+    mengarsipkan ulang dari data hot terbaru. Jika sudah tidak ada di hot,
+    bookings.json sudah disimpan dan segment satu-satunya salinan: dipertahankan.
+    """
+    path = _pending_file(hotel_id)
+    pending = utils.read_json(path) if os.path.exists(path) else []
+    if not pending:
+        return
+    hot_ids = {b.booking_id for b in utils.load_bookings()}
+    dropped = {entry['segment'] for entry in pending if hot_ids.intersection(entry['booking_ids'])}
+    index = load_index(hotel_id)
+    kept = [segment for segment in index if segment['segment'] not in dropped]
+    if len(kept) < len(index):
+        utils.write_json(_index_file(hotel_id), kept)
+        utils.log_activity(f"Segment arsip belum selesai dibatalkan: {', '.join(sorted(dropped))} ({hotel_id})",
+                           user=user, status="UPDATE")
+    utils.write_json(path, [])
+
+
+def archive_closed_bookings(days: int = 90, hotel_id: Optional[str] = None,
+                            user: str = "System") -> int:
+    """Pindahkan booking closed yang check-out > days hari lalu ke segment baru"""
+    hotel_id = hotel_id or utils.get_current_hotel()
+    cutoff = (datetime.now().date() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+    with utils.use_hotel(hotel_id), utils.partition_lock(hotel_id):
+        _recover_pending(hotel_id, user)
+        bookings = utils.load_bookings()
+        cold = [b for b in bookings if b.status in CLOSED_STATUSES and b._check_out < cutoff]
+        if not cold:
+            return 0
+
+        # Segment + index ditulis dulu; kalau proses mati sebelum bookings.json
+        # disimpan, record hanya dobel (hot menang saat dibaca), tidak hilang.
+        # pending.json mencatat segment + booking_id-nya supaya run berikutnya
+        # tahu apakah bookings.json sudah disimpan (lihat _recover_pending)
+        os.makedirs(archive_dir(hotel_id), exist_ok=True)
+        utils.write_json(_pending_file(hotel_id), [{'segment': _next_segment_name(hotel_id),
+                                                    'booking_ids': [b.booking_id for b in cold]}])
+        segment = _write_segment(hotel_id, [b.to_dict() for b in cold])
+        cold_ids = {id(b) for b in cold}
+        # Bukan save_bookings: error harus naik supaya pending.json tidak dihapus
+        utils.write_json(utils.bookings_file(), [b.to_dict() for b in bookings if id(b) not in cold_ids])
+        utils.write_json(_pending_file(hotel_id), [])
+
+    utils.log_activity(f"{len(cold)} booking diarsipkan ke {segment['segment']} ({hotel_id})",
+                       user=user, status="UPDATE")
+    return len(cold)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arsipkan booking completed/cancelled yang sudah lama")
+    parser.add_argument('--days', type=int, default=90, help="Umur minimal (hari sejak check-out)")
+    parser.add_argument('--hotel', default=None, help="ID property (default: semua property)")
+    parser.add_argument('--every', type=float, default=0, help="Ulangi tiap N jam (0 = sekali jalan)")
+    args = parser.parse_args(argv)
+    backup.install_journal()
+
+    while True:
+        hotel_ids = [args.hotel] if args.hotel else [h.hotel_id for h in utils.load_hotels()]
+        for hotel_id in hotel_ids:
+            moved = archive_closed_bookings(args.days, hotel_id)
+            print(f"{hotel_id}: {moved} booking diarsipkan")
+        if not args.every:
+            return 0
+        time.sleep(args.every * 3600)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
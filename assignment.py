@@ -0,0 +1,138 @@
+"""
+Engine penempatan booking per tipe kamar ke kamar fisik
+
+Booking dibuat terhadap tipe kamar (Standard/Deluxe/Suite); engine ini yang
+memilih kamar fisiknya dengan interval scheduling:
+
+- Stay diproses urut tanggal check-out, lalu ditaruh di kamar yang celahnya
+  paling pas (check-out tamu sebelumnya paling dekat dengan check-in). Untuk
+  kamar identik strategi ini optimal: jumlah stay yang muat maksimal dan tidak
+  meninggalkan celah satu malam yang tidak terpakai.
+- Stay yang sudah terkunci (tamu sudah check-in, atau booking lama yang
+  memilih kamar spesifik) tetap di kamarnya dan dianggap sebagai blok.
+
+Modul ini murni algoritma (tanpa I/O), dipakai oleh utils.create_booking_by_type.
+"""
+
+from bisect import bisect_right, insort
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+# Sentinel lebih besar dari room_id mana pun, untuk bisect (free_at, room_id)
+_MAX_ROOM_ID = '\uffff'
+
+
+class Stay(NamedTuple):
+    """Satu booking dalam bentuk interval malam [start, end)"""
+    key: Hashable  # identitas booking (booking_id atau kunci lain yang unik)
+    start: int
+    end: int
+    room_id: Optional[str] = None  # diisi jika stay terkunci di kamar tertentu
+
+
+def date_ordinal(value: str) -> int:
+    return datetime.strptime(value, '%Y-%m-%d').toordinal()
+
+
+class _RoomTimeline:
+    """Interval terisi sebuah kamar, terurut (start & end disimpan terpisah untuk bisect)"""
+
+    __slots__ = ('room_id', 'starts', 'ends')
+
+    def __init__(self, room_id: str):
+        self.room_id = room_id
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def gap_before(self, start: int, end: int) -> Optional[int]:
+        """Return end interval sebelumnya jika [start, end) muat, None jika bentrok"""
+        idx = bisect_right(self.starts, start)
+        prev_end = self.ends[idx - 1] if idx else -1
+        if prev_end > start:
+            return None
+        if idx < len(self.starts) and self.starts[idx] < end:
+            return None
+        return prev_end
+
+    def add(self, start: int, end: int):
+        idx = bisect_right(self.starts, start)
+        self.starts.insert(idx, start)
+        self.ends.insert(idx, end)
+
+
+def assign_rooms(stays: Iterable[Stay], room_ids: Iterable[str]) -> Tuple[Dict[Hashable, str], List[Hashable]]:
+    """Tempatkan stay ke kamar; return ({key: room_id}, [key yang tidak muat])"""
+    timelines = {room_id: _RoomTimeline(room_id) for room_id in room_ids}
+    assignment: Dict[Hashable, str] = {}
+    unplaced: List[Hashable] = []
+    floating: List[Stay] = []
+
+    # Stay terkunci dipasang dulu sebagai blok tetap
+    for stay in stays:
+        if stay.room_id is not None and stay.room_id in timelines:
+            timeline = timelines[stay.room_id]
+            if timeline.gap_before(stay.start, stay.end) is None:
+                unplaced.append(stay.key)
+                continue
+            timeline.add(stay.start, stay.end)
+            assignment[stay.key] = stay.room_id
+        else:
+            floating.append(stay)
+
+    # Fast path: kamar tanpa blok di masa depan cukup diwakili waktu kosongnya
+    # (free_at), disimpan terurut supaya best-fit cukup satu bisect
+    horizon = min((stay.start for stay in floating), default=0)
+    free_at: List[Tuple[int, str]] = []
+    blocked: List[_RoomTimeline] = []
+    for timeline in timelines.values():
+        if timeline.starts and timeline.starts[-1] >= horizon:
+            blocked.append(timeline)
+        else:
+            insort(free_at, (timeline.ends[-1] if timeline.ends else -1, timeline.room_id))
+
+    floating.sort(key=lambda stay: (stay.end, stay.start))
+    for stay in floating:
+        best_end = -2
+        best_room = None
+        best_blocked = None
+
+        idx = bisect_right(free_at, (stay.start, _MAX_ROOM_ID)) - 1
+        if idx >= 0:
+            best_end, best_room = free_at[idx]
+
+        for timeline in blocked:
+            prev_end = timeline.gap_before(stay.start, stay.end)
+            if prev_end is not None and prev_end > best_end:
+                best_end, best_room, best_blocked = prev_end, timeline.room_id, timeline
+
+        if best_room is None:
+            unplaced.append(stay.key)
+            continue
+
+        if best_blocked is not None:
+            best_blocked.add(stay.start, stay.end)
+        else:
+            del free_at[idx]
+            insort(free_at, (stay.end, best_room))
+        assignment[stay.key] = best_room
+
+    return assignment, unplaced
+
+
+def nightly_occupancy(stays: Iterable[Stay], start: int, end: int) -> List[int]:
+    """Jumlah stay per malam untuk malam [start, end) - difference array"""
+    nights = end - start
+    delta = [0] * (nights + 1)
+    for stay in stays:
+        lo = max(stay.start, start)
+        hi = min(stay.end, end)
+        if lo < hi:
+            delta[lo - start] += 1
+            delta[hi - start] -= 1
+
+    counts = []
+    running = 0
+    for value in delta[:nights]:
+        running += value
+        counts.append(running)
+    return counts
@@ -0,0 +1,564 @@
+"""
+Backup online (snapshot inkremental + journal) dan point-in-time restore
+
+    backups/objects/ab/ab12...ef.gz      isi file (gzip), dialamatkan dengan sha256
+    backups/snapshots/<id>.json          manifest snapshot: path -> sha + stat
+    backups/journal/<YYYYMMDDHH>.jsonl   mutasi antar snapshot, per record
+
+Snapshot memegang lock semua partisi hanya selama stat/open file yang berubah.
+File data selalu diganti lewat rename atomik, jadi file descriptor yang sudah
+dibuka tetap menunjuk versi saat snapshot; hash dan kompresi berjalan setelah
+lock dilepas. File yang stat-nya sama dengan snapshot sebelumnya tidak dibaca
+ulang, dan isi yang sama hanya disimpan sekali di objects/.
+
+Proses yang memanggil install_journal() mencatat setiap penulisan file data
+ke journal lewat thread background: hanya record yang berubah (upsert/delete
+per ID), atau isi penuh jika perubahan tidak bisa dinyatakan per record.
+Restore = snapshot terakhir sebelum waktu target + replay journal sampai
+waktu target, ditulis ke folder baru (data yang sedang dipakai tidak disentuh).
+
+Usage:
+    python backup.py snapshot                 # sekali
+    python backup.py snapshot --every 60      # tiap 60 menit
+    python backup.py list
+    python backup.py restore --at "2026-10-19 13:00:00" --target data-restored
+    python backup.py prune --keep 7
+"""
+
+import argparse
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import utils
+from models import DEFAULT_HOTEL_ID
+
+try:
+    import fcntl
+except ImportError:  # Windows - append journal tanpa flock
+    fcntl = None
+
+BACKUP_DIR = os.environ.get('BACKUP_DIR', 'backups')
+COPY_CHUNK = 1 << 20
+# Field ID per file data; file lain (atau record tanpa ID) dicatat sebagai isi penuh
+KEY_FIELDS = {
+    'bookings.json': 'booking_id',
+    'rooms.json': 'room_id',
+    'users.json': 'user_id',
+    'hotels.json': 'hotel_id',
+    'groups.json': 'group_id',
+    'index.json': 'segment',
+}
+
+
+def _root(root: Optional[str]) -> str:
+    return root or BACKUP_DIR
+
+
+def _rel(path: str) -> Optional[str]:
+    """Path relatif terhadap folder data (pemisah '/'), None jika di luar data/"""
+    rel = os.path.relpath(path, utils.DATA_DIR)
+    if rel.startswith('..'):
+        return None
+    return rel.replace(os.sep, '/')
+
+
+def _is_data_file(name: str) -> bool:
+    return not (name.startswith('.') or name.endswith('.tmp') or '.bak-' in name)
+
+
+def format_ts(ts: int) -> str:
+    return datetime.fromtimestamp(ts / 1e9).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def parse_ts(value: str) -> int:
+    """'YYYY-MM-DD HH:MM:SS[.ffffff]' (waktu lokal) -> nanodetik epoch"""
+    moment = datetime.fromisoformat(value)
+    return int(moment.timestamp()) * 10 ** 9 + moment.microsecond * 1000
+
+
+# ==================== OBJECT STORE ====================
+
+def _object_path(root: str, sha: str) -> str:
+    return os.path.join(root, 'objects', sha[:2], f"{sha}.gz")
+
+
+def _store_stream(f, root: str) -> Tuple[str, bool]:
+    """Hash + gzip isi file secara streaming, return (sha256, object baru?)"""
+    incoming = os.path.join(root, 'objects', f"incoming.{os.getpid()}.{threading.get_ident()}.tmp")
+    os.makedirs(os.path.dirname(incoming), exist_ok=True)
+    digest = hashlib.sha256()
+    try:
+        with gzip.open(incoming, 'wb', compresslevel=6) as out:
+            for chunk in iter(lambda: f.read(COPY_CHUNK), b''):
+                digest.update(chunk)
+                out.write(chunk)
+        sha = digest.hexdigest()
+        path = _object_path(root, sha)
+        if os.path.exists(path):
+            os.remove(incoming)
+            return sha, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(incoming, path)
+        return sha, True
+    except Exception:
+        if os.path.exists(incoming):
+            os.remove(incoming)
+        raise
+
+
+def store_bytes(content: bytes, root: Optional[str] = None) -> str:
+    root = _root(root)
+    sha = hashlib.sha256(content).hexdigest()
+    path = _object_path(root, sha)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(content, compresslevel=6))
+        os.replace(tmp_path, path)
+    return sha
+
+
+def load_object(sha: str, root: Optional[str] = None) -> bytes:
+    with gzip.open(_object_path(_root(root), sha), 'rb') as f:
+        return f.read()
+
+
+# ==================== DIFF PER RECORD ====================
+
+def _keyed_order(records: list, key: str) -> Iterator[tuple]:
+    """Key (id, urutan kemunculan) tiap record; ID dobel tetap bisa dibedakan"""
+    seen: Counter = Counter()
+    for record in records:
+        yield (record[key], seen[record[key]])
+        seen[record[key]] += 1
+
+
+def apply_diff(records: list, key: str, upsert: list, delete: list) -> list:
+    """Terapkan diff journal: ganti di tempat, hapus, record baru di akhir (idempotent)"""
+    result = list(records)
+    positions = {k: i for i, k in enumerate(_keyed_order(result, key))}
+    removed = set()
+    for record_id, occurrence in delete:
+        index = positions.pop((record_id, occurrence), None)
+        if index is not None:
+            removed.add(index)
+    for record_id, occurrence, record in upsert:
+        index = positions.get((record_id, occurrence))
+        if index is None:
+            positions[(record_id, occurrence)] = len(result)
+            result.append(record)
+        else:
+            result[index] = record
+    return [record for i, record in enumerate(result) if i not in removed]
+
+
+def diff_records(previous: list, data: list, key: str) -> Optional[Dict]:
+    """Record yang berubah antara dua versi file, None jika tidak bisa per record"""
+    try:
+        old = dict(zip(_keyed_order(previous, key), previous))
+        new = dict(zip(_keyed_order(data, key), data))
+    except (KeyError, TypeError):
+        return None
+    upsert = [[k[0], k[1], record] for k, record in new.items() if old.get(k) != record]
+    delete = [[k[0], k[1]] for k in old if k not in new]
+    # Urutan record berubah (bukan hanya ubah/hapus/tambah di akhir): simpan isi penuh
+    if apply_diff(previous, key, upsert, delete) != data:
+        return None
+    return {'upsert': upsert, 'delete': delete}
+
+
+# ==================== JOURNAL ====================
+
+def _journal_file(root: str, ts: int) -> str:
+    return os.path.join(root, 'journal', f"{datetime.fromtimestamp(ts / 1e9):%Y%m%d%H}.jsonl")
+
+
+def journal_entry(ts: int, path: str, previous: Optional[list], data: Optional[list],
+                  root: Optional[str] = None) -> Optional[Dict]:
+    root = _root(root)
+    rel = _rel(path)
+    if rel is None:
+        return None
+    entry = {'ts': ts, 'file': rel}
+    key = KEY_FIELDS.get(os.path.basename(rel))
+    if key and previous is not None and data is not None:
+        diff = diff_records(previous, data, key)
+        # Diff yang menyentuh sebagian besar record lebih hemat disimpan penuh (gzip + dedup)
+        if diff is not None and len(diff['upsert']) + len(diff['delete']) <= len(data) // 2:
+            entry.update(op='diff', key=key, count=len(data), **diff)
+            return entry
+
+    # Isi penuh: file baru, isi lama tidak diketahui, atau file bukan JSON list
+    if data is not None:
+        sha = store_bytes(json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8'), root)
+    else:
+        try:
+            with open(path, 'rb') as f:
+                sha, _ = _store_stream(f, root)
+        except FileNotFoundError:
+            return None
+    entry.update(op='full', sha=sha)
+    return entry
+
+
+def append_journal(entry: Dict, root: Optional[str] = None):
+    """Append satu baris journal; flock supaya baris dari worker prefork tidak bercampur"""
+    path = _journal_file(_root(root), entry['ts'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+    with open(path, 'ab') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(line)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def iter_journal(start: int, end: int, root: Optional[str] = None) -> Iterator[Dict]:
+    """Entry journal dengan start < ts <= end, urut waktu"""
+    directory = os.path.join(_root(root), 'journal')
+    if not os.path.isdir(directory):
+        return
+    first_hour = f"{datetime.fromtimestamp(start / 1e9):%Y%m%d%H}"
+    last_hour = f"{datetime.fromtimestamp(end / 1e9):%Y%m%d%H}"
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.jsonl') or not first_hour <= name[:-6] <= last_hour:
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # baris terakhir yang terpotong saat proses mati
+                if start < entry['ts'] <= end:
+                    entries.append(entry)
+    # Worker prefork menulis journal masing-masing secara async: urutkan dengan ts
+    entries.sort(key=lambda entry: entry['ts'])
+    yield from entries
+
+
+class Journal:
+    """Listener utils.subscribe_writes: catat penulisan ke journal lewat thread background
+
+    Di jalur request hanya ada queue.put; diff, kompresi, dan append ke file
+    dikerjakan thread background. Journal hanya ditulis jika backup sudah
+    diaktifkan (sudah ada snapshot di BACKUP_DIR).
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        # Setelah fork, thread milik parent tidak ikut; mulai lagi dengan queue kosong
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def record(self, path: str, previous: Optional[list], data: Optional[list]):
+        # ts diambil di sini: masih di dalam lock penulis, jadi urut per file
+        self._queue.put((time.time_ns(), path, previous, data))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='backup-journal', daemon=True)
+                    self._thread.start()
+
+    def flush(self):
+        """Tunggu sampai semua penulisan yang tercatat sudah masuk journal"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            ts, path, previous, data = self._queue.get()
+            try:
+                root = BACKUP_DIR
+                if os.path.isdir(os.path.join(root, 'snapshots')):
+                    entry = journal_entry(ts, path, previous, data, root)
+                    if entry is not None:
+                        append_journal(entry, root)
+            except Exception as e:
+                utils.log_activity(f"Error journal backup {path}: {str(e)}", status="ERROR")
+            finally:
+                self._queue.task_done()
+
+
+journal = Journal()
+_journal_installed = False
+
+
+def install_journal():
+    """Catat semua penulisan file data di proses ini ke journal backup (idempotent)"""
+    global _journal_installed
+    if _journal_installed:
+        return
+    _journal_installed = True
+    utils.subscribe_writes(journal.record)
+    atexit.register(journal.flush)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=journal._reset)
+
+
+# ==================== SNAPSHOT ====================
+
+def list_snapshots(root: Optional[str] = None) -> List[Dict]:
+    directory = os.path.join(_root(root), 'snapshots')
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                snapshots.append(json.load(f))
+    return snapshots
+
+
+def _data_files() -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(utils.DATA_DIR):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if _is_data_file(name):
+                yield os.path.join(dirpath, name)
+
+
+def take_snapshot(root: Optional[str] = None) -> Dict:
+    """Snapshot konsisten semua property; lock hanya dipegang selama stat/open"""
+    root = _root(root)
+    started = time.perf_counter()
+    snapshots = list_snapshots(root)
+    previous = snapshots[-1]['files'] if snapshots else {}
+    hotel_ids = sorted({hotel.hotel_id for hotel in utils.load_hotels()} | {DEFAULT_HOTEL_ID})
+
+    files: Dict[str, Dict] = {}
+    changed: List[Tuple[str, object]] = []
+    with ExitStack() as stack:
+        # Urutan lock tetap (sorted) supaya tidak deadlock dengan snapshot lain
+        for hotel_id in hotel_ids:
+            stack.enter_context(utils.partition_lock(hotel_id))
+        locked = time.perf_counter()
+        ts = time.time_ns()
+        for path in _data_files():
+            rel = _rel(path)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            known = previous.get(rel)
+            if known and (known['mtime_ns'], known['size'], known['ino']) == \
+                    (stat.st_mtime_ns, stat.st_size, stat.st_ino):
+                files[rel] = known
+                continue
+            try:
+                changed.append((rel, open(path, 'rb')))
+            except FileNotFoundError:
+                continue
+        lock_ms = (time.perf_counter() - locked) * 1000
+
+    new_objects = 0
+    new_bytes = 0
+    for rel, f in changed:
+        with f:
+            stat = os.fstat(f.fileno())
+            sha, stored = _store_stream(f, root)
+        files[rel] = {'sha': sha, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'ino': stat.st_ino}
+        if stored:
+            new_objects += 1
+            new_bytes += os.path.getsize(_object_path(root, sha))
+
+    snapshot_id = f"{datetime.fromtimestamp(ts / 1e9):%Y%m%d-%H%M%S-%f}"
+    manifest = {
+        'snapshot_id': snapshot_id,
+        'ts': ts,
+        'created_at': format_ts(ts),
+        'files': files,
+        'stats': {
+            'files': len(files),
+            'changed': len(changed),
+            'new_objects': new_objects,
+            'new_bytes': new_bytes,
+            'lock_ms': round(lock_ms, 2),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+    directory = os.path.join(root, 'snapshots')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{snapshot_id}.json")
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(f"{path}.tmp", path)
+    return manifest
+
+
+# ==================== RESTORE ====================
+
+def restore(at: int, target: str, root: Optional[str] = None) -> Dict:
+    """Tulis isi data/ pada waktu `at` (nanodetik epoch) ke folder target"""
+    root = _root(root)
+    started = time.perf_counter()
+    snapshot = None
+    for candidate in list_snapshots(root):
+        if candidate['ts'] <= at:
+            snapshot = candidate
+    if snapshot is None:
+        raise ValueError(f"Tidak ada snapshot sebelum {format_ts(at)}")
+    if os.path.exists(target) and os.listdir(target):
+        raise ValueError(f"Folder target {target} sudah berisi file")
+
+    # rel -> ('blob', sha) selama belum disentuh journal, ('records', list) setelahnya
+    state: Dict[str, Tuple[str, object]] = {rel: ('blob', info['sha'])
+                                            for rel, info in snapshot['files'].items()}
+    replayed = 0
+    for entry in iter_journal(snapshot['ts'], at, root):
+        rel = entry['file']
+        if entry['op'] == 'full':
+            state[rel] = ('blob', entry['sha'])
+        else:
+            kind, value = state.get(rel, ('records', []))
+            records = json.loads(load_object(value, root)) if kind == 'blob' else value
+            state[rel] = ('records', apply_diff(records, entry['key'], entry['upsert'], entry['delete']))
+        replayed += 1
+
+    for rel, (kind, value) in state.items():
+        path = os.path.join(target, *rel.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if kind == 'blob':
+            with gzip.open(_object_path(root, value), 'rb') as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, indent=4, ensure_ascii=False)
+
+    return {
+        'snapshot_id': snapshot['snapshot_id'],
+        'journal_entries': replayed,
+        'files': len(state),
+        'target': target,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+# ==================== PRUNE ====================
+
+def prune(keep: int, root: Optional[str] = None) -> Dict[str, int]:
+    """Simpan `keep` snapshot terbaru; buang snapshot, journal, dan object yang tidak terpakai"""
+    root = _root(root)
+    snapshots = list_snapshots(root)
+    if keep < 1 or len(snapshots) <= keep:
+        return {'snapshots': 0, 'journal_files': 0, 'objects': 0}
+    removed_snapshots = snapshots[:-keep]
+    kept = snapshots[-keep:]
+    for snapshot in removed_snapshots:
+        os.remove(os.path.join(root, 'snapshots', f"{snapshot['snapshot_id']}.json"))
+
+    # Journal sebelum jam snapshot tertua yang disimpan tidak bisa di-replay lagi
+    oldest_hour = f"{datetime.fromtimestamp(kept[0]['ts'] / 1e9):%Y%m%d%H}"
+    journal_dir = os.path.join(root, 'journal')
+    removed_journal = 0
+    referenced = {info['sha'] for snapshot in kept for info in snapshot['files'].values()}
+    if os.path.isdir(journal_dir):
+        for name in os.listdir(journal_dir):
+            if name.endswith('.jsonl') and name[:-6] < oldest_hour:
+                os.remove(os.path.join(journal_dir, name))
+                removed_journal += 1
+    for entry in iter_journal(0, time.time_ns(), root):
+        if entry['op'] == 'full':
+            referenced.add(entry['sha'])
+
+    removed_objects = 0
+    objects_dir = os.path.join(root, 'objects')
+    for dirpath, _, filenames in os.walk(objects_dir):
+        for name in filenames:
+            if name.endswith('.gz') and name[:-3] not in referenced:
+                os.remove(os.path.join(dirpath, name))
+                removed_objects += 1
+    return {'snapshots': len(removed_snapshots), 'journal_files': removed_journal,
+            'objects': removed_objects}
+
+
+# ==================== MAIN ====================
+
+def _print_snapshot(manifest: Dict):
+    stats = manifest['stats']
+    print(f"Snapshot {manifest['snapshot_id']}: {stats['files']} file, {stats['changed']} berubah, "
+          f"{stats['new_objects']} object baru ({stats['new_bytes'] / 1024:,.0f} KB), "
+          f"lock {stats['lock_ms']:.2f} ms, total {stats['duration_ms']:,.0f} ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backup online & point-in-time restore data JSON")
+    parser.add_argument('--root', default=None, help=f"Folder backup (default: {BACKUP_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    snapshot_cmd = commands.add_parser('snapshot', help="Ambil snapshot")
+    snapshot_cmd.add_argument('--every', type=float, default=0, help="Ulangi tiap N menit (0 = sekali)")
+    commands.add_parser('list', help="Daftar snapshot dan journal")
+    restore_cmd = commands.add_parser('restore', help="Restore ke waktu tertentu")
+    restore_cmd.add_argument('--at', default=None, help="Waktu target 'YYYY-MM-DD HH:MM:SS' (default: sekarang)")
+    restore_cmd.add_argument('--target', default=None, help="Folder hasil (default: data-restored-<waktu>)")
+    prune_cmd = commands.add_parser('prune', help="Hapus snapshot lama")
+    prune_cmd.add_argument('--keep', type=int, default=7, help="Jumlah snapshot terbaru yang disimpan")
+    args = parser.parse_args(argv)
+    root = _root(args.root)
+
+    if args.command == 'snapshot':
+        while True:
+            manifest = take_snapshot(root)
+            _print_snapshot(manifest)
+            utils.log_activity(f"Snapshot backup {manifest['snapshot_id']} dibuat", status="CREATE")
+            if not args.every:
+                return 0
+            time.sleep(args.every * 60)
+
+    if args.command == 'list':
+        snapshots = list_snapshots(root)
+        if not snapshots:
+            print(f"Belum ada snapshot di {root}")
+            return 0
+        for manifest in snapshots:
+            print(f"{manifest['created_at']}  ", end='')
+            _print_snapshot(manifest)
+        entries = list(iter_journal(snapshots[0]['ts'], time.time_ns(), root))
+        if entries:
+            print(f"Journal: {len(entries)} mutasi, {format_ts(entries[0]['ts'])} .. {format_ts(entries[-1]['ts'])}")
+        return 0
+
+    if args.command == 'restore':
+        at = parse_ts(args.at) if args.at else time.time_ns()
+        target = args.target or f"data-restored-{datetime.fromtimestamp(at / 1e9):%Y%m%d-%H%M%S}"
+        try:
+            result = restore(at, target, root)
+        except ValueError as e:
+            print(f"Restore gagal: {e}")
+            return 1
+        print(f"Restore ke {format_ts(at)}: snapshot {result['snapshot_id']} + {result['journal_entries']} "
+              f"mutasi journal, {result['files']} file -> {result['target']} ({result['duration_ms']:,.0f} ms)")
+        print(f"Untuk memakai hasil restore: hentikan aplikasi, lalu ganti folder {utils.DATA_DIR}/ "
+              f"dengan {result['target']}/")
+        utils.log_activity(f"Restore backup ke {format_ts(at)} -> {result['target']}", status="INFO")
+        return 0
+
+    removed = prune(args.keep, root)
+    print(f"Dihapus: {removed['snapshots']} snapshot, {removed['journal_files']} file journal, "
+          f"{removed['objects']} object")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Benchmark engine assignment kamar (assignment.assign_rooms)
+
+Mensimulasikan satu tipe kamar dengan ratusan kamar fisik dan ribuan booking
+dalam satu jendela tanggal, sebagian sudah terkunci (tamu sudah check-in).
+Sebagian kamar bisa punya blok di tengah jendela (booking kamar spesifik,
+jalur timeline terblok) atau ditutup admin (tidak ikut kandidat, seperti
+utils._closed_rooms). Waktu per run = biaya yang dibayar setiap
+create/modify booking.
+
+Usage:
+    python bench_assignment.py
+"""
+
+import random
+import time
+
+from assignment import Stay, assign_rooms, nightly_occupancy
+
+
+def generate(rooms: int, stays: int, window: int, pinned_ratio: float, blocked_ratio: float = 0.0,
+             closed_ratio: float = 0.0, seed: int = 42):
+    rng = random.Random(seed)
+    room_ids = [f"R{i:04d}" for i in range(rooms)]
+    blocked = rooms - int(rooms * blocked_ratio)
+    result = []
+    # Blok kamar spesifik di tengah jendela: kamar ini lewat jalur timeline terblok
+    for room_id in room_ids[blocked:]:
+        start = 1 + rng.randrange(window)
+        result.append(Stay(room_id, start, start + rng.choice([2, 3, 7]), room_id))
+    pinned = 0
+    for i in range(stays):
+        # Malam 0 = hari ini: stay yang sudah check-in terkunci di kamarnya
+        if pinned < blocked and rng.random() < pinned_ratio:
+            result.append(Stay(i, 0, rng.choice([1, 2, 3]), room_ids[pinned]))
+            pinned += 1
+            continue
+        start = 1 + rng.randrange(window)
+        end = start + rng.choice([1, 1, 2, 2, 3, 4, 7])
+        result.append(Stay(i, start, end))
+    # Kamar ditutup admin (tanpa stay aktif) tidak diberikan ke engine
+    closed = set(rng.sample(room_ids[pinned:blocked], min(int(rooms * closed_ratio), blocked - pinned)))
+    return result, [room_id for room_id in room_ids if room_id not in closed]
+
+
+def bench(rooms: int, stays: int, window: int, pinned_ratio: float, blocked_ratio: float = 0.0,
+          closed_ratio: float = 0.0, repeat: int = 5):
+    data, room_ids = generate(rooms, stays, window, pinned_ratio, blocked_ratio, closed_ratio)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        assignment, unplaced = assign_rooms(data, room_ids)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    peak = max(nightly_occupancy(data, 0, window + 7))
+    print(f"{rooms:>5} kamar {stays:>6} stay {window:>4} malam pinned {pinned_ratio:>4.0%}  "
+          f"blok {blocked_ratio:>4.0%} tutup {closed_ratio:>4.0%}  "
+          f"best {min(timings):7.1f} ms  placed {len(assignment):>6}  unplaced {len(unplaced):>5}  "
+          f"peak/night {peak}")
+
+
+if __name__ == '__main__':
+    for args in [(50, 1000, 30, 0.0), (200, 5000, 60, 0.0), (200, 5000, 60, 0.1),
+                 (500, 20000, 90, 0.0), (500, 20000, 90, 0.1),
+                 (200, 5000, 60, 0.1, 0.2, 0.1), (500, 20000, 90, 0.1, 0.2, 0.1)]:
+        bench(*args)
@@ -0,0 +1,104 @@
+"""
+Benchmark forecast okupansi: 5 tahun histori booking
+
+Membuat rooms.json (N kamar, 3 tipe) dan bookings.json sintetis dengan
+okupansi ~60% sejak 5 tahun lalu sampai 180 hari ke depan (lead time acak,
+musiman per bulan, sebagian cancelled), lalu mengukur forecast.compute():
+cold (termasuk parse bookings.json) dan warm (parse sudah di-cache), serta
+get_forecast() yang sudah ter-cache untuk hari ini.
+
+Usage:
+    python bench_forecast.py [jumlah_kamar]
+"""
+
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import forecast
+import utils
+
+TYPES = ('Standard', 'Deluxe', 'Suite')
+
+
+def generate(rooms: int, seed: int = 42) -> int:
+    rng = random.Random(seed)
+    today = date.today()
+    with open(utils.ROOMS_FILE, 'w', encoding='utf-8') as f:
+        json.dump([{'room_id': f"R{i:04d}", 'room_number': str(100 + i), 'room_type': TYPES[i % len(TYPES)],
+                    'capacity': 2, 'base_price': 500000, 'is_available': True, 'amenities': []}
+                   for i in range(rooms)], f)
+
+    records = []
+    first = today - timedelta(days=5 * 365)
+    for room in range(rooms):
+        night = first + timedelta(days=rng.randrange(5))
+        while night < today + timedelta(days=forecast.MAX_HORIZON):
+            nights = rng.randint(1, 4)
+            created = night - timedelta(days=int(rng.expovariate(1 / 25)))
+            if created <= today:
+                records.append({
+                    'booking_id': f"B{len(records) + 1:07d}", 'user_id': f"U{rng.randrange(5000):04d}",
+                    'room_id': f"R{room:04d}", 'check_in': night.isoformat(),
+                    'check_out': (night + timedelta(days=nights)).isoformat(), 'nights': nights,
+                    'total_price': 500000 * nights, 'guest_name': 'Budi Santoso', 'guest_phone': '0812',
+                    'status': 'cancelled' if rng.random() < 0.08 else 'completed' if night < today else 'active',
+                    'created_at': f"{created.isoformat()} 10:00:00", 'hotel_id': 'main',
+                })
+            # Celah antar booking lebih panjang di musim sepi (okupansi ~60%)
+            season = 1.6 + 0.6 * math.cos(2 * math.pi * night.month / 12)
+            night += timedelta(days=nights + int(rng.expovariate(1 / season)))
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    return len(records)
+
+
+def main():
+    rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    scratch = tempfile.mkdtemp(prefix='bench-forecast-')
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        os.makedirs('data')
+        count = generate(rooms)
+        size = os.path.getsize(utils.BOOKINGS_FILE) / 1024 / 1024
+        print(f"{rooms} kamar, {count:,} booking (5 tahun + 180 hari), bookings.json {size:.0f} MB\n")
+
+        utils._json_cache.clear()
+        started = time.perf_counter()
+        result = forecast.compute()
+        cold = (time.perf_counter() - started) * 1000
+
+        warm = []
+        for _ in range(5):
+            started = time.perf_counter()
+            forecast.compute()
+            warm.append((time.perf_counter() - started) * 1000)
+
+        forecast.get_forecast()
+        started = time.perf_counter()
+        for _ in range(100):
+            forecast.get_forecast(days=90)
+        cached = (time.perf_counter() - started) * 10
+
+        print(f"{'compute cold (parse JSON)':<28} {cold:>8.1f} ms")
+        print(f"{'compute warm (median)':<28} {sorted(warm)[2]:>8.1f} ms")
+        print(f"{'get_forecast ter-cache':<28} {cached:>8.2f} ms")
+        print()
+        for name, data in forecast.view(result, 90)['room_types'].items():
+            summary = data['summary']
+            print(f"{name:<10} {data['capacity']:>4} kamar  rata-rata {summary['avg_occupancy_pct']:>5}%  "
+                  f"puncak {summary['peak_date']} {summary['peak_occupancy_pct']}%")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
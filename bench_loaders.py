@@ -0,0 +1,119 @@
+"""
+Benchmark loader booking: load_bookings() (json.load + semua object) vs
+iter_bookings() (parse inkremental + filter sebelum object dibuat)
+
+Membuat bookings.json sintetis di direktori temp lalu mengukur latency dan
+peak memory (tracemalloc) untuk point lookup, filter user, dan filter
+status + tanggal. Cache parse utils dikosongkan sebelum tiap pengukuran
+supaya keduanya membaca dari disk.
+
+Usage:
+    python bench_loaders.py [jumlah_booking]
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+import utils
+
+
+def generate(path: str, count: int, seed: int = 42):
+    rng = random.Random(seed)
+    first_day = date(2024, 1, 1).toordinal()
+    records = []
+    for i in range(count):
+        day = first_day + rng.randrange(1000)
+        nights = rng.randint(1, 5)
+        records.append({
+            'booking_id': f"B{i + 1:07d}", 'user_id': f"U{rng.randrange(5000):04d}",
+            'room_id': f"R{rng.randrange(200):03d}",
+            'check_in': date.fromordinal(day).isoformat(),
+            'check_out': date.fromordinal(day + nights).isoformat(),
+            'nights': nights, 'total_price': 500000 * nights, 'guest_name': 'Budi Santoso',
+            'guest_phone': '081234567890', 'status': rng.choice(['active', 'completed', 'completed', 'cancelled']),
+            'created_at': '2024-01-01 10:00:00', 'hotel_id': 'main',
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+
+
+def booking_ids(result):
+    if isinstance(result, list):
+        return [booking.booking_id for booking in result]
+    return result.booking_id if result else None
+
+
+def measure(fn):
+    """Return (hasil, ms, peak MB); cache JSON dikosongkan dulu agar sama-sama cold"""
+    utils._json_cache.clear()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+
+    utils._json_cache.clear()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    scratch = tempfile.mkdtemp(prefix='bench-loaders-')
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        os.makedirs('data')
+        generate(utils.BOOKINGS_FILE, count)
+        size = os.path.getsize(utils.BOOKINGS_FILE) / 1024 / 1024
+        print(f"bookings.json: {count:,} booking, {size:.0f} MB\n")
+
+        first, middle, last = 'B0000001', f"B{count // 2:07d}", f"B{count:07d}"
+        cases = [
+            ('ID pertama',
+             lambda: next((b for b in utils.load_bookings() if b.booking_id == first), None),
+             lambda: next(utils.iter_bookings(booking_id=first), None)),
+            ('ID tengah',
+             lambda: next((b for b in utils.load_bookings() if b.booking_id == middle), None),
+             lambda: next(utils.iter_bookings(booking_id=middle), None)),
+            ('ID terakhir',
+             lambda: next((b for b in utils.load_bookings() if b.booking_id == last), None),
+             lambda: next(utils.iter_bookings(booking_id=last), None)),
+            ('booking 1 user',
+             lambda: [b for b in utils.load_bookings() if b.user_id == 'U0042'],
+             lambda: list(utils.iter_bookings(user_id='U0042'))),
+            ('aktif 1 bulan',
+             lambda: [b for b in utils.load_bookings() if b.status == 'active'
+                      and b._check_out >= '2025-03-01' and b._check_in <= '2025-03-31'],
+             lambda: list(utils.iter_bookings(status='active', start='2025-03-01', end='2025-03-31'))),
+        ]
+
+        print(f"{'query':<16} {'load_bookings':>22} {'iter_bookings':>22}")
+        print(f"{'':<16} {'ms':>10} {'peak MB':>11} {'ms':>10} {'peak MB':>11}")
+        for label, old, new in cases:
+            old_result, old_ms, old_peak = measure(old)
+            new_result, new_ms, new_peak = measure(new)
+            same = booking_ids(old_result) == booking_ids(new_result)
+            print(f"{label:<16} {old_ms:>10.0f} {old_peak:>11.1f} {new_ms:>10.0f} {new_peak:>11.1f}"
+                  f"{'' if same else '  (hasil beda!)'}")
+
+        # Cache hangat (worker prefork setelah preload): iter_bookings memakai parse yang sudah ada
+        utils.load_bookings()
+        started = time.perf_counter()
+        next(utils.iter_bookings(booking_id=middle))
+        print(f"\nID tengah, cache hangat: {(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
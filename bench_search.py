@@ -0,0 +1,69 @@
+"""
+Benchmark index pencarian tamu (search.GuestIndex)
+
+Membangun index untuk sejuta booking sintetis (nama Indonesia acak + nomor
+HP) lalu mengukur latency query nama, prefix, telepon, dan booking ID.
+
+Usage:
+    python bench_search.py [jumlah_booking]
+"""
+
+import random
+import sys
+import time
+
+from models import Booking
+from search import GuestIndex
+
+FIRST_NAMES = ['Budi', 'Siti', 'Agus', 'Dewi', 'Rina', 'Andi', 'Putri', 'Joko', 'Sri', 'Ahmad',
+               'Nur', 'Eko', 'Wati', 'Dian', 'Hendra', 'Yuni', 'Rizky', 'Fajar', 'Indah', 'Bayu',
+               'Made', 'Ketut', 'Wayan', 'Nyoman', 'Teguh', 'Ratna', 'Lina', 'Arif', 'Bambang', 'Citra',
+               'Dimas', 'Galih', 'Hana', 'Irfan', 'Kartika', 'Lukman', 'Maya', 'Nanda', 'Oki', 'Pandu']
+LAST_NAMES = ['Santoso', 'Aminah', 'Wijaya', 'Saputra', 'Lestari', 'Pratama', 'Hidayat', 'Kusuma',
+              'Nugroho', 'Siregar', 'Harahap', 'Simanjuntak', 'Wibowo', 'Setiawan', 'Gunawan',
+              'Halim', 'Tanjung', 'Nasution', 'Lubis', 'Sitompul', 'Susanto', 'Purnomo', 'Rahman',
+              'Permana', 'Hakim', 'Ramadhan', 'Firmansyah', 'Sulistyo', 'Utomo', 'Yulianto']
+
+
+def generate(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if rng.random() < 0.5:
+            name += f" {rng.choice(LAST_NAMES)}"
+        phone = f"08{rng.randrange(10 ** 9, 10 ** 10)}"
+        yield Booking(f"B{i + 1:07d}", f"U{rng.randrange(5000):04d}", f"R{rng.randrange(500):03d}",
+                      '2026-01-01', '2026-01-03', 2, 1000000, name, phone,
+                      rng.choice(['active', 'completed', 'completed', 'cancelled']))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    started = time.perf_counter()
+    index = GuestIndex('bench').build(generate(count))
+    print(f"Build index {count:,} booking: {time.perf_counter() - started:.1f} detik")
+
+    rng = random.Random(7)
+    sample = [index._docs[rng.randrange(count)] for _ in range(2)]
+    queries = [
+        ('nama lengkap', f"{FIRST_NAMES[3]} {LAST_NAMES[4]}"),
+        ('nama 3 kata', 'made lubis tanjung'),
+        ('substring', 'anto'),
+        ('prefix 2 huruf', 'wi'),
+        ('telepon penuh', sample[0].guest_phone),
+        ('telepon parsial', sample[1].guest_phone[3:9]),
+        ('booking ID', f"B{rng.randrange(count) + 1:07d}"),
+        ('tidak ada', 'zzqx'),
+    ]
+    print(f"{'query':<18} {'hasil':>8} {'ms/query':>10}")
+    for label, query in queries:
+        runs = 20
+        started = time.perf_counter()
+        for _ in range(runs):
+            result = index.search(query)
+        elapsed = (time.perf_counter() - started) / runs * 1000
+        print(f"{label:<18} {result.total:>8} {elapsed:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
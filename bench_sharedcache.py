@@ -0,0 +1,132 @@
+"""
+Benchmark cache bersama: worker prefork setelah ada mutasi booking
+
+Master membuat bookings.json sintetis, preload cache lalu fork N worker
+(seperti serve.py). Master kemudian mengubah satu booking sehingga cache
+parse milik setiap worker menjadi basi, dan tiap worker menjalankan query
+yang sama. Dibandingkan: tanpa cache bersama (tiap worker stream/parse
+ulang file) vs dengan segment shared memory (sharedcache). Worker dijalankan
+bergiliran supaya latency tidak tercampur rebutan CPU. Dilaporkan latency
+rata-rata per query dan tambahan memory private per worker (setelah query
+index, dan setelah load_bookings yang memang mengisi cache per proses).
+
+Usage:
+    python bench_sharedcache.py [jumlah_booking] [jumlah_worker]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import bench_loaders
+import sharedcache
+import utils
+
+
+def private_kb() -> int:
+    """Halaman yang sudah disalin untuk proses ini (copy-on-write pecah / alokasi baru)
+
+    Private_Clean tidak dihitung: halaman segment yang hanya dibaca tetap satu
+    salinan di page cache meskipun saat diukur hanya di-map satu worker.
+    """
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Private_Dirty:'):
+                return int(line.split()[1])
+    return 0
+
+
+def worker(queries, reader, writer):
+    os.read(reader, 1)   # tunggu mutasi dari master
+    before = private_kb()
+    timings = {}
+    for label, fn in queries:
+        if label == 'load_bookings':
+            timings['memory index'] = (private_kb() - before) / 1024
+        started = time.perf_counter()
+        fn()
+        timings[label] = (time.perf_counter() - started) * 1000
+    timings['memory load'] = (private_kb() - before) / 1024
+    os.write(writer, (json.dumps(timings) + '\n').encode())
+
+
+def run(queries, workers: int, shared: bool) -> dict:
+    if shared:
+        sharedcache.enable(os.path.join(os.getcwd(), 'shm'))
+        sharedcache.publish_all()
+    utils.preload_caches()
+
+    start_r, start_w = os.pipe()
+    result_r, result_w = os.pipe()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                worker(queries, start_r, result_w)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    started = time.perf_counter()
+    utils.update_booking_status('B0000003', 'cancelled', 'admin')
+    write_ms = (time.perf_counter() - started) * 1000
+
+    results = []
+    with os.fdopen(result_r) as f:
+        os.close(result_w)
+        for _ in range(workers):
+            os.write(start_w, b'x')
+            results.append(json.loads(f.readline()))
+    for pid in children:
+        os.waitpid(pid, 0)
+    os.close(start_r)
+    os.close(start_w)
+    if shared:
+        sharedcache.disable()
+    utils._json_cache.clear()
+
+    average = {key: sum(r[key] for r in results) / workers for key in results[0]}
+    average['write'] = write_ms
+    return average
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    scratch = tempfile.mkdtemp(prefix='bench-sharedcache-')
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        os.makedirs('data')
+        bench_loaders.generate(utils.BOOKINGS_FILE, count)
+        size = os.path.getsize(utils.BOOKINGS_FILE) / 1024 / 1024
+        print(f"bookings.json: {count:,} booking, {size:.0f} MB, {workers} worker\n")
+
+        last = f"B{count:07d}"
+        queries = [
+            ('ID terakhir', lambda: utils.get_booking_by_id(last)),
+            ('booking 1 user', lambda: utils.get_user_bookings('U0042')),
+            ('aktif 1 bulan', lambda: list(utils.iter_bookings(status='active', start='2025-03-01',
+                                                               end='2025-03-31'))),
+            ('load_bookings', utils.load_bookings),
+        ]
+        plain = run(queries, workers, shared=False)
+        shared = run(queries, workers, shared=True)
+
+        print(f"{'per worker':<18} {'tanpa cache bersama':>20} {'sharedcache':>14}")
+        for label, _ in queries:
+            print(f"{label:<18} {plain[label]:>17.1f} ms {shared[label]:>11.1f} ms")
+        for label in ('memory index', 'memory load'):
+            print(f"{label:<18} {plain[label]:>17.1f} MB {shared[label]:>11.1f} MB")
+        print(f"{'mutasi (penulis)':<18} {plain['write']:>17.1f} ms {shared['write']:>11.1f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Antrian booking dengan satu writer (admission control untuk lonjakan flash sale)
+
+POST /bookings/add tidak lagi menjalankan read-modify-write sendiri-sendiri.
+Request dimasukkan ke antrian berbatas, lalu satu thread writer mengambil
+semua request yang sedang menunggu (maksimal BOOKING_BATCH_SIZE) dan
+membuatnya dengan satu commit per property (utils.create_bookings) di bawah
+lock partisi. Jika antrian penuh, submit() langsung melempar QueueFull
+(HTTP 429) tanpa menunggu. Hasil per request dikembalikan lewat Future,
+jadi response HTTP tetap melaporkan berhasil/gagal secara sinkron. Pemanggil
+menunggu paling lama BOOKING_TIMEOUT detik (CommitTimeout, HTTP 503); batch
+yang error diteruskan ke semua Future-nya tanpa menghentikan thread writer.
+
+Pada mode prefork setiap worker punya writer sendiri; antar worker tetap
+diserialkan oleh flock partisi, jadi yang berebut file paling banyak satu
+writer per worker, bukan ratusan thread request.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+
+import utils
+from models import Booking
+
+QUEUE_DEPTH = int(os.environ.get('BOOKING_QUEUE_DEPTH', 64))
+BATCH_SIZE = int(os.environ.get('BOOKING_BATCH_SIZE', 32))
+COMMIT_TIMEOUT = float(os.environ.get('BOOKING_TIMEOUT', 30))
+
+
+class QueueFull(Exception):
+    """Antrian booking penuh; client diminta mencoba lagi (HTTP 429)"""
+
+
+class CommitTimeout(Exception):
+    """Commit booking tidak selesai dalam COMMIT_TIMEOUT detik (HTTP 503)"""
+
+
+class BookingWriter:
+    """Antrian booking berbatas + satu thread writer yang commit per batch"""
+
+    def __init__(self, max_depth: int = QUEUE_DEPTH, batch_size: int = BATCH_SIZE):
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self._reset()
+
+    def _reset(self):
+        # Dipanggil juga di child setelah fork: thread writer milik parent tidak ikut
+        self._ready = threading.Condition(threading.Lock())
+        self._queue = deque()
+        self._thread = None
+        self._submitted = 0
+        self._rejected = 0
+        self._committing = 0
+        self._peak_depth = 0
+        self._batches = 0
+        self._batch_sizes = Counter()
+        self._created = 0
+        self._unavailable = 0
+        self._failed = 0
+        self._last_commit_ms = 0.0
+
+    def submit(self, **request) -> Future:
+        """Masukkan satu request booking (field seperti utils.create_bookings)
+
+        Property diambil dari context pemanggil. QueueFull jika antrian penuh.
+        """
+        request.setdefault('hotel_id', utils.get_current_hotel())
+        future = Future()
+        with self._ready:
+            if len(self._queue) >= self.max_depth:
+                self._rejected += 1
+                raise QueueFull(f"Antrian booking penuh ({self.max_depth} request menunggu)")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='booking-writer', daemon=True)
+                self._thread.start()
+            self._queue.append((request, future))
+            self._submitted += 1
+            self._peak_depth = max(self._peak_depth, len(self._queue))
+            self._ready.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._queue:
+                    self._ready.wait()
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_size))]
+                self._committing = len(batch)
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # Thread writer harus tetap hidup: pemanggil batch ini diberi error-nya
+                pending = [future for _, future in batch if not future.done()]
+                for future in pending:
+                    future.set_exception(e)
+                with self._ready:
+                    self._committing = 0
+                    self._failed += len(pending)
+                try:
+                    utils.log_activity(f"Error writer booking ({len(batch)} request): {str(e)}", status="ERROR")
+                except Exception:
+                    pass
+
+    def _commit(self, batch):
+        started = time.perf_counter()
+        # Satu commit per property, urutan kedatangan tetap
+        partitions: Dict[str, list] = {}
+        for request, future in batch:
+            if future.set_running_or_notify_cancel():
+                partitions.setdefault(request['hotel_id'], []).append((request, future))
+
+        created = unavailable = failed = 0
+        for hotel_id, items in partitions.items():
+            try:
+                with utils.use_hotel(hotel_id):
+                    results = utils.create_bookings([request for request, _ in items])
+            except Exception as e:
+                utils.log_activity(f"Error commit batch booking ({len(items)} request): {str(e)}",
+                                   status="ERROR")
+                for _, future in items:
+                    future.set_exception(e)
+                failed += len(items)
+                continue
+            for (_, future), booking in zip(items, results):
+                future.set_result(booking)
+                if booking is None:
+                    unavailable += 1
+                else:
+                    created += 1
+
+        with self._ready:
+            self._committing = 0
+            self._batches += 1
+            self._batch_sizes[len(batch)] += 1
+            self._created += created
+            self._unavailable += unavailable
+            self._failed += failed
+            self._last_commit_ms = (time.perf_counter() - started) * 1000
+
+    def stats(self) -> Dict:
+        with self._ready:
+            batched = sum(size * count for size, count in self._batch_sizes.items())
+            return {
+                'max_depth': self.max_depth,
+                'batch_size': self.batch_size,
+                'depth': len(self._queue),
+                'committing': self._committing,
+                'peak_depth': self._peak_depth,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+                'batches': self._batches,
+                'avg_batch': round(batched / self._batches, 2) if self._batches else 0,
+                'batch_sizes': dict(sorted(self._batch_sizes.items())),
+                'created': self._created,
+                'unavailable': self._unavailable,
+                'failed': self._failed,
+                'last_commit_ms': round(self._last_commit_ms, 1),
+            }
+
+
+writer = BookingWriter()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=writer._reset)
+
+
+def create_booking(**request) -> Optional[Booking]:
+    """Booking lewat antrian; menunggu commit batch-nya selesai
+
+    Return Booking atau None (kamar tidak tersedia); QueueFull jika antrian
+    penuh, CommitTimeout jika commit tidak selesai dalam COMMIT_TIMEOUT detik
+    (request yang belum diambil writer dibatalkan, yang sedang di-commit bisa
+    tetap tersimpan), exception commit diteruskan ke pemanggil.
+    """
+    future = writer.submit(**request)
+    try:
+        return future.result(timeout=COMMIT_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()
+        raise CommitTimeout(f"Booking belum di-commit setelah {COMMIT_TIMEOUT:g} detik") from None
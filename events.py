@@ -0,0 +1,299 @@
+"""
+Change feed untuk Sistem Pemesanan Hotel
+
+- EventBus: pub/sub in-process, setiap mutasi di utils mem-publish delta kecil
+- SSEHub: server Server-Sent Events berbasis asyncio (satu thread untuk semua
+  koneksi), mem-push delta ke halaman front desk tanpa polling
+
+Pada mode prefork (serve.py) hub berjalan di proses sendiri; worker meneruskan
+event ke hub lewat datagram UDP localhost (lihat EventBus.forward_to). Setiap
+datagram ditandatangani HMAC-SHA256 dengan secret acak per peluncuran; hub
+membuang datagram yang tanda tangannya tidak cocok, jadi proses lokal lain
+tidak bisa menyuntikkan event ke halaman admin.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import socket
+import threading
+import time
+from collections import deque
+from http.cookies import SimpleCookie
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from models import DEFAULT_HOTEL_ID
+
+# Panjang tanda tangan HMAC-SHA256 di awal setiap datagram ingest
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def sign_datagram(secret: bytes, payload: bytes) -> bytes:
+    return hmac.new(secret, payload, hashlib.sha256).digest() + payload
+
+
+def verify_datagram(secret: bytes, datagram: bytes) -> Optional[bytes]:
+    """Payload datagram jika tanda tangannya cocok, selain itu None"""
+    signature, payload = datagram[:SIGNATURE_SIZE], datagram[SIGNATURE_SIZE:]
+    if not hmac.compare_digest(signature, hmac.new(secret, payload, hashlib.sha256).digest()):
+        return None
+    return payload
+
+
+class EventBus:
+    """Pub/sub in-process untuk event perubahan data"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._forward_addr = None
+        self._forward_sock = None
+        self._forward_secret = None
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+    def forward_to(self, addr: Optional[tuple], secret: Optional[bytes] = None):
+        """Teruskan juga setiap event ke hub di proses lain (host, port), ditandatangani secret"""
+        if addr is not None and not secret:
+            raise ValueError("forward_to butuh secret ingest hub")
+        if self._forward_sock is not None:
+            self._forward_sock.close()
+        self._forward_addr = addr
+        self._forward_sock = None
+        self._forward_secret = secret
+        if addr is not None:
+            self._forward_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._forward_sock.setblocking(False)
+
+    def publish(self, kind: str, hotel_id: str, **data) -> Dict:
+        event = {'kind': kind, 'hotel_id': hotel_id, 'ts': time.time(), 'data': data}
+
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception:
+                # Subscriber yang error tidak boleh menggagalkan mutasi data
+                pass
+
+        if self._forward_sock is not None:
+            try:
+                datagram = sign_datagram(self._forward_secret, json.dumps(event).encode('utf-8'))
+                self._forward_sock.sendto(datagram, self._forward_addr)
+            except OSError:
+                pass
+        return event
+
+
+bus = EventBus()
+
+
+def publish(kind: str, hotel_id: str, **data) -> Dict:
+    """Publish event ke bus global"""
+    return bus.publish(kind, hotel_id, **data)
+
+
+class _SSEClient:
+    def __init__(self, session: Dict, writer: asyncio.StreamWriter, queue_size: int):
+        self.session = session
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, event: Dict) -> bool:
+        if event['hotel_id'] != self.session.get('hotel_id'):
+            return False
+        # Tamu hanya menerima delta booking miliknya sendiri
+        if event['kind'].startswith('booking.') and self.session.get('role') != 'admin':
+            return event['data'].get('user_id') == self.session.get('user_id')
+        return True
+
+
+class _IngestProtocol(asyncio.DatagramProtocol):
+    def __init__(self, hub: 'SSEHub', secret: bytes):
+        self._hub = hub
+        self._secret = secret
+
+    def datagram_received(self, data, addr):
+        payload = verify_datagram(self._secret, data)
+        if payload is None:
+            self._hub.rejected += 1
+            return
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        self._hub._dispatch(event)
+
+
+class SSEHub:
+    """Server SSE asyncio: ratusan koneksi idle dilayani satu event loop"""
+
+    def __init__(self, authenticate: Callable[[str], Optional[Dict]], history: int = 1000,
+                 heartbeat: float = 15.0, queue_size: int = 256):
+        self._authenticate = authenticate
+        self._history = deque(maxlen=history)
+        self._clients = set()
+        self._seq = 0
+        self._loop = None
+        self._heartbeat = heartbeat
+        self._queue_size = queue_size
+        self.rejected = 0
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def start(self, host: str, port: int, ingest_port: Optional[int] = None,
+              ingest_secret: Optional[bytes] = None) -> threading.Thread:
+        """Jalankan hub di background thread (mode satu proses)"""
+        thread = threading.Thread(target=self.run, args=(host, port, ingest_port, ingest_secret),
+                                  name='sse-hub', daemon=True)
+        thread.start()
+        return thread
+
+    def run(self, host: str, port: int, ingest_port: Optional[int] = None,
+            ingest_secret: Optional[bytes] = None):
+        """Jalankan hub; ingest_port menerima event dari worker lain, wajib dengan ingest_secret"""
+        if ingest_port and not ingest_secret:
+            raise ValueError("ingest_port butuh ingest_secret")
+        asyncio.run(self._serve(host, port, ingest_port, ingest_secret))
+
+    def submit(self, event: Dict):
+        """Thread-safe: dipakai sebagai subscriber EventBus"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    async def _serve(self, host: str, port: int, ingest_port: Optional[int], ingest_secret: Optional[bytes]):
+        self._loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._handle, host, port, backlog=1024)
+        if ingest_port:
+            await self._loop.create_datagram_endpoint(lambda: _IngestProtocol(self, ingest_secret),
+                                                      local_addr=('127.0.0.1', ingest_port))
+        async with server:
+            await server.serve_forever()
+
+    def _dispatch(self, event: Dict):
+        self._seq += 1
+        event = dict(event, id=self._seq)
+        self._history.append(event)
+
+        for client in list(self._clients):
+            if not client.wants(event):
+                continue
+            try:
+                client.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Client terlalu lambat - putuskan, browser akan reconnect + replay
+                self._clients.discard(client)
+                client.writer.close()
+
+    @staticmethod
+    def _format(event: Dict) -> bytes:
+        payload = json.dumps(dict(event['data'], ts=event['ts']), separators=(',', ':'))
+        return f"id: {event['id']}\nevent: {event['kind']}\ndata: {payload}\n\n".encode('utf-8')
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            raw = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            writer.close()
+            return
+
+        lines = raw.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        cors = ''
+        origin = headers.get('origin')
+        if origin and urlsplit(origin).hostname == headers.get('host', '').rsplit(':', 1)[0]:
+            cors = (f"Access-Control-Allow-Origin: {origin}\r\n"
+                    "Access-Control-Allow-Credentials: true\r\n"
+                    "Access-Control-Allow-Headers: Last-Event-ID, Cache-Control\r\n")
+
+        url = urlsplit(target)
+        if method == 'OPTIONS':
+            writer.write(f"HTTP/1.1 204 No Content\r\n{cors}Content-Length: 0\r\n\r\n".encode('latin-1'))
+            await writer.drain()
+            writer.close()
+            return
+
+        session = self._authenticate(headers.get('cookie', '')) if url.path == '/events' else None
+        if method != 'GET' or session is None:
+            status = '404 Not Found' if url.path != '/events' else '401 Unauthorized'
+            writer.write(f"HTTP/1.1 {status}\r\n{cors}Content-Length: 0\r\nConnection: close\r\n\r\n"
+                         .encode('latin-1'))
+            await writer.drain()
+            writer.close()
+            return
+
+        writer.write(("HTTP/1.1 200 OK\r\n"
+                      "Content-Type: text/event-stream\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      "Connection: keep-alive\r\n"
+                      f"{cors}\r\n"
+                      "retry: 3000\n\n").encode('latin-1'))
+
+        client = _SSEClient(session, writer, self._queue_size)
+
+        # Replay event yang terlewat saat reconnect
+        last_id = headers.get('last-event-id') or parse_qs(url.query).get('last_id', [''])[0]
+        if last_id.isdigit():
+            for event in self._history:
+                if event['id'] > int(last_id) and client.wants(event):
+                    writer.write(self._format(event))
+
+        self._clients.add(client)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(client.queue.get(), timeout=self._heartbeat)
+                    writer.write(self._format(event))
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+
+def session_authenticator(app) -> Callable[[str], Optional[Dict]]:
+    """Buat fungsi auth SSE yang membaca cookie session Flask yang ter-sign"""
+    serializer = app.session_interface.get_signing_serializer(app)
+    cookie_name = app.config['SESSION_COOKIE_NAME']
+    max_age = int(app.permanent_session_lifetime.total_seconds())
+
+    def authenticate(cookie_header: str) -> Optional[Dict]:
+        cookie = SimpleCookie()
+        try:
+            cookie.load(cookie_header)
+        except Exception:
+            return None
+        if cookie_name not in cookie:
+            return None
+        try:
+            session = serializer.loads(cookie[cookie_name].value, max_age=max_age)
+        except Exception:
+            return None
+        if 'user_id' not in session:
+            return None
+        session.setdefault('hotel_id', DEFAULT_HOTEL_ID)
+        return session
+
+    return authenticate
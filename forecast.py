@@ -0,0 +1,307 @@
+"""
+Forecast okupansi per tipe kamar (perencanaan staf & harga, 30-180 hari)
+
+Booking (bookings.json + arsip, maksimal 5 tahun ke belakang) dibaca sekali
+menjadi kolom array numpy: tipe kamar, malam check-in/check-out, dan tanggal
+booking dibuat. Sisanya operasi vektor:
+
+- on-the-books (OTB) per tipe, per malam, per lead time: jumlah kamar yang
+  sudah dipesan L hari sebelum malam tersebut (bincount kamar-malam lalu
+  cumsum terbalik di sumbu lead). OTB lead 0 = okupansi akhir malam itu
+- kurva pickup: rata-rata tambahan kamar dari lead L sampai hari-H untuk
+  malam-malam 1 tahun terakhir
+- pace: OTB hari ini dibanding OTB tahun lalu (364 hari, hari yang sama)
+  pada lead yang sama
+- baseline musiman: rata-rata okupansi tahun-tahun sebelumnya pada tanggal
+  yang sama (+/- 1 minggu, hari yang sama)
+- rata-rata bergerak 7 & 28 hari untuk tren okupansi
+
+Forecast malam d = OTB(d) + pickup(lead d), dibatasi kapasitas tipe kamar.
+Tanpa histori pickup dipakai baseline musiman (minimal OTB). Booking
+cancelled tidak dihitung (waktu pembatalan tidak disimpan).
+
+Hasil di-cache per property per hari; /forecast?refresh=1 menghitung ulang.
+
+Usage:
+    python forecast.py --days 90
+    python forecast.py --hotel main --days 180 --json
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import archive
+import utils
+
+MIN_HORIZON = 30
+MAX_HORIZON = 180
+DEFAULT_HORIZON = 90
+MAX_LEAD = MAX_HORIZON
+HISTORY_DAYS = 5 * 366
+PICKUP_NIGHTS = 365
+SEASON = 364      # 52 minggu: hari dalam minggu tetap sama
+TREND_DAYS = 90
+EXCLUDED_STATUSES = ('cancelled',)
+
+_NAT = np.iinfo(np.int64).min
+
+_cache: Dict[str, Dict] = {}
+_cache_lock = threading.Lock()
+
+
+def _parse_day(value) -> np.datetime64:
+    try:
+        return np.datetime64(value, 'D')
+    except (ValueError, TypeError):
+        return np.datetime64('NaT')
+
+
+def _to_days(values: List) -> np.ndarray:
+    """Tanggal 'YYYY-MM-DD' -> nomor hari int64; tanggal rusak = _NAT"""
+    try:
+        days = np.array(values, dtype='datetime64[D]')
+    except (ValueError, TypeError):
+        # Ada tanggal rusak (lihat integrity.py): parse satu per satu
+        days = np.array([_parse_day(value) for value in values], dtype='datetime64[D]')
+    return days.astype(np.int64)
+
+
+def _day_number(value: date) -> int:
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+def _dates(start: int, count: int) -> List[str]:
+    return (np.arange(start, start + count).astype('datetime64[D]')).astype(str).tolist()
+
+
+def _values(array: np.ndarray, digits: int = 2) -> List:
+    """Array -> list JSON (dibulatkan, NaN -> None)"""
+    return [None if value != value else value for value in np.round(array.astype(float), digits).tolist()]
+
+
+def booking_columns(records: Iterable[Dict], room_types: Dict[str, str],
+                    types: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Satu pass atas record mentah -> kolom (tipe, check-in, check-out, dibuat) dalam nomor hari"""
+    type_index = {name: i for i, name in enumerate(types)}
+    kinds, check_ins, check_outs, created = [], [], [], []
+    for record in records:
+        if record.get('status') in EXCLUDED_STATUSES:
+            continue
+        kind = type_index.get(room_types.get(record.get('room_id')) or record.get('room_type'))
+        if kind is None:
+            continue
+        kinds.append(kind)
+        check_ins.append(record.get('check_in'))
+        check_outs.append(record.get('check_out'))
+        created.append((record.get('created_at') or '')[:10] or None)
+
+    kinds = np.array(kinds, dtype=np.int64)
+    check_in = _to_days(check_ins)
+    check_out = _to_days(check_outs)
+    created = _to_days(created)
+    valid = (check_in != _NAT) & (check_out != _NAT) & (check_out > check_in)
+    # Tanpa created_at: anggap dipesan saat check-in (lead 0)
+    created = np.where(created == _NAT, check_in, created)
+    return kinds[valid], check_in[valid], check_out[valid], created[valid]
+
+
+def on_the_books(kinds: np.ndarray, check_in: np.ndarray, check_out: np.ndarray, created: np.ndarray,
+                 type_count: int, origin: int, days: int) -> np.ndarray:
+    """OTB[tipe, malam, lead] untuk malam origin .. origin+days-1
+
+    OTB[t, h, L] = kamar tipe t yang terisi malam h dari booking yang dibuat
+    paling lambat L hari sebelumnya; lead > MAX_LEAD digabung ke MAX_LEAD.
+    """
+    start = np.clip(check_in - origin, 0, days)
+    end = np.clip(check_out - origin, 0, days)
+    keep = end > start
+    kinds, start, end, created = kinds[keep], start[keep], end[keep], created[keep] - origin
+
+    # Satu elemen per kamar-malam
+    nights = end - start
+    offsets = np.repeat(np.cumsum(nights) - nights, nights)
+    night = np.repeat(start, nights) + np.arange(nights.sum()) - offsets
+    lead = np.clip(night - np.repeat(created, nights), 0, MAX_LEAD)
+    flat = (np.repeat(kinds, nights) * days + night) * (MAX_LEAD + 1) + lead
+
+    counts = np.bincount(flat, minlength=type_count * days * (MAX_LEAD + 1))
+    counts = counts.reshape(type_count, days, MAX_LEAD + 1)
+    return counts[:, :, ::-1].cumsum(axis=2)[:, :, ::-1]
+
+
+def moving_average(series: np.ndarray, window: int) -> np.ndarray:
+    """Rata-rata bergerak trailing di sumbu terakhir; posisi sebelum window penuh = NaN"""
+    padded = np.concatenate([np.zeros(series.shape[:-1] + (1,)), np.cumsum(series, axis=-1, dtype=float)],
+                            axis=-1)
+    result = np.full(series.shape, np.nan)
+    result[..., window - 1:] = (padded[..., window:] - padded[..., :-window]) / window
+    return result
+
+
+def compute(hotel_id: Optional[str] = None, today: Optional[date] = None) -> Dict:
+    """Hitung forecast MAX_HORIZON hari untuk semua tipe kamar satu property"""
+    started = time.perf_counter()
+    hotel_id = hotel_id or utils.get_current_hotel()
+    today = today or date.today()
+    today_n = _day_number(today)
+    first = today - timedelta(days=HISTORY_DAYS)
+
+    with utils.use_hotel(hotel_id):
+        rooms = utils.load_rooms()
+        hot = utils.read_json(utils.bookings_file())
+    room_types = {room.room_id: room.get_room_type() for room in rooms}
+    types = list(dict.fromkeys(room_types.values()))
+    capacity = np.array([sum(1 for t in room_types.values() if t == name) for name in types], dtype=np.int64)
+
+    records = archive.merge_hot(archive.iter_archived_records(start=first.isoformat(), hotel_id=hotel_id),
+                                hot, key=lambda record: record.get('booking_id'))
+    kinds, check_in, check_out, created = booking_columns(records, room_types, types)
+
+    origin = max(int(check_in.min()) if check_in.size else today_n, _day_number(first))
+    origin = min(origin, today_n)
+    days = today_n - origin + MAX_HORIZON
+    otb = on_the_books(kinds, check_in, check_out, created, len(types), origin, days)
+    occupancy = otb[:, :, 0]
+    today_i = today_n - origin
+
+    future = today_i + np.arange(MAX_HORIZON)
+    lead_now = np.arange(MAX_HORIZON)
+    on_books = occupancy[:, future]
+
+    # Kurva pickup dari malam-malam yang sudah lewat
+    history = np.arange(max(today_i - PICKUP_NIGHTS, 0), today_i)
+    if history.size:
+        pickup = (occupancy[:, history, None] - otb[:, history, :]).mean(axis=1)
+    else:
+        pickup = np.full((len(types), MAX_LEAD + 1), np.nan)
+
+    # Baseline musiman: tanggal sama tahun-tahun sebelumnya, +/- 1 minggu
+    years = np.arange(1, HISTORY_DAYS // SEASON + 1)
+    shifts = (-SEASON * years[:, None] + 7 * np.array([-1, 0, 1])[None, :]).ravel()
+    index = future[None, :] + shifts[:, None]
+    valid = (index >= 0) & (index < today_i)
+    samples = occupancy[:, np.clip(index, 0, days - 1)] * valid
+    counted = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        baseline = np.where(counted > 0, samples.sum(axis=1) / counted, np.nan)
+
+    cap = capacity[:, None]
+    expected = on_books + pickup[:, lead_now]
+    expected = np.where(np.isnan(expected), baseline, expected)
+    forecast = np.where(np.isnan(expected), on_books, np.maximum(np.minimum(expected, cap), on_books))
+
+    last_year = future - SEASON
+    has_last_year = last_year >= 0
+    last_year = np.clip(last_year, 0, days - 1)
+    last_year_otb = np.where(has_last_year, otb[:, last_year, lead_now], np.nan)
+    last_year_final = np.where(has_last_year, occupancy[:, last_year], np.nan)
+
+    trend = np.arange(max(today_i - TREND_DAYS, 0), today_i)
+    ma7 = moving_average(occupancy[:, :today_i], 7) if today_i else np.zeros((len(types), 0))
+    ma28 = moving_average(occupancy[:, :today_i], 28) if today_i else np.zeros((len(types), 0))
+
+    return {
+        'hotel_id': hotel_id,
+        'as_of': today.isoformat(),
+        'history_start': _dates(origin, 1)[0],
+        'bookings': int(kinds.size),
+        'dates': _dates(today_n, MAX_HORIZON),
+        'room_types': {
+            name: {
+                'capacity': int(capacity[t]),
+                'on_books': on_books[t].tolist(),
+                'forecast': _values(forecast[t]),
+                'occupancy_pct': _values(forecast[t] / capacity[t] * 100, 1),
+                'baseline': _values(baseline[t]),
+                'last_year_on_books': _values(last_year_otb[t], 0),
+                'last_year_final': _values(last_year_final[t], 0),
+                'pickup_curve': _values(pickup[t]),
+            }
+            for t, name in enumerate(types)
+        },
+        'trend': {
+            'dates': _dates(origin + int(trend[0]), trend.size) if trend.size else [],
+            'room_types': {
+                name: {
+                    'occupancy': occupancy[t, trend].tolist(),
+                    'ma7': _values(ma7[t, trend]) if trend.size else [],
+                    'ma28': _values(ma28[t, trend]) if trend.size else [],
+                }
+                for t, name in enumerate(types)
+            },
+        },
+        'compute_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def view(result: Dict, days: int = DEFAULT_HORIZON) -> Dict:
+    """Potong hasil compute() ke `days` hari (30-180) + ringkasan per tipe kamar"""
+    days = max(MIN_HORIZON, min(MAX_HORIZON, int(days)))
+    room_types = {}
+    for name, data in result['room_types'].items():
+        sliced = {key: (value[:days] if key != 'pickup_curve' else value[:days + 1])
+                  for key, value in data.items() if isinstance(value, list)}
+        pct = np.array(sliced['occupancy_pct'], dtype=float)
+        last_year = np.array([np.nan if v is None else v for v in sliced['last_year_on_books']], dtype=float)
+        known = ~np.isnan(last_year)
+        peak = int(np.argmax(pct)) if pct.size else 0
+        sliced.update(capacity=data['capacity'], summary={
+            'avg_occupancy_pct': round(float(pct.mean()), 1) if pct.size else 0.0,
+            'peak_date': result['dates'][peak],
+            'peak_occupancy_pct': float(pct[peak]) if pct.size else 0.0,
+            'on_books_nights': int(sum(sliced['on_books'])),
+            'forecast_nights': round(float(np.sum(sliced['forecast'])), 1),
+            # Pace: OTB hari ini - OTB tahun lalu pada lead yang sama (malam yang punya data tahun lalu)
+            'pace_vs_last_year': (int(np.array(sliced['on_books'])[known].sum() - last_year[known].sum())
+                                  if known.any() else None),
+        })
+        room_types[name] = sliced
+    return dict(result, days=days, dates=result['dates'][:days], room_types=room_types)
+
+
+def get_forecast(hotel_id: Optional[str] = None, days: int = DEFAULT_HORIZON, refresh: bool = False,
+                 today: Optional[date] = None) -> Dict:
+    """Forecast property (cache per hari; refresh=True menghitung ulang)"""
+    hotel_id = hotel_id or utils.get_current_hotel()
+    today = today or date.today()
+    with _cache_lock:
+        result = _cache.get(hotel_id)
+        if refresh or result is None or result['as_of'] != today.isoformat():
+            result = _cache[hotel_id] = compute(hotel_id, today)
+    return view(result, days)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast okupansi per tipe kamar")
+    parser.add_argument('--hotel', default=None, help="ID property (default: property utama)")
+    parser.add_argument('--days', type=int, default=DEFAULT_HORIZON, help="Horizon forecast (30-180 hari)")
+    parser.add_argument('--json', action='store_true', help="Cetak hasil lengkap sebagai JSON")
+    args = parser.parse_args(argv)
+
+    result = view(compute(args.hotel), args.days)
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(f"Forecast {result['hotel_id']} per {result['as_of']}, {result['days']} hari "
+          f"({result['bookings']} booking sejak {result['history_start']}, {result['compute_ms']} ms)")
+    print(f"{'Tipe':<12} {'Kamar':>5} {'OTB':>7} {'Forecast':>9} {'Rata2':>7} {'Puncak':>18} {'Pace':>6}")
+    for name, data in result['room_types'].items():
+        summary = data['summary']
+        pace = '-' if summary['pace_vs_last_year'] is None else f"{summary['pace_vs_last_year']:+d}"
+        print(f"{name:<12} {data['capacity']:>5} {summary['on_books_nights']:>7} {summary['forecast_nights']:>9} "
+              f"{summary['avg_occupancy_pct']:>6}% {summary['peak_date']:>11} {summary['peak_occupancy_pct']:>5}% "
+              f"{pace:>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Feed iCalendar (ICS) tanggal terisi per kamar dan per tipe kamar
+
+Untuk channel manager dan aplikasi housekeeping yang mem-poll feed setiap
+beberapa menit. Index in-memory per property menyimpan masa inap setiap
+booking (aktif dan completed) per kamar; baris VEVENT satu kamar dirender
+sekali lalu disimpan. Mutasi dari events.bus hanya menandai kamar yang
+disentuh (kamar lama dan kamar baru jika booking dipindah), jadi hanya kamar
+itu yang dirender ulang. Perubahan dari proses lain (worker prefork)
+terdeteksi dari signature rooms.json/bookings.json lalu di-diff per kamar.
+
+Feed utuh di-cache per (kamar/tipe, jendela tanggal) bersama ETag-nya. ETag
+adalah hash isi feed sehingga sama di semua worker; poll dengan
+If-None-Match yang cocok cukup dijawab 304.
+
+Booking yang sudah diarsipkan (check-out > 90 hari lalu) tidak ikut feed.
+"""
+
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import events
+import utils
+
+OCCUPIED_STATUSES = ('active', 'completed')
+PAST_DAYS = 30
+FUTURE_DAYS = 365
+MAX_WINDOW_DAYS = 800
+MAX_FEEDS = 512
+PRODID = '-//Hotel Sedna//Sistem Pemesanan Hotel//ID'
+
+
+class Stay(NamedTuple):
+    room_id: str
+    check_in: str
+    check_out: str
+    status: str
+    created_at: str
+
+
+def _escape(value: str) -> str:
+    """Escape nilai TEXT (RFC 5545 3.3.11)"""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\n', '\\n'))
+
+
+def _fold(line: str) -> str:
+    """Lipat baris > 75 oktet (RFC 5545 3.1)"""
+    raw = line.encode('utf-8')
+    if len(raw) <= 75:
+        return line + '\r\n'
+    parts = []
+    while raw:
+        size = 75 if not parts else 74
+        # Jangan memotong di tengah karakter multi-byte
+        while size < len(raw) and (raw[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(raw[:size].decode('utf-8'))
+        raw = raw[size:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _ics_date(value: str) -> str:
+    return value[:10].replace('-', '')
+
+
+def _ics_stamp(value: str) -> str:
+    # created_at "YYYY-MM-DD HH:MM:SS" -> "YYYYMMDDTHHMMSSZ"
+    digits = ''.join(ch for ch in value if ch.isdigit())
+    return f"{digits[:8]}T{digits[8:14].ljust(6, '0')}Z" if len(digits) >= 8 else '19700101T000000Z'
+
+
+def parse_window(start: Optional[str] = None, end: Optional[str] = None,
+                 today: Optional[date] = None) -> Tuple[str, str]:
+    """Jendela tanggal [start, end) feed; default PAST_DAYS lalu s/d FUTURE_DAYS ke depan
+
+    ValueError jika format salah, end <= start, atau lebih dari MAX_WINDOW_DAYS.
+    """
+    today = today or date.today()
+    start_date = date.fromisoformat(start) if start else today - timedelta(days=PAST_DAYS)
+    end_date = date.fromisoformat(end) if end else start_date + timedelta(days=PAST_DAYS + FUTURE_DAYS)
+    if end_date <= start_date:
+        raise ValueError("Tanggal akhir harus setelah tanggal awal")
+    if (end_date - start_date).days > MAX_WINDOW_DAYS:
+        raise ValueError(f"Jendela feed maksimal {MAX_WINDOW_DAYS} hari")
+    return start_date.isoformat(), end_date.isoformat()
+
+
+class FeedIndex:
+    """Masa inap per kamar satu property + VEVENT per kamar + cache feed
+
+    Setiap kamar punya versi (naik setiap kali disentuh mutasi). Feed yang
+    di-cache menyimpan versi kamar-kamarnya, jadi cache valid selama versi
+    tersebut tidak berubah, tanpa perlu mengosongkan cache secara eksplisit.
+    """
+
+    def __init__(self, hotel_id: str):
+        self.hotel_id = hotel_id
+        self.signature = None
+        self._lock = threading.RLock()
+        self._stays: Dict[str, Stay] = {}               # booking_id -> masa inap (semua status)
+        self._by_room: Dict[str, Dict[str, Stay]] = {}  # room_id -> booking yang menempati
+        self._rooms: Dict[str, Tuple[str, str]] = {}    # room_id -> (room_number, room_type)
+        self._events: Dict[str, List[Tuple[str, str, str]]] = {}  # room_id -> VEVENT ter-render
+        self._versions: Dict[str, int] = {}
+        self._clock = itertools.count(1)
+        self._feeds: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self.renders = 0
+        self.syncs = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- update ----------
+
+    def touch(self, room_id: str):
+        self._versions[room_id] = next(self._clock)
+        self._events.pop(room_id, None)
+
+    def apply(self, booking_id: str, stay: Optional[Stay]):
+        """Set (atau hapus jika None) masa inap satu booking, sentuh kamar yang berubah"""
+        old = self._stays.pop(booking_id, None)
+        if stay is not None:
+            self._stays[booking_id] = stay
+        if old == stay:
+            return
+        if old is not None and old.status in OCCUPIED_STATUSES:
+            self._by_room.get(old.room_id, {}).pop(booking_id, None)
+            self.touch(old.room_id)
+        if stay is not None and stay.status in OCCUPIED_STATUSES:
+            self._by_room.setdefault(stay.room_id, {})[booking_id] = stay
+            self.touch(stay.room_id)
+
+    def update(self, fields: Dict) -> bool:
+        """Terapkan data event booking.created/updated; False jika booking belum dikenal"""
+        booking_id = fields['booking_id']
+        old = self._stays.get(booking_id)
+        if old is None:
+            if not all(fields.get(name) for name in ('room_id', 'check_in', 'check_out', 'status')):
+                return False
+            old = Stay(fields['room_id'], fields['check_in'], fields['check_out'], fields['status'],
+                       fields.get('created_at') or '')
+        self.apply(booking_id, old._replace(**{name: fields[name] for name in Stay._fields
+                                               if fields.get(name) is not None}))
+        return True
+
+    def set_rooms(self, rooms: Iterable):
+        rooms = {room.room_id: (room.room_number, room.get_room_type()) for room in rooms}
+        for room_id in self._rooms.keys() | rooms.keys():
+            if self._rooms.get(room_id) != rooms.get(room_id):
+                self.touch(room_id)
+        self._rooms = rooms
+
+    def sync(self, rooms: Iterable, bookings: Iterable):
+        """Samakan dengan isi file; hanya kamar yang masa inapnya berubah yang disentuh"""
+        self.syncs += 1
+        self.set_rooms(rooms)
+        seen = set()
+        for booking in bookings:
+            key, copy = booking.booking_id, 1
+            while key in seen:
+                # Booking ID dobel (lihat integrity.py): event hanya menyentuh kemunculan pertama,
+                # seperti fungsi update di utils; kemunculan berikutnya tetap tampil di feed
+                copy += 1
+                key = f"{booking.booking_id}~{copy}"
+            seen.add(key)
+            stay = Stay(booking.room_id, booking._check_in, booking._check_out, booking.status,
+                        booking._created_at)
+            if self._stays.get(key) != stay:
+                self.apply(key, stay)
+        for booking_id in self._stays.keys() - seen:
+            self.apply(booking_id, None)
+
+    # ---------- render ----------
+
+    def _room_events(self, room_id: str) -> List[Tuple[str, str, str]]:
+        rendered = self._events.get(room_id)
+        if rendered is None:
+            room_number = self._rooms[room_id][0]
+            rendered = []
+            for booking_id, stay in sorted(self._by_room.get(room_id, {}).items(),
+                                           key=lambda item: (item[1].check_in, item[0])):
+                lines = [
+                    'BEGIN:VEVENT',
+                    f"UID:{booking_id}@{self.hotel_id}.hotel-sedna",
+                    f"DTSTAMP:{_ics_stamp(stay.created_at)}",
+                    f"DTSTART;VALUE=DATE:{_ics_date(stay.check_in)}",
+                    f"DTEND;VALUE=DATE:{_ics_date(stay.check_out)}",
+                    f"SUMMARY:{_escape(f'Kamar {room_number} terisi')}",
+                    f"DESCRIPTION:{_escape('Booking ' + booking_id.split('~')[0])}",
+                    'TRANSP:OPAQUE',
+                    'END:VEVENT',
+                ]
+                rendered.append((stay.check_in, stay.check_out, ''.join(_fold(line) for line in lines)))
+            self._events[room_id] = rendered
+            self.renders += 1
+        return rendered
+
+    def room_ids(self, kind: str, name: str) -> Optional[List[str]]:
+        if kind == 'room':
+            return [name] if name in self._rooms else None
+        room_ids = sorted(room_id for room_id, (_, room_type) in self._rooms.items()
+                          if room_type.lower() == name.lower())
+        return room_ids or None
+
+    def feed(self, kind: str, name: str, start: str, end: str) -> Optional[Tuple[str, str]]:
+        """(isi ICS, ETag) untuk satu kamar/tipe pada jendela [start, end); None jika tidak ada"""
+        room_ids = self.room_ids(kind, name)
+        if room_ids is None:
+            return None
+        key = (kind, name.lower(), start, end)
+        versions = tuple((room_id, self._versions.get(room_id, 0)) for room_id in room_ids)
+        cached = self._feeds.get(key)
+        if cached is not None and cached[0] == versions:
+            self._feeds.move_to_end(key)
+            self.hits += 1
+            return cached[1], cached[2]
+
+        self.misses += 1
+        if kind == 'room':
+            title = f"Kamar {self._rooms[name][0]}"
+        else:
+            title = f"Kamar {self._rooms[room_ids[0]][1]}"
+        parts = [_fold(line) for line in ('BEGIN:VCALENDAR', 'VERSION:2.0', f"PRODID:{PRODID}",
+                                          'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+                                          f"X-WR-CALNAME:{_escape(f'{title} ({self.hotel_id})')}")]
+        for room_id in room_ids:
+            parts.extend(text for check_in, check_out, text in self._room_events(room_id)
+                         if check_in < end and check_out > start)
+        parts.append(_fold('END:VCALENDAR'))
+        body = ''.join(parts)
+        etag = hashlib.sha1(body.encode('utf-8')).hexdigest()[:20]
+
+        self._feeds[key] = (versions, body, etag)
+        if len(self._feeds) > MAX_FEEDS:
+            self._feeds.popitem(last=False)
+        return body, etag
+
+
+_indexes: Dict[str, FeedIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _signature(hotel_id: str) -> tuple:
+    return (utils.file_signature(utils.rooms_file(hotel_id)), utils.file_signature(utils.bookings_file(hotel_id)))
+
+
+def get_index(hotel_id: Optional[str] = None) -> FeedIndex:
+    """Index property: dibangun saat pertama dipakai, di-diff lagi jika data diubah proses lain"""
+    hotel_id = hotel_id or utils.get_current_hotel()
+    with _indexes_lock:
+        index = _indexes.get(hotel_id)
+        if index is None:
+            index = _indexes[hotel_id] = FeedIndex(hotel_id)
+
+    with index._lock:
+        signature = _signature(hotel_id)
+        if index.signature != signature:
+            with utils.use_hotel(hotel_id):
+                index.sync(utils.load_rooms(), utils.load_bookings())
+            index.signature = signature
+    return index
+
+
+def get_feed(kind: str, name: str, start: str, end: str,
+             hotel_id: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """(isi ICS, ETag) feed kamar (kind='room', name=room_id) atau tipe kamar (kind='type')"""
+    index = get_index(hotel_id)
+    with index._lock:
+        return index.feed(kind, name, start, end)
+
+
+def stats() -> Dict:
+    result = {}
+    for hotel_id, index in list(_indexes.items()):
+        with index._lock:
+            result[hotel_id] = {
+                'rooms': len(index._rooms),
+                'bookings': len(index._stays),
+                'feeds_cached': len(index._feeds),
+                'hits': index.hits,
+                'misses': index.misses,
+                'room_renders': index.renders,
+                'file_syncs': index.syncs,
+            }
+    return result
+
+
+def _on_event(event: Dict):
+    """Subscriber events.bus: sentuh hanya kamar yang terdampak mutasi"""
+    kind = event['kind']
+    if not kind.startswith(('booking.', 'room.')):
+        return
+    index = _indexes.get(event['hotel_id'])
+    if index is None or index.signature is None:
+        return
+
+    data = event['data']
+    with index._lock:
+        if kind == 'booking.deleted':
+            index.apply(data['booking_id'], None)
+        elif kind.startswith('booking.'):
+            if not index.update(data):
+                # Booking belum dikenal dan event tidak lengkap: diff penuh saat feed berikutnya
+                index.signature = None
+                return
+        else:
+            with utils.use_hotel(event['hotel_id']):
+                index.set_rooms(utils.load_rooms())
+        # Satu mutasi bisa menulis rooms.json dan bookings.json dengan event
+        # terpisah; tiap file dimajukan sendiri-sendiri, dan hanya jika tulisan
+        # proses ini satu-satunya perubahan sejak sync terakhir. Tulisan worker
+        # lain membuat signature tetap basi -> sync() pada feed berikutnya
+        rooms_signature, bookings_signature = index.signature
+        index.signature = (utils.advance_signature(rooms_signature, utils.rooms_file(event['hotel_id'])),
+                           utils.advance_signature(bookings_signature, utils.bookings_file(event['hotel_id'])))
+
+
+events.bus.subscribe(_on_event)
@@ -0,0 +1,521 @@
+"""
+Cek integritas data (dan perbaikan opsional) untuk Sistem Pemesanan Hotel
+
+users.json, rooms.json, dan bookings.json tiap property dibaca secara
+streaming (satu record per langkah, tanpa json.load seluruh file) sambil
+membangun index hash ID. Yang dilaporkan:
+
+    unparsable    record rusak / tidak sesuai schema (dulu membuat load_bookings() return [])
+    duplicate_id  ID dobel (skema len()+1 lama)
+    orphan_room   booking menunjuk room_id yang tidak ada
+    orphan_user   booking menunjuk user_id yang tidak ada
+    overlap       booking aktif bertabrakan di kamar yang sama
+    availability  is_available kamar tidak sesuai booking aktif
+    nights        nights tidak sama dengan selisih tanggal
+    price         total_price tidak sama dengan calculate_price(nights)
+
+Waktu berjalan linear terhadap jumlah record dan memory hanya sebesar index ID
+(bukan isi file). Mode --repair menulis snapshot yang sudah dikoreksi secara
+atomik di bawah lock partisi; file lama disimpan sebagai *.bak-<timestamp>
+dan record yang dibuang ditulis ke integrity-rejected-<timestamp>.json.
+
+Usage:
+    python integrity.py                  # cek semua property
+    python integrity.py --hotel main --limit 50
+    python integrity.py --repair
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import archive
+import backup
+import utils
+from assignment import date_ordinal as _date_ordinal
+from models import Booking, DeluxeRoom, StandardRoom, SuiteRoom, User
+
+PRICE_TOLERANCE = 0.5
+ROOM_CLASSES = {'Standard': StandardRoom, 'Deluxe': DeluxeRoom, 'Suite': SuiteRoom}
+BOOKING_STATUSES = utils.BOOKING_STATUSES
+
+CATEGORIES = {
+    'unparsable': "Record rusak / tidak sesuai schema",
+    'duplicate_id': "ID dobel",
+    'orphan_room': "room_id tidak ada di rooms.json",
+    'orphan_user': "user_id tidak ada di users.json",
+    'overlap': "Booking aktif bertabrakan di kamar yang sama",
+    'availability': "is_available tidak sesuai booking aktif",
+    'nights': "nights tidak sesuai tanggal check-in/check-out",
+    'price': "total_price tidak sesuai calculate_price",
+}
+# Kategori yang diperbaiki otomatis oleh --repair; sisanya perlu keputusan manusia
+REPAIRABLE = ('unparsable', 'duplicate_id', 'availability', 'nights', 'price')
+
+
+# ==================== STREAMING JSON ====================
+
+def _iter_records(path: str) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    if os.path.exists(path):
+        yield from utils.iter_json_array(path)
+
+
+def _dump_record(record: Dict) -> str:
+    """Satu record dengan format yang sama persis dengan json.dump(indent=4) list"""
+    text = json.dumps(record, indent=4, ensure_ascii=False)
+    return '    ' + text.replace('\n', '\n    ')
+
+
+class _ArrayWriter:
+    """Tulis array JSON secara streaming ke file temp (format = utils.write_json)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = f"{path}.integrity.{os.getpid()}.tmp"
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._count = 0
+
+    def write(self, record: Dict):
+        self._file.write(('[\n' if self._count == 0 else ',\n') + _dump_record(record))
+        self._count += 1
+
+    def close(self):
+        self._file.write('\n]' if self._count else '[]')
+        self._file.close()
+
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+# ==================== VALIDASI RECORD ====================
+
+# Tanggal sangat berulang antar booking; strptime per record mendominasi waktu scan
+date_ordinal = lru_cache(maxsize=8192)(_date_ordinal)
+
+
+def parse_user(record: Any) -> User:
+    if not isinstance(record, dict):
+        raise ValueError("bukan object JSON")
+    return User(**record)
+
+
+def parse_room(record: Any):
+    """Validasi record kamar, return object Room (polymorphism sesuai room_type)"""
+    if not isinstance(record, dict):
+        raise ValueError("bukan object JSON")
+    room_class = ROOM_CLASSES.get(record.get('room_type'))
+    if room_class is None:
+        raise ValueError(f"room_type tidak dikenal: {record.get('room_type')!r}")
+    for field in ('room_id', 'room_number'):
+        if not isinstance(record.get(field), str):
+            raise ValueError(f"{field} tidak valid")
+    if not isinstance(record.get('is_available'), bool):
+        raise ValueError("is_available harus boolean")
+    return room_class(record['room_id'], record['room_number'])
+
+
+def parse_booking(record: Any) -> Tuple[Booking, int, int]:
+    """Validasi record booking, return (Booking, ordinal check-in, ordinal check-out)"""
+    if not isinstance(record, dict):
+        raise ValueError("bukan object JSON")
+    booking = Booking(**record)   # field asing/kurang = TypeError, sama seperti load_bookings()
+    if not isinstance(record['booking_id'], str) or not record['booking_id']:
+        raise ValueError("booking_id tidak valid")
+    if record['status'] not in BOOKING_STATUSES:
+        raise ValueError(f"status tidak dikenal: {record['status']!r}")
+    if not isinstance(record['nights'], int) or not isinstance(record['total_price'], (int, float)):
+        raise ValueError("nights/total_price bukan angka")
+    start = date_ordinal(record['check_in'])
+    end = date_ordinal(record['check_out'])
+    if end <= start:
+        raise ValueError("check_out harus setelah check_in")
+    return booking, start, end
+
+
+# ==================== LAPORAN ====================
+
+class Report:
+    """Jumlah temuan per kategori + contoh terbatas (memory tidak ikut membesar)"""
+
+    def __init__(self, limit: int = 20):
+        self.limit = limit
+        self.counts: Counter = Counter()
+        self.examples: Dict[str, List[str]] = defaultdict(list)
+        self.repaired: Counter = Counter()
+        self.records: Counter = Counter()
+
+    def add(self, hotel_id: str, category: str, message: str):
+        self.counts[category] += 1
+        if len(self.examples[category]) < self.limit:
+            self.examples[category].append(f"[{hotel_id}] {message}")
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def print(self):
+        scanned = ', '.join(f"{count} {name}" for name, count in self.records.items())
+        print(f"Dibaca: {scanned or 'tidak ada data'}")
+        if not self.counts:
+            print("✅ Tidak ada masalah integritas")
+            return
+        for category, title in CATEGORIES.items():
+            count = self.counts.get(category)
+            if not count:
+                continue
+            repaired = f", {self.repaired[category]} diperbaiki" if self.repaired.get(category) else ''
+            manual = '' if category in REPAIRABLE else ' (perlu tindakan manual)'
+            print(f"\n{title}: {count}{repaired}{manual}")
+            for example in self.examples[category]:
+                print(f"  - {example}")
+            if count > len(self.examples[category]):
+                print(f"  ... dan {count - len(self.examples[category])} lainnya")
+
+
+# ==================== CEK ====================
+
+class PartitionScan:
+    """Hasil satu kali scan partisi property; dipakai ulang oleh repair"""
+
+    def __init__(self, hotel_id: str):
+        self.hotel_id = hotel_id
+        self.rooms: Dict[str, object] = {}
+        self.room_records: List[Dict] = []
+        self.duplicate_booking_ids: set = set()
+        self.occupied: set = set()
+        self.max_booking_number = 0
+
+
+def load_user_ids(report: Report) -> Tuple[set, List[Dict]]:
+    """Scan users.json (global), return (set user_id, record valid)"""
+    user_ids = set()
+    records = []
+    for line, record, error in _iter_records(utils.USERS_FILE):
+        report.records['user'] += 1
+        if error is None:
+            try:
+                parse_user(record)
+            except (TypeError, ValueError, KeyError) as e:
+                error = str(e)
+        if error:
+            report.add('global', 'unparsable', f"users.json baris {line}: {error}")
+            continue
+        if record['user_id'] in user_ids:
+            report.add('global', 'duplicate_id', f"user_id dobel: {record['user_id']}")
+        user_ids.add(record['user_id'])
+        records.append(record)
+    return user_ids, records
+
+
+def scan_partition(hotel_id: str, user_ids: set, report: Report) -> PartitionScan:
+    """Scan rooms.json lalu bookings.json satu property sekali jalan"""
+    scan = PartitionScan(hotel_id)
+    room_ids = set()
+    for line, record, error in _iter_records(utils.rooms_file(hotel_id)):
+        report.records['room'] += 1
+        if error is None:
+            try:
+                room = parse_room(record)
+            except (TypeError, ValueError) as e:
+                error = str(e)
+        if error:
+            report.add(hotel_id, 'unparsable', f"rooms.json baris {line}: {error}")
+            continue
+        if record['room_id'] in room_ids:
+            report.add(hotel_id, 'duplicate_id', f"room_id dobel: {record['room_id']}")
+            continue
+        room_ids.add(record['room_id'])
+        scan.rooms[record['room_id']] = room
+        scan.room_records.append(record)
+
+    seen = set()
+    stays = defaultdict(list)   # room_id -> [(start, end, booking_id)] booking aktif
+    for line, record, error in _iter_records(utils.bookings_file(hotel_id)):
+        report.records['booking'] += 1
+        # ID record rusak tetap dihitung supaya ID baru hasil repair tidak bentrok saat dipulihkan
+        raw_id = str(record.get('booking_id', '')) if isinstance(record, dict) else ''
+        if raw_id[1:].isdigit():
+            scan.max_booking_number = max(scan.max_booking_number, int(raw_id[1:]))
+        if error is None:
+            try:
+                booking, start, end = parse_booking(record)
+            except (TypeError, ValueError, KeyError) as e:
+                error = str(e)
+        if error:
+            report.add(hotel_id, 'unparsable', f"bookings.json baris {line}: {error}")
+            continue
+
+        booking_id = record['booking_id']
+        if booking_id in seen:
+            scan.duplicate_booking_ids.add(booking_id)
+            report.add(hotel_id, 'duplicate_id', f"booking_id dobel: {booking_id} (baris {line})")
+        seen.add(booking_id)
+
+        room_id = record['room_id']
+        if room_id and room_id not in scan.rooms:
+            report.add(hotel_id, 'orphan_room', f"{booking_id}: room_id {room_id} tidak ada")
+        if user_ids and record['user_id'] not in user_ids:
+            report.add(hotel_id, 'orphan_user', f"{booking_id}: user_id {record['user_id']} tidak ada")
+
+        nights = end - start
+        if record['nights'] != nights:
+            report.add(hotel_id, 'nights', f"{booking_id}: nights={record['nights']}, "
+                                           f"{record['check_in']}..{record['check_out']} = {nights} malam")
+        room = scan.rooms.get(room_id) or _type_template(booking.room_type)
+        if room is not None:
+            price = room.calculate_price(nights)
+            if abs(record['total_price'] - price) > PRICE_TOLERANCE:
+                report.add(hotel_id, 'price', f"{booking_id}: total_price={record['total_price']:,.0f}, "
+                                              f"seharusnya {price:,.0f} ({room.get_room_type()} x {nights} malam)")
+
+        if record['status'] == 'active' and room_id:
+            scan.occupied.add(room_id)
+            stays[room_id].append((start, end, booking_id))
+
+    # Tabrakan: urutkan booking aktif per kamar, bandingkan dengan check-out terjauh sejauh ini
+    for room_id, room_stays in stays.items():
+        room_stays.sort()
+        latest_end, latest_id = room_stays[0][1], room_stays[0][2]
+        for start, end, booking_id in room_stays[1:]:
+            if start < latest_end:
+                report.add(hotel_id, 'overlap', f"kamar {room_id}: {latest_id} dan {booking_id} "
+                                                f"bertabrakan mulai {datetime.fromordinal(start):%Y-%m-%d}")
+            if end > latest_end:
+                latest_end, latest_id = end, booking_id
+
+    for record in scan.room_records:
+        expected = record['room_id'] not in scan.occupied
+        if record['is_available'] != expected:
+            report.add(hotel_id, 'availability', f"kamar {record['room_id']} is_available={record['is_available']}, "
+                                                 f"seharusnya {expected}")
+    return scan
+
+
+def _type_template(room_type: Optional[str]):
+    """Kamar contoh untuk menghitung harga booking per tipe yang belum dapat kamar"""
+    room_class = ROOM_CLASSES.get(room_type)
+    return room_class('', '') if room_class else None
+
+
+def check(hotel_ids: List[str], report: Report) -> Tuple[set, List[Dict], Dict[str, PartitionScan]]:
+    user_ids, user_records = load_user_ids(report)
+    scans = {hotel_id: scan_partition(hotel_id, user_ids, report) for hotel_id in hotel_ids}
+    return user_ids, user_records, scans
+
+
+# ==================== REPAIR ====================
+
+def _fingerprint(record: Dict) -> str:
+    return json.dumps(record, sort_keys=True)
+
+
+def _install(staged: List[Tuple[str, str]], stamp: str):
+    """Simpan file lama sebagai .bak-<stamp> lalu pasang file baru (rename atomik)"""
+    for tmp_path, path in staged:
+        if os.path.exists(path):
+            backup = f"{path}.bak-{stamp}"
+            try:
+                os.link(path, backup)
+            except OSError:
+                import shutil
+                shutil.copy2(path, backup)
+        os.replace(tmp_path, path)
+        utils.notify_write(path)
+
+
+def repair_partition(hotel_id: str, user_ids: set, report: Report, stamp: str) -> List[Dict]:
+    """Tulis ulang rooms.json + bookings.json yang sudah dikoreksi, return record yang dibuang
+
+    Dijalankan di bawah lock partisi: scan ulang (data bisa berubah sejak cek),
+    lalu stream bookings sekali lagi sambil menulis snapshot baru ke file temp.
+    """
+    rejected = []
+    with utils.partition_lock(hotel_id):
+        found = Report(limit=0)
+        scan = scan_partition(hotel_id, user_ids, found)
+        if not any(found.counts[category] for category in REPAIRABLE):
+            return rejected
+        next_number = max(scan.max_booking_number,
+                          int((archive.max_archived_booking_id(hotel_id) or 'B0')[1:] or 0)) + 1
+        first_seen: Dict[str, Optional[str]] = {}
+        occupied = set()
+
+        path = utils.bookings_file(hotel_id)
+        writer = _ArrayWriter(path)
+        try:
+            for line, record, error in _iter_records(path):
+                if error is None:
+                    try:
+                        booking, start, end = parse_booking(record)
+                    except (TypeError, ValueError, KeyError) as e:
+                        error = str(e)
+                if error:
+                    rejected.append({'file': os.path.relpath(path, utils.DATA_DIR), 'line': line,
+                                     'error': error, 'record': record})
+                    report.repaired['unparsable'] += 1
+                    continue
+
+                record = dict(record)
+                booking_id = record['booking_id']
+                if booking_id in first_seen:
+                    if first_seen[booking_id] == _fingerprint(record):
+                        # Salinan identik: cukup dibuang
+                        report.repaired['duplicate_id'] += 1
+                        continue
+                    record['booking_id'] = f"B{next_number:04d}"
+                    next_number += 1
+                    report.repaired['duplicate_id'] += 1
+                    report.add(hotel_id, 'duplicate_id', f"{booking_id} (baris {line}) diberi ID baru "
+                                                         f"{record['booking_id']}")
+                else:
+                    first_seen[booking_id] = (_fingerprint(record)
+                                              if booking_id in scan.duplicate_booking_ids else None)
+
+                if record['nights'] != end - start:
+                    record['nights'] = end - start
+                    report.repaired['nights'] += 1
+                room = scan.rooms.get(record['room_id']) or _type_template(record.get('room_type'))
+                if room is not None:
+                    price = room.calculate_price(record['nights'])
+                    if abs(record['total_price'] - price) > PRICE_TOLERANCE:
+                        record['total_price'] = price
+                        report.repaired['price'] += 1
+
+                if record['status'] == 'active' and record['room_id']:
+                    occupied.add(record['room_id'])
+                writer.write(record)
+            writer.close()
+
+            # Kamar: buang record rusak, samakan is_available dengan booking aktif
+            rooms_path = utils.rooms_file(hotel_id)
+            rooms_writer = _ArrayWriter(rooms_path)
+            try:
+                for line, record, error in _iter_records(rooms_path):
+                    if error is None:
+                        try:
+                            parse_room(record)
+                        except (TypeError, ValueError) as e:
+                            error = str(e)
+                    if error:
+                        rejected.append({'file': os.path.relpath(rooms_path, utils.DATA_DIR), 'line': line,
+                                         'error': error, 'record': record})
+                        report.repaired['unparsable'] += 1
+                        continue
+                    expected = record['room_id'] not in occupied
+                    if record['is_available'] != expected:
+                        record = dict(record, is_available=expected)
+                        report.repaired['availability'] += 1
+                    rooms_writer.write(record)
+                rooms_writer.close()
+            except Exception:
+                rooms_writer.discard()
+                raise
+
+            staged = [(writer.tmp_path, path)]
+            if os.path.exists(rooms_path):
+                staged.append((rooms_writer.tmp_path, rooms_path))
+            else:
+                rooms_writer.discard()
+            _install(staged, stamp)
+        except Exception:
+            writer.discard()
+            raise
+    return rejected
+
+
+def repair_users(report: Report, stamp: str) -> List[Dict]:
+    """Buang record user yang rusak (satu user rusak membuat load_users() return [])"""
+    if not os.path.exists(utils.USERS_FILE):
+        return []
+    rejected = []
+    writer = _ArrayWriter(utils.USERS_FILE)
+    try:
+        for line, record, error in _iter_records(utils.USERS_FILE):
+            if error is None:
+                try:
+                    parse_user(record)
+                except (TypeError, ValueError, KeyError) as e:
+                    error = str(e)
+            if error:
+                rejected.append({'file': 'users.json', 'line': line, 'error': error, 'record': record})
+                report.repaired['unparsable'] += 1
+                continue
+            writer.write(record)
+        writer.close()
+    except Exception:
+        writer.discard()
+        raise
+    if rejected:
+        _install([(writer.tmp_path, utils.USERS_FILE)], stamp)
+    else:
+        writer.discard()
+    return rejected
+
+
+def repair(hotel_ids: List[str], report: Report) -> Dict[str, int]:
+    """Perbaiki semua property, return jumlah record yang dibuang per property"""
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    dropped = {}
+    user_rejected = repair_users(report, stamp)
+    user_ids, _ = load_user_ids(Report(limit=0))
+    for hotel_id in hotel_ids:
+        rejected = repair_partition(hotel_id, user_ids, report, stamp)
+        if hotel_id == hotel_ids[0]:
+            rejected = user_rejected + rejected
+        if rejected:
+            path = os.path.join(utils.hotel_data_dir(hotel_id), f"integrity-rejected-{stamp}.json")
+            utils.write_json(path, rejected)
+        dropped[hotel_id] = len(rejected)
+    return dropped
+
+
+# ==================== MAIN ====================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cek integritas data JSON (dan perbaiki dengan --repair)")
+    parser.add_argument('--hotel', default=None, help="ID property (default: semua property)")
+    parser.add_argument('--limit', type=int, default=20, help="Contoh yang ditampilkan per kategori")
+    parser.add_argument('--repair', action='store_true',
+                        help="Tulis snapshot terkoreksi (file lama disimpan sebagai .bak-<timestamp>)")
+    args = parser.parse_args(argv)
+    backup.install_journal()
+
+    hotel_ids = [args.hotel] if args.hotel else [h.hotel_id for h in utils.load_hotels()] or ['main']
+
+    started = time.perf_counter()
+    report = Report(args.limit)
+    check(hotel_ids, report)
+    report.print()
+    print(f"\nSelesai dalam {time.perf_counter() - started:.2f} detik")
+
+    if not args.repair or not report.total:
+        return 1 if report.total else 0
+
+    started = time.perf_counter()
+    repaired = Report(args.limit)
+    dropped = repair(hotel_ids, repaired)
+    fixed = ', '.join(f"{CATEGORIES[c]}: {n}" for c, n in repaired.repaired.items())
+    print(f"\nRepair selesai dalam {time.perf_counter() - started:.2f} detik ({fixed or 'tidak ada perubahan'})")
+    for hotel_id, count in dropped.items():
+        if count:
+            print(f"  [{hotel_id}] {count} record rusak dipindah ke integrity-rejected-*.json")
+    utils.log_activity(f"Repair integritas data: {fixed or 'tidak ada perubahan'}", status="UPDATE")
+
+    print("\nCek ulang setelah repair:")
+    after = Report(args.limit)
+    check(hotel_ids, after)
+    after.print()
+    return 1 if after.total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Batch invoice untuk booking completed (tutup buku akhir bulan)
+
+Booking completed dengan check-out di dalam periode dibaca secara streaming
+(bookings.json + segment arsip), dikirim per batch ke worker process, dan
+setiap worker merender invoice HTML + teks siap cetak langsung ke disk:
+
+    invoices/<periode>/<hotel_id>/B0001.html
+    invoices/<periode>/<hotel_id>/B0001.txt
+    invoices/<periode>/<hotel_id>/manifest.json
+
+Template di-compile sekali (Jinja bytecode cache yang sama dengan serve.py)
+dan katalog kamar dibangun sekali di proses utama lalu dibagikan ke worker,
+jadi tidak ada re-parse rooms.json per invoice. Jumlah batch yang sedang
+diproses dibatasi sehingga memory tetap kecil untuk puluhan ribu invoice.
+
+Usage:
+    python invoices.py --month 2026-09
+    python invoices.py --start 2026-09-01 --end 2026-09-15 --hotel main --workers 4
+"""
+
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+import archive
+import utils
+
+OUTPUT_DIR = 'invoices'
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TEMPLATE_CACHE_DIR = os.path.join('.cache', 'jinja')
+FORMATS = ('html', 'txt')
+BATCH_SIZE = 200
+
+# State per worker process, diisi oleh _init_worker
+_templates: Dict[str, object] = {}
+_rooms: Dict[str, Dict] = {}
+_hotel: Dict = {}
+_output_dir = ''
+
+
+def _environment() -> Environment:
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR),
+                       autoescape=select_autoescape(['html']),
+                       keep_trailing_newline=True,
+                       bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR))
+
+
+def compile_templates(formats=FORMATS) -> Dict[str, object]:
+    """Compile template invoice; hasilnya tersimpan di bytecode cache untuk worker"""
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    env = _environment()
+    return {fmt: env.get_template(f"invoice.{fmt}") for fmt in formats}
+
+
+def room_catalog(hotel_id: str) -> Dict[str, Dict]:
+    """Data kamar yang dibutuhkan invoice, dalam bentuk dict biasa (murah di-pickle)"""
+    with utils.use_hotel(hotel_id):
+        rooms = utils.load_rooms()
+    return {
+        room.room_id: {
+            'room_number': room.room_number,
+            'room_type': room.get_room_type(),
+            'capacity': room.capacity,
+            'base_price': room.base_price,
+        }
+        for room in rooms
+    }
+
+
+def _init_worker(formats, rooms: Dict[str, Dict], hotel: Dict, output_dir: str):
+    global _rooms, _hotel, _output_dir
+    _templates.update(compile_templates(formats))
+    _rooms = rooms
+    _hotel = hotel
+    _output_dir = output_dir
+
+
+def _invoice_context(record: Dict) -> Dict:
+    room = _rooms.get(record['room_id'])
+    nightly = room['base_price'] if room else record['total_price'] / max(record['nights'], 1)
+    subtotal = nightly * record['nights']
+    return {
+        'invoice_number': f"INV-{record['booking_id']}",
+        'issued_at': record['check_out'],
+        'hotel': _hotel,
+        'booking': record,
+        'room': room,
+        'nightly': nightly,
+        'subtotal': subtotal,
+        'discount': max(subtotal - record['total_price'], 0),
+        'total': record['total_price'],
+    }
+
+
+def render_batch(records: List[Dict]) -> List[Dict]:
+    """Render dan tulis invoice satu batch (jalan di worker), return baris manifest"""
+    rows = []
+    for record in records:
+        context = _invoice_context(record)
+        files = []
+        for fmt, template in _templates.items():
+            name = f"{record['booking_id']}.{fmt}"
+            with open(os.path.join(_output_dir, name), 'w', encoding='utf-8') as f:
+                f.write(template.render(**context))
+            files.append(name)
+        rows.append({
+            'invoice_number': context['invoice_number'],
+            'booking_id': record['booking_id'],
+            'user_id': record['user_id'],
+            'guest_name': record['guest_name'],
+            'check_out': record['check_out'],
+            'total': record['total_price'],
+            'files': files,
+        })
+    return rows
+
+
+def iter_completed_bookings(start: str, end: str, hotel_id: str) -> Iterator[Dict]:
+    """Booking completed dengan check-out dalam [start, end]: hot dulu, lalu arsip"""
+    seen = set()
+    # bookings.json di-stream; yang disimpan hanya booking_id untuk dedup dengan arsip
+    for booking in utils.iter_bookings(hotel_id=hotel_id):
+        seen.add(booking.booking_id)
+        if booking.status == 'completed' and start <= booking._check_out <= end:
+            yield booking.to_dict()
+
+    for booking in archive.iter_archived_bookings(start=start, end=end, hotel_id=hotel_id):
+        # Record yang masih ada di bookings.json sudah dihitung (hot menang)
+        if booking.booking_id in seen:
+            continue
+        seen.add(booking.booking_id)
+        if booking.status == 'completed' and start <= booking._check_out <= end:
+            yield booking.to_dict()
+
+
+def _batches(records: Iterator[Dict], size: int, skipped: Dict) -> Iterator[List[Dict]]:
+    batch = []
+    issued = set()
+    for record in records:
+        # booking_id dobel akan menimpa file invoice yang sama
+        if record['booking_id'] in issued:
+            skipped['duplicate_booking_ids'] += 1
+            continue
+        issued.add(record['booking_id'])
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_invoices(start: str, end: str, hotel_id: str, label: str,
+                      workers: Optional[int] = None, formats=FORMATS,
+                      output_root: str = OUTPUT_DIR) -> Dict:
+    """Generate invoice satu property untuk satu periode, return ringkasan manifest"""
+    output_dir = os.path.join(output_root, label, hotel_id)
+    os.makedirs(output_dir, exist_ok=True)
+
+    hotel = utils.get_hotel_by_id(hotel_id)
+    hotel_info = {'hotel_id': hotel_id, 'name': hotel.name if hotel else hotel_id,
+                  'address': hotel.address if hotel else ''}
+    compile_templates(formats)
+    catalog = room_catalog(hotel_id)
+
+    workers = workers or os.cpu_count() or 1
+    summary = {'hotel_id': hotel_id, 'period_start': start, 'period_end': end,
+               'generated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+               'formats': list(formats)}
+    skipped = {'duplicate_booking_ids': 0}
+    count = 0
+    revenue = 0.0
+
+    # Manifest ditulis streaming supaya daftar invoice tidak perlu ditahan di memory
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as manifest, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(formats, catalog, hotel_info, output_dir)) as pool:
+        header = json.dumps(summary, indent=4, ensure_ascii=False)
+        manifest.write(header[:-2] + ',\n    "invoices": [')
+
+        def drain(futures) -> None:
+            nonlocal count, revenue
+            for future in futures:
+                for row in future.result():
+                    manifest.write((',' if count else '') + '\n        ' + json.dumps(row, ensure_ascii=False))
+                    count += 1
+                    revenue += row['total']
+
+        pending = set()
+        for batch in _batches(iter_completed_bookings(start, end, hotel_id), BATCH_SIZE, skipped):
+            pending.add(pool.submit(render_batch, batch))
+            # Batasi batch yang sedang diproses agar memory tetap konstan
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(done)
+        drain(pending)
+
+        manifest.write('\n    ],\n')
+        manifest.write(f'    "count": {count},\n    "revenue": {json.dumps(revenue)},\n')
+        manifest.write(f'    "skipped": {json.dumps(skipped)}\n}}\n')
+    os.replace(tmp_path, manifest_path)
+
+    summary.update(count=count, revenue=revenue, skipped=skipped, output_dir=output_dir)
+    return summary
+
+
+def period_from_args(args) -> tuple:
+    """Return (start, end, label) dari --month atau --start/--end"""
+    if args.month:
+        year, month = map(int, args.month.split('-'))
+        last_day = calendar.monthrange(year, month)[1]
+        return f"{args.month}-01", f"{args.month}-{last_day:02d}", args.month
+    if not (args.start and args.end):
+        raise SystemExit("Gunakan --month YYYY-MM atau --start dan --end")
+    return args.start, args.end, f"{args.start}_{args.end}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate invoice booking completed per periode")
+    parser.add_argument('--month', help="Periode bulanan, format YYYY-MM")
+    parser.add_argument('--start', help="Tanggal awal check-out (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Tanggal akhir check-out (YYYY-MM-DD)")
+    parser.add_argument('--hotel', default=None, help="ID property (default: semua property)")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah worker process")
+    parser.add_argument('--format', default=','.join(FORMATS), help="Format output: html,txt")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Folder output")
+    args = parser.parse_args(argv)
+
+    start, end, label = period_from_args(args)
+    formats = tuple(fmt for fmt in args.format.split(',') if fmt in FORMATS)
+    hotel_ids = [args.hotel] if args.hotel else [h.hotel_id for h in utils.load_hotels()]
+
+    for hotel_id in hotel_ids:
+        started = time.perf_counter()
+        summary = generate_invoices(start, end, hotel_id, label, args.workers, formats, args.output)
+        elapsed = time.perf_counter() - started
+        print(f"{hotel_id}: {summary['count']} invoice (Rp {summary['revenue']:,.0f}) "
+              f"-> {summary['output_dir']} dalam {elapsed:.1f} detik")
+        utils.log_activity(f"{summary['count']} invoice dibuat untuk {hotel_id} periode {label}",
+                           status="CREATE")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
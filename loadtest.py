@@ -0,0 +1,387 @@
+"""
+Load generator & stress test untuk Sistem Pemesanan Hotel
+
+Menjalankan virtual user (thread, opsional di beberapa proses) yang memakai
+route asli: /login, /dashboard, /bookings, /bookings/add (GET form + POST
+booking). Setelah run selesai dilaporkan latency p50/p95/p99 per aksi dan
+throughput, lalu data dicek:
+
+- tidak ada booking aktif yang tumpang tindih di kamar yang sama
+- booking_id unik
+- is_available di rooms.json sesuai dengan ada/tidaknya booking aktif
+- file JSON tidak korup
+
+Mode default berjalan in-process (Flask test client) di salinan folder data/
+di direktori temp, jadi data asli tidak tersentuh. Dengan --url, load
+dikirim ke server yang sedang jalan (mis. serve.py) dan --data menunjuk ke
+folder data server tersebut untuk pengecekan.
+
+Usage:
+    python loadtest.py --users 20 --requests 50
+    python loadtest.py --users 50 --processes 4 --duration 30
+    python loadtest.py --url http://127.0.0.1:8000 --login tamu1:tamu123 --data data
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+from typing import Dict, List, Optional
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+DEFAULT_MIX = 'dashboard=25,bookings=25,form=10,book=40'
+ROOM_TYPES = ['Standard', 'Deluxe', 'Suite']
+NIGHTS_CHOICES = [1, 1, 2, 2, 3, 4, 7]
+
+
+# ==================== CLIENTS ====================
+
+class _InProcessClient:
+    """Request lewat Flask test client (tanpa network)"""
+
+    def __init__(self):
+        from app import app
+        self._client = app.test_client()
+
+    def request(self, method: str, path: str, data: Optional[Dict] = None) -> int:
+        if method == 'POST':
+            return self._client.post(path, data=data).status_code
+        return self._client.get(path).status_code
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class _HttpClient:
+    """Request HTTP ke server yang sedang jalan; cookie session per virtual user"""
+
+    def __init__(self, base_url: str):
+        self._base_url = base_url.rstrip('/')
+        self._opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method: str, path: str, data: Optional[Dict] = None) -> int:
+        body = urlencode(data, doseq=True).encode('utf-8') if method == 'POST' else None
+        try:
+            with self._opener.open(self._base_url + path, data=body, timeout=30) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            # Redirect (302) juga sampai ke sini karena _NoRedirect
+            e.read()
+            return e.code
+
+
+# ==================== VIRTUAL USER ====================
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ('dashboard', 'bookings', 'form', 'book'):
+            raise argparse.ArgumentTypeError(f"Aksi tidak dikenal: {name}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+class _Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.booked = 0
+        self.rejected = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def record(self, action: str, elapsed: float, ok: bool):
+        with self._lock:
+            self.latencies[action].append(elapsed)
+            if not ok:
+                self.errors[action] += 1
+
+    def merge(self, other: Dict):
+        for action, values in other['latencies'].items():
+            self.latencies[action].extend(values)
+        for action, count in other['errors'].items():
+            self.errors[action] += count
+        self.booked += other['booked']
+        self.rejected += other['rejected']
+        self.throttled += other['throttled']
+
+    def to_dict(self) -> Dict:
+        return {'latencies': dict(self.latencies), 'errors': dict(self.errors),
+                'booked': self.booked, 'rejected': self.rejected, 'throttled': self.throttled}
+
+
+def _booking_form(rng: random.Random, room_ids: List[str], days: int, type_ratio: float) -> Dict:
+    check_in = datetime.now().date() + timedelta(days=rng.randrange(days))
+    check_out = check_in + timedelta(days=rng.choice(NIGHTS_CHOICES))
+    form = {
+        'check_in': check_in.strftime('%Y-%m-%d'),
+        'check_out': check_out.strftime('%Y-%m-%d'),
+        'guest_name': f"Load Test {rng.randrange(10000)}",
+        'guest_phone': f"08{rng.randrange(10 ** 9, 10 ** 10)}",
+    }
+    if rng.random() < type_ratio or not room_ids:
+        form['room_type'] = rng.choice(ROOM_TYPES)
+    else:
+        form['room_id'] = rng.choice(room_ids)
+    return form
+
+
+def _virtual_user(client, credentials: tuple, config: Dict, stats: _Stats, seed: int):
+    rng = random.Random(seed)
+    actions = list(config['mix'])
+    weights = [config['mix'][a] for a in actions]
+
+    def timed(action: str, method: str, path: str, data: Optional[Dict] = None) -> Optional[int]:
+        started = time.perf_counter()
+        try:
+            status = client.request(method, path, data)
+        except Exception:
+            stats.record(action, time.perf_counter() - started, ok=False)
+            return None
+        stats.record(action, time.perf_counter() - started, ok=status < 500)
+        return status
+
+    username, password = credentials
+    if timed('login', 'POST', '/login', {'username': username, 'password': password}) != 302:
+        return
+
+    deadline = time.monotonic() + config['duration'] if config['duration'] else None
+    done = 0
+    while (deadline and time.monotonic() < deadline) or (not deadline and done < config['requests']):
+        action = rng.choices(actions, weights)[0]
+        if action == 'dashboard':
+            timed(action, 'GET', '/dashboard')
+        elif action == 'bookings':
+            timed(action, 'GET', '/bookings')
+        elif action == 'form':
+            timed(action, 'GET', '/bookings/add')
+        else:
+            form = _booking_form(rng, config['room_ids'], config['days'], config['type_ratio'])
+            status = timed(action, 'POST', '/bookings/add', form)
+            # Berhasil = redirect ke daftar booking, ditolak = form dirender ulang,
+            # 429 = antrian booking penuh (client diminta mencoba lagi)
+            with stats._lock:
+                if status == 302:
+                    stats.booked += 1
+                elif status == 200:
+                    stats.rejected += 1
+                elif status == 429:
+                    stats.throttled += 1
+        done += 1
+
+
+def _run_threads(config: Dict, process_index: int) -> Dict:
+    stats = _Stats()
+    threads = []
+    for i in range(config['threads']):
+        user_index = process_index * config['threads'] + i
+        credentials = config['logins'][user_index % len(config['logins'])]
+        client = _HttpClient(config['url']) if config['url'] else _InProcessClient()
+        thread = threading.Thread(target=_virtual_user,
+                                  args=(client, credentials, config, stats, config['seed'] + user_index))
+        threads.append(thread)
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.to_dict()
+
+
+def _run_process(args) -> Dict:
+    return _run_threads(*args)
+
+
+def run_load(config: Dict) -> tuple:
+    """Jalankan load; return (_Stats, detik wall clock)"""
+    stats = _Stats()
+    started = time.perf_counter()
+    if config['processes'] <= 1:
+        stats.merge(_run_threads(config, 0))
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with context.Pool(config['processes']) as pool:
+            for result in pool.map(_run_process, [(config, i) for i in range(config['processes'])]):
+                stats.merge(result)
+    return stats, time.perf_counter() - started
+
+
+# ==================== REPORT ====================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile dari values yang sudah terurut"""
+    if not values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def print_report(stats: _Stats, elapsed: float):
+    print(f"{'aksi':<10} {'jumlah':>7} {'error':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    total = 0
+    for action in sorted(stats.latencies):
+        values = sorted(stats.latencies[action])
+        total += len(values)
+        print(f"{action:<10} {len(values):>7} {stats.errors.get(action, 0):>6} "
+              f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+              f"{percentile(values, 99) * 1000:>8.1f}")
+    print(f"\nTotal {total} request dalam {elapsed:.2f} detik = {total / elapsed:.1f} req/detik")
+    print(f"Booking berhasil: {stats.booked}, ditolak (penuh): {stats.rejected}, "
+          f"antrian penuh (429): {stats.throttled}")
+
+
+# ==================== INVARIANTS ====================
+
+def _load_raw(path: str, violations: List[str]) -> list:
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError as e:
+        violations.append(f"{path}: JSON korup ({e})")
+        return []
+
+
+def check_invariants(data_dir: str = 'data') -> List[str]:
+    """Cek konsistensi data semua property, return daftar pelanggaran"""
+    violations: List[str] = []
+    hotel_ids = [h['hotel_id'] for h in _load_raw(os.path.join(data_dir, 'hotels.json'), violations)]
+
+    for hotel_id in hotel_ids or ['main']:
+        partition = data_dir if hotel_id == 'main' else os.path.join(data_dir, hotel_id)
+        rooms = _load_raw(os.path.join(partition, 'rooms.json'), violations)
+        bookings = _load_raw(os.path.join(partition, 'bookings.json'), violations)
+
+        seen = set()
+        for booking in bookings:
+            if booking['booking_id'] in seen:
+                violations.append(f"[{hotel_id}] booking_id dobel: {booking['booking_id']}")
+            seen.add(booking['booking_id'])
+
+        by_room = defaultdict(list)
+        for booking in bookings:
+            if booking['status'] == 'active' and booking['room_id']:
+                by_room[booking['room_id']].append(booking)
+        for room_id, stays in by_room.items():
+            stays.sort(key=lambda b: b['check_in'])
+            for prev, current in zip(stays, stays[1:]):
+                if current['check_in'] < prev['check_out']:
+                    violations.append(f"[{hotel_id}] double booking kamar {room_id}: "
+                                      f"{prev['booking_id']} ({prev['check_in']}..{prev['check_out']}) dan "
+                                      f"{current['booking_id']} ({current['check_in']}..{current['check_out']})")
+
+        for room in rooms:
+            occupied = room['room_id'] in by_room
+            if room['is_available'] == occupied:
+                violations.append(f"[{hotel_id}] kamar {room['room_id']} is_available={room['is_available']} "
+                                  f"padahal booking aktif={len(by_room.get(room['room_id'], []))}")
+    return violations
+
+
+# ==================== MAIN ====================
+
+def _prepare_scratch(users: int, keep: bool) -> List[tuple]:
+    """Salin data/ ke direktori temp, pindah ke sana, dan buat akun tamu load test"""
+    scratch = tempfile.mkdtemp(prefix='loadtest-')
+    shutil.copytree('data', os.path.join(scratch, 'data'))
+    os.chdir(scratch)
+    print(f"Data scratch: {scratch}{'' if keep else ' (dihapus setelah selesai)'}")
+
+    import utils
+    from models import User
+
+    accounts = [User(f"LT{i:04d}", f"loadtest{i}", 'loadtest', 'tamu', f"Load Test {i}")
+                for i in range(1, users + 1)]
+    utils.save_users(utils.load_users() + accounts)
+    return [(u.username, u.password) for u in accounts]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load generator & stress test booking")
+    parser.add_argument('--users', type=int, default=20, help="Jumlah virtual user (thread) total")
+    parser.add_argument('--processes', type=int, default=1, help="Bagi virtual user ke N proses")
+    parser.add_argument('--requests', type=int, default=50, help="Request per virtual user")
+    parser.add_argument('--duration', type=float, default=0, help="Jalan selama N detik (menggantikan --requests)")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Bobot aksi (default: {DEFAULT_MIX})")
+    parser.add_argument('--days', type=int, default=30, help="Check-in acak dalam N hari ke depan")
+    parser.add_argument('--type-ratio', type=float, default=0.7,
+                        help="Porsi booking per tipe kamar (sisanya memilih kamar spesifik)")
+    parser.add_argument('--url', default=None, help="Base URL server; tanpa ini jalan in-process")
+    parser.add_argument('--login', action='append', default=[],
+                        help="user:password untuk mode --url (boleh berulang)")
+    parser.add_argument('--data', default='data', help="Folder data yang dicek (mode --url)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--keep', action='store_true', help="Jangan hapus data scratch (mode in-process)")
+    args = parser.parse_args(argv)
+
+    processes = max(args.processes, 1)
+    original_dir = os.getcwd()
+    if args.url:
+        logins = [tuple(item.split(':', 1)) for item in args.login] or [('tamu1', 'tamu123')]
+        data_dir = args.data
+    else:
+        logins = _prepare_scratch(args.users, args.keep)
+        data_dir = 'data'
+
+    rooms = _load_raw(os.path.join(data_dir, 'rooms.json'), [])
+    config = {
+        'url': args.url,
+        'logins': logins,
+        'threads': max(args.users // processes, 1),
+        'processes': processes,
+        'requests': args.requests,
+        'duration': args.duration,
+        'mix': args.mix,
+        'days': args.days,
+        'type_ratio': args.type_ratio,
+        'room_ids': [room['room_id'] for room in rooms],
+        'seed': args.seed,
+    }
+
+    try:
+        # Pelanggaran yang sudah ada sebelum load test dilaporkan terpisah
+        baseline = set(check_invariants(data_dir))
+        stats, elapsed = run_load(config)
+        print_report(stats, elapsed)
+
+        violations = [v for v in check_invariants(data_dir) if v not in baseline]
+        print()
+        if baseline:
+            print(f"⚠️  {len(baseline)} pelanggaran sudah ada sebelum load test:")
+            for violation in sorted(baseline):
+                print(f"  - {violation}")
+        if violations:
+            print(f"❌ {len(violations)} pelanggaran invariant baru:")
+            for violation in violations:
+                print(f"  - {violation}")
+        else:
+            print("✅ Invariant OK: tidak ada double booking, booking_id unik, is_available konsisten")
+        return 1 if violations else 0
+    finally:
+        if not args.url:
+            scratch = os.getcwd()
+            os.chdir(original_dir)
+            if not args.keep:
+                shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,15 +3,49 @@ from datetime import datetime
 import json
 from typing import List, Dict, Optional
 
+# Property default - datanya disimpan langsung di folder data/ (layout lama)
+DEFAULT_HOTEL_ID = 'main'
+
+
+class Hotel:
+    """Class untuk property/hotel - setiap hotel punya partisi data sendiri"""
+    
+    def __init__(self, hotel_id: str, name: str, address: str = ''):
+        self._hotel_id = hotel_id
+        self._name = name
+        self._address = address
+    
+    @property
+    def hotel_id(self):
+        return self._hotel_id
+    
+    @property
+    def name(self):
+        return self._name
+    
+    @property
+    def address(self):
+        return self._address
+    
+    def to_dict(self) -> Dict:
+        return {
+            'hotel_id': self._hotel_id,
+            'name': self._name,
+            'address': self._address
+        }
+
+
 class Room(ABC):
     """Abstract base class untuk semua jenis kamar hotel"""
     
-    def __init__(self, room_id: str, room_number: str, capacity: int, base_price: float):
+    def __init__(self, room_id: str, room_number: str, capacity: int, base_price: float,
+                 hotel_id: str = DEFAULT_HOTEL_ID):
         self._room_id = room_id
         self._room_number = room_number
         self._capacity = capacity
         self._base_price = base_price
         self._is_available = True
+        self._hotel_id = hotel_id
     
     # Encapsulation - getters
     @property
@@ -30,6 +64,10 @@ class Room(ABC):
     def base_price(self):
         return self._base_price
     
+    @property
+    def hotel_id(self):
+        return self._hotel_id
+    
     @property
     def is_available(self):
         return self._is_available
@@ -63,7 +101,8 @@ class Room(ABC):
             'capacity': self._capacity,
             'base_price': self._base_price,
             'is_available': self._is_available,
-            'amenities': self.get_amenities()
+            'amenities': self.get_amenities(),
+            'hotel_id': self._hotel_id
         }
     
     def __str__(self):
@@ -73,8 +112,8 @@ class Room(ABC):
 class StandardRoom(Room):
     """Class untuk kamar tipe Standard - Inheritance dari Room"""
     
-    def __init__(self, room_id: str, room_number: str):
-        super().__init__(room_id, room_number, capacity=2, base_price=500000)
+    def __init__(self, room_id: str, room_number: str, hotel_id: str = DEFAULT_HOTEL_ID):
+        super().__init__(room_id, room_number, capacity=2, base_price=500000, hotel_id=hotel_id)
     
     # Polymorphism - implementasi method abstrak dari parent class
     def get_room_type(self) -> str:
@@ -91,8 +130,8 @@ class StandardRoom(Room):
 class DeluxeRoom(Room):
     """Class untuk kamar tipe Deluxe - Inheritance dari Room"""
     
-    def __init__(self, room_id: str, room_number: str):
-        super().__init__(room_id, room_number, capacity=3, base_price=800000)
+    def __init__(self, room_id: str, room_number: str, hotel_id: str = DEFAULT_HOTEL_ID):
+        super().__init__(room_id, room_number, capacity=3, base_price=800000, hotel_id=hotel_id)
     
     # Polymorphism - implementasi method abstrak dari parent class
     def get_room_type(self) -> str:
@@ -113,8 +152,8 @@ class DeluxeRoom(Room):
 class SuiteRoom(Room):
     """Class untuk kamar tipe Suite - Inheritance dari Room"""
     
-    def __init__(self, room_id: str, room_number: str):
-        super().__init__(room_id, room_number, capacity=4, base_price=1500000)
+    def __init__(self, room_id: str, room_number: str, hotel_id: str = DEFAULT_HOTEL_ID):
+        super().__init__(room_id, room_number, capacity=4, base_price=1500000, hotel_id=hotel_id)
     
     # Polymorphism - implementasi method abstrak dari parent class
     def get_room_type(self) -> str:
@@ -136,12 +175,14 @@ class SuiteRoom(Room):
 class User:
     """Class untuk user management"""
     
-    def __init__(self, user_id: str, username: str, password: str, role: str, full_name: str):
+    def __init__(self, user_id: str, username: str, password: str, role: str, full_name: str,
+                 hotel_id: Optional[str] = None):
         self._user_id = user_id
         self._username = username
         self._password = password  # In production, hash this!
         self._role = role  # 'admin' or 'tamu'
         self._full_name = full_name
+        self._hotel_id = hotel_id  # None = bisa akses semua property
     
     @property
     def user_id(self):
@@ -163,13 +204,18 @@ class User:
     def full_name(self):
         return self._full_name
     
+    @property
+    def hotel_id(self):
+        return self._hotel_id
+    
     def to_dict(self) -> Dict:
         return {
             'user_id': self._user_id,
             'username': self._username,
             'password': self._password,
             'role': self._role,
-            'full_name': self._full_name
+            'full_name': self._full_name,
+            'hotel_id': self._hotel_id
         }
     
     def check_password(self, password: str) -> bool:
@@ -177,6 +223,9 @@ class User:
     
     def is_admin(self) -> bool:
         return self._role == 'admin'
+    
+    def can_access_hotel(self, hotel_id: str) -> bool:
+        return self._hotel_id is None or self._hotel_id == hotel_id
 
 
 class Booking:
@@ -185,7 +234,8 @@ class Booking:
     def __init__(self, booking_id: str, user_id: str, room_id: str, 
                  check_in: str, check_out: str, nights: int, total_price: float,
                  guest_name: str, guest_phone: str, status: str = 'active',
-                 created_at: Optional[str] = None):
+                 created_at: Optional[str] = None, hotel_id: str = DEFAULT_HOTEL_ID,
+                 room_type: Optional[str] = None, group_id: Optional[str] = None):
         # created_at dibuat optional supaya loading dari JSON yang sudah ada tidak error
         self._booking_id = booking_id
         self._user_id = user_id
@@ -198,6 +248,10 @@ class Booking:
         self._guest_phone = guest_phone
         self._status = status
         self._created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._hotel_id = hotel_id
+        # Diisi jika booking dibuat per tipe kamar; room_id lalu dipilih oleh engine assignment
+        self._room_type = room_type
+        self._group_id = group_id  # Booking bagian dari group booking (lihat BookingGroup)
     
     @property
     def booking_id(self):
@@ -211,6 +265,22 @@ class Booking:
     def room_id(self):
         return self._room_id
     
+    @room_id.setter
+    def room_id(self, value: str):
+        self._room_id = value
+    
+    @property
+    def room_type(self):
+        return self._room_type
+    
+    @property
+    def group_id(self):
+        return self._group_id
+    
+    @property
+    def hotel_id(self):
+        return self._hotel_id
+    
     @property
     def status(self):
         return self._status
@@ -231,5 +301,62 @@ class Booking:
             'guest_name': self._guest_name,
             'guest_phone': self._guest_phone,
             'status': self._status,
-            'created_at': self._created_at
+            'created_at': self._created_at,
+            'hotel_id': self._hotel_id,
+            'room_type': self._room_type,
+            'group_id': self._group_id
+        }
+
+
+class BookingGroup:
+    """Class untuk group booking (rombongan/acara) - induk dari banyak Booking"""
+    
+    def __init__(self, group_id: str, user_id: str, name: str, check_in: str, check_out: str,
+                 booking_ids: List[str], status: str = 'active', created_at: Optional[str] = None,
+                 hotel_id: str = DEFAULT_HOTEL_ID):
+        self._group_id = group_id
+        self._user_id = user_id
+        self._name = name
+        self._check_in = check_in
+        self._check_out = check_out
+        self._booking_ids = list(booking_ids)
+        self._status = status
+        self._created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._hotel_id = hotel_id
+    
+    @property
+    def group_id(self):
+        return self._group_id
+    
+    @property
+    def user_id(self):
+        return self._user_id
+    
+    @property
+    def name(self):
+        return self._name
+    
+    @property
+    def booking_ids(self):
+        return list(self._booking_ids)
+    
+    @property
+    def status(self):
+        return self._status
+    
+    @status.setter
+    def status(self, value: str):
+        self._status = value
+    
+    def to_dict(self) -> Dict:
+        return {
+            'group_id': self._group_id,
+            'user_id': self._user_id,
+            'name': self._name,
+            'check_in': self._check_in,
+            'check_out': self._check_out,
+            'booking_ids': self._booking_ids,
+            'status': self._status,
+            'created_at': self._created_at,
+            'hotel_id': self._hotel_id
         }
@@ -14,4 +14,5 @@ echo.
 echo Press Ctrl+C to stop the server
 echo.
 
+set FLASK_DEBUG=1
 ".venv\Scripts\python.exe" app.py
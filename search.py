@@ -0,0 +1,467 @@
+"""
+Pencarian tamu (nama, telepon, booking ID) untuk resepsionis
+
+Index in-memory per property atas nama tamu yang sudah dinormalisasi (huruf
+kecil, tanpa aksen), digit nomor telepon (+62 disamakan dengan 0), dan
+booking ID. Query 2 huruf menjadi prefix match awal kata, query >= 3 huruf
+menjadi substring match; hasil diurutkan exact > prefix > substring, booking
+aktif dulu, lalu yang terbaru, dan dipaginasi.
+
+Index diupdate incremental dari events.bus (booking.created/updated/deleted).
+Perubahan dari proses lain (worker prefork) terdeteksi dari signature
+bookings.json dan disamakan (diff) saat pencarian berikutnya.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import archive
+import events
+import utils
+
+PER_PAGE = 20
+MIN_TOKEN = 2
+MIN_DIGITS = 3
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+class GuestDoc(NamedTuple):
+    booking_id: str
+    user_id: str
+    guest_name: str
+    guest_phone: str
+    room_id: str
+    check_in: str
+    check_out: str
+    status: str
+    text: str    # nama yang sudah dinormalisasi
+    digits: str  # nomor telepon yang sudah dinormalisasi
+
+
+class SearchPage(NamedTuple):
+    query: str
+    total: int
+    page: int
+    per_page: int
+    results: List[Dict]
+
+    @property
+    def pages(self) -> int:
+        return max((self.total + self.per_page - 1) // self.per_page, 1)
+
+
+def _popcount(bits: int) -> int:
+    return bits.bit_count() if hasattr(bits, 'bit_count') else bin(bits).count('1')
+
+
+@lru_cache(maxsize=65536)
+def normalize_text(value: str) -> str:
+    value = value or ''
+    if not value.isascii():
+        value = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(_NON_ALNUM.sub(' ', value.lower()).split())
+
+
+def normalize_phone(value: str) -> str:
+    digits = re.sub(r'\D', '', value or '')
+    if digits.startswith('62'):
+        digits = '0' + digits[2:]
+    return digits
+
+
+def _grams(value: str) -> List[str]:
+    """Gram kata: awal kata ("^bu") + trigram; dipakai untuk kosakata dan digit"""
+    padded = '^' + value
+    if len(padded) <= 3:
+        return [padded]
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _query_grams(token: str) -> List[str]:
+    # Token pendek hanya bisa dicari sebagai awal kata
+    if len(token) < 3:
+        return ['^' + token]
+    return [token[i:i + 3] for i in range(len(token) - 2)]
+
+
+class GuestIndex:
+    """Index booking satu property
+
+    - nama: posting list per kata + index n-gram atas kosakata, jadi query
+      hanya memindai kosakata (kecil) lalu menggabung posting list kata yang
+      cocok
+    - telepon: posting list per trigram digit, kandidat dari irisan gram
+    - booking ID: lookup langsung
+
+    Himpunan hasil direpresentasikan sebagai bitmap (int Python, bit ke-n =
+    doc_id n) sehingga gabungan, irisan, hitungan, dan ambil-terbaru berjalan
+    di level C. Bitmap kata yang padat di-cache. doc_id naik sesuai urutan
+    insert (arsip dulu, lalu bookings.json) dan dipakai sebagai urutan
+    "terbaru" dalam satu tingkat skor.
+    """
+
+    # Kata dengan posting >= 1/DENSE_RATIO dari semua doc disimpan bitmap-nya
+    # (paling banyak DENSE_RATIO * kata-per-nama bitmap berukuran N/8 byte)
+    DENSE_RATIO = 128
+
+    def __init__(self, hotel_id: str):
+        self.hotel_id = hotel_id
+        self.signature = None
+        self.hot_ids: set = set()  # booking_id (upper) yang ada di bookings.json
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._docs: List[Optional[GuestDoc]] = []
+        self._by_booking: Dict[str, List[int]] = {}
+        self._by_user: Dict[str, array] = {}
+        self._word_docs: Dict[str, array] = {}
+        self._word_bits: Dict[str, int] = {}
+        self._vocab_grams: Dict[str, set] = {}
+        self._digit_docs: Dict[str, array] = {}
+        self._active = 0
+        self._deleted = 0
+
+    def __len__(self):
+        return len(self._by_booking)
+
+    # ---------- build & update ----------
+
+    def build(self, bookings: Iterable) -> 'GuestIndex':
+        with self._lock:
+            self._reset()
+            active = []
+            for booking in bookings:
+                doc_id = self._add(booking.booking_id, booking.user_id, booking._guest_name,
+                                   booking._guest_phone, booking.room_id, booking._check_in,
+                                   booking._check_out, booking.status)
+                if booking.status == 'active':
+                    active.append(doc_id)
+            self._active = self._bits(active)
+        return self
+
+    def _add(self, booking_id: str, user_id: str, guest_name: str, guest_phone: str,
+             room_id: str, check_in: str, check_out: str, status: str) -> int:
+        text = normalize_text(guest_name)
+        digits = normalize_phone(guest_phone)
+        doc_id = len(self._docs)
+        self._docs.append(GuestDoc(booking_id, user_id, guest_name, guest_phone, room_id,
+                                   check_in, check_out, status, text, digits))
+        self._by_booking.setdefault(booking_id.upper(), []).append(doc_id)
+        postings = self._by_user.get(user_id)
+        if postings is None:
+            postings = self._by_user[user_id] = array('i')
+        postings.append(doc_id)
+
+        for word in set(text.split()):
+            postings = self._word_docs.get(word)
+            if postings is None:
+                # Kata baru masuk kosakata
+                postings = self._word_docs[word] = array('i')
+                for gram in _grams(word):
+                    self._vocab_grams.setdefault(gram, set()).add(word)
+            postings.append(doc_id)
+            if word in self._word_bits:
+                self._word_bits[word] |= 1 << doc_id
+
+        for gram in set(_grams(digits)) if len(digits) >= MIN_DIGITS else ():
+            postings = self._digit_docs.get(gram)
+            if postings is None:
+                postings = self._digit_docs[gram] = array('i')
+            postings.append(doc_id)
+        return doc_id
+
+    def add(self, **fields):
+        with self._lock:
+            doc_id = self._add(fields['booking_id'], fields.get('user_id', ''), fields.get('guest_name', ''),
+                               fields.get('guest_phone', ''), fields.get('room_id', ''),
+                               fields.get('check_in', ''), fields.get('check_out', ''),
+                               fields.get('status', 'active'))
+            if self._docs[doc_id].status == 'active':
+                self._active |= 1 << doc_id
+
+    def update(self, booking_id: str, **fields):
+        """Update field non-teks (status, tanggal, kamar) tanpa re-index"""
+        fields = {key: value for key, value in fields.items()
+                  if key in ('status', 'room_id', 'check_in', 'check_out')}
+        if not fields:
+            return
+        with self._lock:
+            for doc_id in self._by_booking.get(booking_id.upper(), []):
+                self._docs[doc_id] = self._docs[doc_id]._replace(**fields)
+                if self._docs[doc_id].status == 'active':
+                    self._active |= 1 << doc_id
+                else:
+                    self._active &= ~(1 << doc_id)
+
+    def remove(self, booking_id: str):
+        # Posting list tidak dibersihkan; doc yang dihapus dikurangkan saat query
+        with self._lock:
+            for doc_id in self._by_booking.pop(booking_id.upper(), []):
+                self._docs[doc_id] = None
+                self._active &= ~(1 << doc_id)
+                self._deleted |= 1 << doc_id
+
+    def refresh(self, hot: Iterable):
+        """Samakan index dengan isi bookings.json terbaru (ditulis proses lain)"""
+        with self._lock:
+            current = set()
+            for booking in hot:
+                key = booking.booking_id.upper()
+                current.add(key)
+                doc_ids = self._by_booking.get(key)
+                if not doc_ids:
+                    self.add(booking_id=booking.booking_id, user_id=booking.user_id,
+                             guest_name=booking._guest_name, guest_phone=booking._guest_phone,
+                             room_id=booking.room_id, check_in=booking._check_in,
+                             check_out=booking._check_out, status=booking.status)
+                    continue
+                doc = self._docs[doc_ids[-1]]
+                fields = {'status': booking.status, 'room_id': booking.room_id,
+                          'check_in': booking._check_in, 'check_out': booking._check_out}
+                if any(getattr(doc, key) != value for key, value in fields.items()):
+                    self.update(booking.booking_id, **fields)
+            for key in self.hot_ids - current:
+                self.remove(key)
+            self.hot_ids = current
+
+    # ---------- bitmap ----------
+
+    def _bits(self, doc_ids: Iterable[int]) -> int:
+        buffer = bytearray((len(self._docs) + 7) // 8)
+        for doc_id in doc_ids:
+            buffer[doc_id >> 3] |= 1 << (doc_id & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def _word_bitmap(self, word: str) -> int:
+        bits = self._word_bits.get(word)
+        if bits is None:
+            postings = self._word_docs[word]
+            bits = self._bits(postings)
+            if len(postings) * self.DENSE_RATIO >= len(self._docs):
+                self._word_bits[word] = bits
+        return bits
+
+    @staticmethod
+    def _newest(bits: int, count: int) -> List[int]:
+        """count doc_id terbesar dari bitmap"""
+        result = []
+        while bits and len(result) < count:
+            doc_id = bits.bit_length() - 1
+            result.append(doc_id)
+            bits ^= 1 << doc_id
+        return result
+
+    # ---------- query ----------
+
+    def _token_tiers(self, token: str) -> Dict[int, int]:
+        """Bitmap booking yang cocok dengan satu token per tingkat: 3 exact, 2 prefix, 1 substring"""
+        words = None
+        for gram in _query_grams(token):
+            matches = self._vocab_grams.get(gram)
+            if not matches:
+                return {}
+            words = set(matches) if words is None else words & matches
+
+        tiers = {3: [], 2: [], 1: []}
+        for word in words:
+            if word == token:
+                tiers[3].append(word)
+            elif word.startswith(token):
+                tiers[2].append(word)
+            elif token in word:
+                tiers[1].append(word)
+
+        result = {}
+        for tier, tier_words in tiers.items():
+            dense = [w for w in tier_words if w in self._word_bits
+                     or len(self._word_docs[w]) * self.DENSE_RATIO >= len(self._docs)]
+            sparse = [self._word_docs[w] for w in tier_words if w not in dense]
+            bits = self._bits(doc_id for postings in sparse for doc_id in postings) if sparse else 0
+            for word in dense:
+                bits |= self._word_bitmap(word)
+            result[tier] = bits
+
+        # Satu booking hanya dihitung di tingkat terbaiknya
+        result[2] &= ~result[3]
+        result[1] &= ~(result[3] | result[2])
+        return result
+
+    def _phone_tiers(self, digits: str) -> Dict[int, int]:
+        postings = sorted((self._digit_docs.get(gram, ()) for gram in set(_query_grams(digits))), key=len)
+        if not postings or not postings[0]:
+            return {}
+        candidates = set(postings[0])
+        for posting in postings[1:3]:
+            candidates.intersection_update(posting)
+
+        tiers = {3: [], 2: [], 1: []}
+        for doc_id in candidates:
+            doc = self._docs[doc_id]
+            if doc is None:
+                continue
+            if doc.digits == digits:
+                tiers[3].append(doc_id)
+            elif doc.digits.startswith(digits):
+                tiers[2].append(doc_id)
+            elif digits in doc.digits:
+                tiers[1].append(doc_id)
+        return {tier: self._bits(doc_ids) for tier, doc_ids in tiers.items()}
+
+    def _buckets(self, tokens: List[str], digits: str, query: str) -> Dict[int, int]:
+        """Bitmap booking yang cocok per skor total"""
+        buckets: Dict[int, int] = {}
+
+        if tokens:
+            per_token = [self._token_tiers(token) for token in tokens]
+            if all(per_token):
+                combos = [(0, -1)]
+                for tiers in per_token:
+                    combos = [(score + tier, bits & tier_bits)
+                              for score, bits in combos
+                              for tier, tier_bits in tiers.items()
+                              if bits & tier_bits]
+                for score, bits in combos:
+                    buckets[score] = buckets.get(score, 0) | bits
+
+        if digits:
+            for tier, bits in self._phone_tiers(digits).items():
+                if bits:
+                    score = tier * len(tokens or [digits])
+                    buckets[score] = buckets.get(score, 0) | bits
+
+        # Booking ID persis selalu paling atas
+        exact = self._by_booking.get(query.strip().upper())
+        if exact:
+            buckets[1000] = self._bits(exact)
+
+        # Booking yang cocok di beberapa skor hanya dihitung di skor tertingginya
+        seen = self._deleted
+        for score in sorted(buckets, reverse=True):
+            buckets[score] &= ~seen
+            seen |= buckets[score]
+        return {score: bits for score, bits in buckets.items() if bits}
+
+    def search(self, query: str, user_id: Optional[str] = None, page: int = 1,
+               per_page: int = PER_PAGE) -> SearchPage:
+        """Cari booking; urutan: skor (exact > prefix > substring), aktif, lalu terbaru"""
+        page = max(page, 1)
+        tokens = [t for t in normalize_text(query).split() if len(t) >= MIN_TOKEN]
+        digits = normalize_phone(query) if re.fullmatch(r'[\d\s+().-]+', query.strip() or 'x') else ''
+        if len(digits) < MIN_DIGITS:
+            digits = ''
+
+        with self._lock:
+            buckets = self._buckets(tokens, digits, query)
+            user_bits = self._bits(self._by_user.get(user_id, ())) if user_id is not None else -1
+
+            # Urutan segmen: skor tertinggi dulu, di dalamnya booking aktif dulu
+            segments = []
+            for score in sorted(buckets, reverse=True):
+                bits = buckets[score] & user_bits
+                segments.append((score, bits & self._active))
+                segments.append((score, bits & ~self._active))
+
+            total = 0
+            skip = (page - 1) * per_page
+            results = []
+            for score, bits in segments:
+                size = _popcount(bits)
+                total += size
+                if len(results) >= per_page or skip >= size:
+                    skip -= min(skip, size)
+                    continue
+                take = min(per_page - len(results), size - skip)
+                for doc_id in self._newest(bits, skip + take)[skip:]:
+                    doc = self._docs[doc_id]
+                    results.append(dict(booking_id=doc.booking_id, user_id=doc.user_id,
+                                        guest_name=doc.guest_name, guest_phone=doc.guest_phone,
+                                        room_id=doc.room_id, check_in=doc.check_in,
+                                        check_out=doc.check_out, status=doc.status, score=score))
+                skip = 0
+
+        return SearchPage(query, total, page, per_page, results)
+
+
+# ==================== INDEX PER PROPERTY ====================
+
+_indexes: Dict[str, GuestIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _signature(hotel_id: str) -> tuple:
+    return (utils.file_signature(utils.bookings_file(hotel_id)),
+            utils.file_signature(os.path.join(archive.archive_dir(hotel_id), 'index.json')))
+
+
+def _all_bookings(hot: List, hotel_id: str) -> Iterable:
+    # Arsip (lebih lama) dulu supaya doc_id mengikuti urutan waktu
+    return archive.merge_hot(archive.iter_archived_bookings(hotel_id=hotel_id), hot,
+                             key=lambda booking: booking.booking_id.upper())
+
+
+def get_index(hotel_id: Optional[str] = None) -> GuestIndex:
+    """Index property: dibangun saat pertama dipakai, disamakan lagi jika data diubah proses lain
+
+    Perubahan bookings.json saja cukup di-refresh (diff); perubahan arsip
+    (booking dipindah ke segment) memicu rebuild penuh.
+    """
+    hotel_id = hotel_id or utils.get_current_hotel()
+    with _indexes_lock:
+        index = _indexes.get(hotel_id)
+        if index is None:
+            index = _indexes[hotel_id] = GuestIndex(hotel_id)
+
+    with index._lock:
+        signature = _signature(hotel_id)
+        if index.signature != signature:
+            with utils.use_hotel(hotel_id):
+                hot = utils.load_bookings()
+            if index.signature is None or index.signature[1] != signature[1]:
+                hot_ids = {booking.booking_id.upper() for booking in hot}
+                index.build(_all_bookings(hot, hotel_id))
+                index.hot_ids = hot_ids
+            else:
+                index.refresh(hot)
+            index.signature = signature
+    return index
+
+
+def search_bookings(query: str, user_id: Optional[str] = None, page: int = 1,
+                    per_page: int = PER_PAGE, hotel_id: Optional[str] = None) -> SearchPage:
+    return get_index(hotel_id).search(query, user_id=user_id, page=page, per_page=per_page)
+
+
+def _on_event(event: Dict):
+    """Subscriber events.bus: update index property yang sudah dibangun"""
+    if not event['kind'].startswith('booking.'):
+        return
+    index = _indexes.get(event['hotel_id'])
+    if index is None or index.signature is None:
+        return
+
+    data = event['data']
+    with index._lock:
+        if event['kind'] == 'booking.created':
+            index.add(**data)
+            index.hot_ids.add(data['booking_id'].upper())
+        elif event['kind'] == 'booking.updated':
+            index.update(data['booking_id'], **{k: v for k, v in data.items() if k != 'booking_id'})
+        elif event['kind'] == 'booking.deleted':
+            index.remove(data['booking_id'])
+            index.hot_ids.discard(data['booking_id'].upper())
+        # Event sudah diterapkan ke index; signature hanya dimajukan jika tulisan
+        # proses ini satu-satunya perubahan. Jika worker lain juga menulis,
+        # signature dibiarkan basi supaya get_index() me-refresh dari file
+        bookings_signature = utils.advance_signature(index.signature[0], utils.bookings_file(event['hotel_id']))
+        index.signature = (bookings_signature, index.signature[1])
+
+
+events.bus.subscribe(_on_event)
@@ -0,0 +1,252 @@
+"""
+Production launcher untuk Sistem Pemesanan Hotel
+
+Data JSON dan template di-preload sekali di proses master sebelum fork,
+sehingga setiap worker berbagi memory copy-on-write dan tidak perlu parse
+ulang file pada request pertama.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+
+import time
+
+_BOOT_STARTED = time.perf_counter()
+
+import argparse
+import gc
+import glob
+import os
+import signal
+import socket
+import sys
+
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.serving import make_server
+
+import events
+import search
+import sharedcache
+import utils
+from app import app, start_event_hub
+
+TEMPLATE_CACHE_DIR = os.path.join('.cache', 'jinja')
+WARMUP_ROUTES = ['/login', '/dashboard', '/rooms', '/bookings', '/bookings/add']
+
+
+class FirstRequestTimer:
+    """WSGI middleware yang mencatat waktu sampai request pertama per proses"""
+
+    def __init__(self, wsgi_app, started: float):
+        self._wsgi_app = wsgi_app
+        self._started = started
+        self._reported = False
+
+    def __call__(self, environ, start_response):
+        result = self._wsgi_app(environ, start_response)
+        if not self._reported:
+            self._reported = True
+            elapsed = (time.perf_counter() - self._started) * 1000
+            message = f"Worker {os.getpid()} request pertama selesai {elapsed:.1f} ms setelah start"
+            print(message, flush=True)
+            utils.log_activity(message, status="INFO")
+        return result
+
+
+def precompile_templates(cache_dir: str = TEMPLATE_CACHE_DIR) -> int:
+    """Compile semua templates/*.html dengan Jinja bytecode cache"""
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    count = 0
+    for path in sorted(glob.glob(os.path.join(template_dir, '*.html'))):
+        app.jinja_env.get_template(os.path.basename(path))
+        count += 1
+    return count
+
+
+def warm_up(routes=WARMUP_ROUTES) -> dict:
+    """Hit hot routes sekali dengan test client (login sebagai admin)"""
+    timings = {}
+    admin = next((u for u in utils.load_users() if u.is_admin()), None)
+
+    with app.test_client() as client:
+        if admin:
+            with client.session_transaction() as sess:
+                sess['user_id'] = admin.user_id
+                sess['username'] = admin.username
+                sess['role'] = admin.role
+                sess['full_name'] = admin.full_name
+
+        for route in routes:
+            started = time.perf_counter()
+            response = client.get(route)
+            timings[route] = (response.status_code, (time.perf_counter() - started) * 1000)
+    return timings
+
+
+def prepare():
+    """Preload cache data + template dan jalankan warm-up sebelum fork"""
+    app.debug = False
+    app.jinja_env.auto_reload = False
+
+    loaded = utils.preload_caches()
+    templates = precompile_templates()
+    timings = warm_up()
+    # Index pencarian tamu dibangun sekali di master, worker berbagi hasilnya
+    indexed = {hotel.hotel_id: len(search.get_index(hotel.hotel_id)) for hotel in utils.load_hotels()}
+
+    print(f"Data di-preload: {loaded}")
+    print(f"Index pencarian tamu: {indexed}")
+    print(f"Template di-compile: {templates}")
+    for route, (status_code, elapsed) in timings.items():
+        print(f"  warm-up {route:<16} {status_code}  {elapsed:6.1f} ms")
+
+    # Objek hasil preload tidak akan dibebaskan, keluarkan dari GC supaya
+    # halaman memory-nya tidak ikut tersentuh (copy-on-write tetap terbagi)
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def _run_worker(sock: socket.socket, host: str, port: int, threaded: bool):
+    server = make_server(host, port, app, threaded=threaded, fd=sock.fileno())
+    server.serve_forever()
+
+
+def _run_event_hub(host: str, sse_port: int, ingest_secret: bytes):
+    hub = events.SSEHub(events.session_authenticator(app))
+    hub.run(host, sse_port, ingest_port=sse_port, ingest_secret=ingest_secret)
+
+
+def serve_prefork(host: str, port: int, workers: int, threaded: bool = True, sse_port: int = 0):
+    """Master bind socket sekali lalu fork worker yang berbagi socket tersebut
+
+    Jika sse_port diisi, SSE hub berjalan di proses tersendiri dan setiap worker
+    meneruskan event perubahan data ke hub tersebut lewat UDP localhost,
+    ditandatangani secret acak yang dibuat ulang setiap peluncuran.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+
+    # Segment rooms/bookings di shared memory, di-map semua worker hasil fork
+    shm_dir = sharedcache.enable()
+    print(f"Cache bersama di {shm_dir}: {sharedcache.publish_all()}")
+
+    children = set()
+    hub_pid = None
+    stopping = False
+
+    ingest_secret = os.urandom(32)
+    if sse_port:
+        app.config['SSE_PORT'] = sse_port
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                if sse_port:
+                    events.bus.forward_to(('127.0.0.1', sse_port), ingest_secret)
+                _run_worker(sock, host, port, threaded)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def spawn_hub():
+        nonlocal hub_pid
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            sock.close()
+            try:
+                _run_event_hub(host, sse_port, ingest_secret)
+            finally:
+                os._exit(0)
+        hub_pid = pid
+        children.add(pid)
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    if sse_port:
+        spawn_hub()
+    for _ in range(workers):
+        spawn()
+
+    ready = (time.perf_counter() - _BOOT_STARTED) * 1000
+    print(f"Listening on http://{host}:{port} dengan {workers} worker (siap dalam {ready:.1f} ms)", flush=True)
+    utils.log_activity(f"Production server start: {workers} worker, port {port}, siap dalam {ready:.1f} ms",
+                       status="INFO")
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if stopping:
+            continue
+        if pid == hub_pid:
+            print(f"SSE hub {pid} berhenti, spawn ulang", flush=True)
+            spawn_hub()
+        else:
+            print(f"Worker {pid} berhenti, spawn ulang", flush=True)
+            spawn()
+
+    sock.close()
+    sharedcache.disable()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Production server Sistem Pemesanan Hotel")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Jumlah proses worker (prefork)")
+    parser.add_argument('--no-threads', action='store_true',
+                        help="Setiap worker melayani satu request dalam satu waktu")
+    parser.add_argument('--sse-port', type=int, default=None,
+                        help="Port SSE hub untuk live update (default: port + 1, 0 = nonaktif)")
+    parser.add_argument('--debug', action='store_true', help="Aktifkan Flask debug (jangan di production)")
+    args = parser.parse_args(argv)
+    sse_port = args.port + 1 if args.sse_port is None else args.sse_port
+
+    prepare()
+    app.wsgi_app = FirstRequestTimer(app.wsgi_app, _BOOT_STARTED)
+
+    if args.debug:
+        app.run(debug=True, host=args.host, port=args.port)
+        return
+
+    # Windows tidak punya fork, fallback ke satu proses multi-thread
+    if args.workers <= 1 or not hasattr(os, 'fork'):
+        if sse_port:
+            start_event_hub(args.host, sse_port)
+        server = make_server(args.host, args.port, app, threaded=not args.no_threads)
+        ready = (time.perf_counter() - _BOOT_STARTED) * 1000
+        print(f"Listening on http://{args.host}:{args.port} (siap dalam {ready:.1f} ms)", flush=True)
+        server.serve_forever()
+    else:
+        serve_prefork(args.host, args.port, args.workers, threaded=not args.no_threads, sse_port=sse_port)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
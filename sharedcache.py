@@ -0,0 +1,466 @@
+"""
+Shared-memory read cache untuk rooms.json & bookings.json (mode prefork)
+
+Tanpa modul ini setiap worker memegang hasil parse sendiri dan, setelah ada
+perubahan data, parse ulang seluruh file secara terpisah. Di sini setiap file
+di-encode sekali ke segment mmap (default di /dev/shm) yang dipakai bersama
+oleh semua worker:
+
+- records: tiap record sebagai JSON compact + tabel offset
+- index key (booking_id / room_id) terurut untuk point lookup dengan bisect
+- posting list per nilai field (user_id, status, room_type)
+- kolom tanggal (YYYYMMDD int32) untuk filter rentang check-in/check-out
+
+Segment dibangun ulang oleh proses yang baru saja menulis file JSON, masih di
+dalam lock partisi (jadi hanya ada satu penulis per file), lewat file temp +
+rename. Header segment berisi generation; segment lama diberi tanda
+`superseded` sehingga reader cukup membaca satu word di memory untuk tahu
+kapan harus map ulang. Reader juga mencocokkan (mtime, size, inode) file JSON: jika
+berbeda (segment sedang dibangun ulang atau file diubah proses lain),
+select() mengembalikan None dan pemanggil memakai jalur JSON biasa.
+"""
+
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from json.encoder import c_encode_basestring, c_make_encoder
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Field yang di-index per nama file data
+SPECS = {
+    'bookings.json': {'key': 'booking_id', 'terms': ('user_id', 'status'), 'dates': ('check_in', 'check_out')},
+    'rooms.json': {'key': 'room_id', 'terms': ('room_type',), 'dates': ()},
+}
+
+MAGIC = b'HOTELSHM'
+FORMAT = 2
+# magic, format, panjang TOC, generation, superseded, mtime_ns, size, jumlah record, inode
+HEADER = struct.Struct('<8sIIQQqqQQ')
+SUPERSEDED_OFFSET = 24
+
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}\Z')
+_DATES = re.compile(r'(?:\d{4}-\d{2}-\d{2}\n)*\d{4}-\d{2}-\d{2}')
+
+# Encoder C dibuat sekali: JSONEncoder.encode membuat encoder baru di setiap panggilan
+if c_make_encoder is not None:
+    _c_encoder = c_make_encoder(None, json.JSONEncoder().default, c_encode_basestring, None,
+                                ':', ',', False, False, True)
+
+    def _encode(record: Dict) -> str:
+        return ''.join(_c_encoder(record, 0))
+else:
+    _encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+_directory: Optional[str] = None
+_owner_pid: Optional[int] = None
+_subscribed = False
+# Segment yang sudah di-map di proses ini, per path file data
+_segments: Dict[str, 'Segment'] = {}
+
+
+def enabled() -> bool:
+    return _directory is not None
+
+
+def segment_path(path: str) -> str:
+    """Lokasi segment untuk file data (nama dari path absolut file)"""
+    name = os.path.abspath(path).strip(os.sep).replace(os.sep, '__')
+    return os.path.join(_directory, f"{name}.seg")
+
+
+def _signature(path: str) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _date_value(value) -> Optional[int]:
+    if isinstance(value, str) and _DATE.match(value):
+        return int(value[:4] + value[5:7] + value[8:])
+    return None
+
+
+# ==================== ENCODING ====================
+
+def _string_table(values: List[bytes]) -> Tuple[bytes, array]:
+    return b''.join(values), array('Q', accumulate(map(len, values), initial=0))
+
+
+def encode(records: list, spec: Dict) -> Dict[str, object]:
+    """Section segment untuk satu file: {nama: bytes atau array}"""
+    sections: Dict[str, object] = {}
+    encoded = [_encode(record).encode('utf-8') for record in records]
+    # Record disusun sebagai array JSON valid: record i = blob[starts[i]:starts[i+1]-1]
+    starts = array('Q', accumulate((len(data) + 1 for data in encoded), initial=1))
+    sections['records'] = b'[' + b','.join(encoded) + b']'
+    sections['starts'] = starts
+
+    # Field dengan nilai bukan string (atau tanggal tidak standar) tidak di-index;
+    # filter-nya tetap dicek pada record yang sudah di-decode
+    key = spec['key']
+    keys = [record.get(key) for record in records]
+    if all(isinstance(value, str) for value in keys):
+        keys = [value.encode('utf-8') for value in keys]
+        order = sorted(range(len(keys)), key=lambda i: (keys[i], i))
+        sections['key.blob'], sections['key.offsets'] = _string_table([keys[i] for i in order])
+        sections['key.rows'] = array('I', order)
+
+    for field in spec['terms']:
+        values = [record.get(field) for record in records]
+        if not all(isinstance(value, str) for value in values):
+            continue
+        terms = sorted({value.encode('utf-8') for value in values})
+        codes = {term.decode('utf-8'): code for code, term in enumerate(terms)}
+        column = array('I', [codes[value] for value in values])
+        postings = [[] for _ in terms]
+        for row, code in enumerate(column):
+            postings[code].append(row)
+        posting_starts = array('Q', [0])
+        rows = array('I')
+        for posting in postings:
+            rows.extend(posting)
+            posting_starts.append(len(rows))
+        sections[f'{field}.blob'], sections[f'{field}.offsets'] = _string_table(terms)
+        sections[f'{field}.starts'] = posting_starts
+        sections[f'{field}.rows'] = rows
+        sections[f'{field}.codes'] = column
+
+    for field in spec['dates']:
+        values = [record.get(field) for record in records]
+        if not values or not all(isinstance(value, str) for value in values):
+            continue
+        joined = '\n'.join(values)
+        if _DATES.fullmatch(joined):
+            sections[f'{field}.date'] = array('i', map(int, joined.replace('-', '').split('\n')))
+    return sections
+
+
+def write_segment(target: str, key: str, sections: Dict[str, object], generation: int,
+                  signature: Tuple[int, int, int], count: int):
+    toc = {'key': key, 'sections': {}}
+    position = 0
+    for name, section in sections.items():
+        data_length = len(section) * (section.itemsize if isinstance(section, array) else 1)
+        toc['sections'][name] = [position, data_length, section.typecode if isinstance(section, array) else 'B']
+        position += (data_length + 7) // 8 * 8
+    toc_bytes = json.dumps(toc).encode('utf-8')
+    toc_bytes += b' ' * (-(HEADER.size + len(toc_bytes)) % 8)
+    base = HEADER.size + len(toc_bytes)
+
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT, len(toc_bytes), generation, 0, signature[0], signature[1], count,
+                                 signature[2]))
+            f.write(toc_bytes)
+            for name, section in sections.items():
+                f.seek(base + toc['sections'][name][0])
+                f.write(section)
+            f.truncate(base + position)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Segment lama ditandai superseded setelah yang baru terpasang
+    try:
+        old = os.open(target, os.O_RDWR)
+    except FileNotFoundError:
+        old = None
+    try:
+        os.replace(tmp_path, target)
+        if old is not None:
+            os.pwrite(old, struct.pack('<Q', generation), SUPERSEDED_OFFSET)
+    finally:
+        if old is not None:
+            os.close(old)
+
+
+def _generation(target: str) -> int:
+    try:
+        with open(target, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) == HEADER.size and header[:8] == MAGIC:
+            return HEADER.unpack(header)[3]
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def publish(path: str, data: Optional[list] = None) -> Optional[int]:
+    """Bangun ulang segment file data, return generation baru
+
+    Harus dipanggil oleh penulis file (di dalam lock partisi). data = isi file
+    yang baru ditulis; None = baca dari disk.
+    """
+    spec = SPECS.get(os.path.basename(path))
+    if _directory is None or spec is None or not os.path.exists(path):
+        return None
+    signature = _signature(path)
+    if data is None:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except ValueError:
+            # File rusak: segment lama (jika ada) tidak cocok lagi, reader pakai jalur JSON
+            return None
+    if not isinstance(data, list) or not all(isinstance(record, dict) for record in data):
+        return None
+    target = segment_path(path)
+    generation = _generation(target) + 1
+    write_segment(target, spec['key'], encode(data, spec), generation, signature, len(data))
+    return generation
+
+
+def _on_write(path: str, previous: Optional[list], data: Optional[list]):
+    publish(path, data)
+
+
+def publish_all() -> Dict[str, int]:
+    """Bangun segment semua partisi (dipanggil master sebelum fork worker)"""
+    import utils
+    published = {}
+    for hotel in utils.load_hotels():
+        with utils.partition_lock(hotel.hotel_id):
+            for path in (utils.rooms_file(hotel.hotel_id), utils.bookings_file(hotel.hotel_id)):
+                try:
+                    data = utils.read_json(path) if os.path.exists(path) else None
+                except ValueError:
+                    data = None   # file rusak: worker tetap memakai jalur JSON (dan log error-nya)
+                if data is not None and publish(path, data):
+                    published[os.path.relpath(path, utils.DATA_DIR)] = len(data)
+    return published
+
+
+def enable(directory: Optional[str] = None) -> str:
+    """Aktifkan cache bersama di proses ini (dan worker hasil fork)
+
+    Setiap penulisan rooms.json/bookings.json lewat utils akan membangun ulang
+    segment-nya. Default folder: $HOTEL_SHM_DIR atau /dev/shm/hotel-<pid>.
+    """
+    global _directory, _owner_pid, _subscribed
+    import utils
+    if directory is None:
+        base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        directory = os.environ.get('HOTEL_SHM_DIR') or os.path.join(base, f"hotel-{os.getpid()}")
+    os.makedirs(directory, exist_ok=True)
+    if not _subscribed:
+        utils.subscribe_writes(_on_write)
+        _subscribed = True
+    _directory = directory
+    _owner_pid = os.getpid()
+    return directory
+
+
+def disable():
+    """Nonaktifkan; folder segment dihapus oleh proses yang mengaktifkan"""
+    global _directory
+    directory = _directory
+    _directory = None
+    _segments.clear()
+    if directory and os.getpid() == _owner_pid:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# ==================== READER ====================
+
+class _Strings:
+    """Tabel string terurut di segment sebagai sequence bytes (untuk bisect)"""
+
+    def __init__(self, blob: memoryview, offsets: memoryview):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+    def find(self, value: str) -> int:
+        """Index value, -1 jika tidak ada"""
+        target = value.encode('utf-8')
+        index = bisect_left(self, target)
+        return index if index < len(self) and self[index] == target else -1
+
+
+class Segment:
+    """Segment yang sudah di-map; semua section adalah view ke memory bersama (tanpa copy)"""
+
+    def __init__(self, target: str):
+        with open(target, 'rb') as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, toc_length, self.generation, _, mtime_ns, size, self.count, source_inode = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT:
+            raise ValueError(f"{target}: bukan segment format {FORMAT}")
+        self.signature = (mtime_ns, size, source_inode)
+        view = memoryview(self._map)
+        toc = json.loads(bytes(view[HEADER.size:HEADER.size + toc_length]))
+        self.key_field = toc['key']
+        base = HEADER.size + toc_length
+        self.sections = {}
+        for name, (offset, length, typecode) in toc['sections'].items():
+            section = view[base + offset:base + offset + length]
+            self.sections[name] = section if typecode == 'B' else section.cast(typecode)
+        self._records = self.sections['records']
+        self._starts = self.sections['starts']
+
+    @property
+    def superseded(self) -> bool:
+        return struct.unpack_from('<Q', self._map, SUPERSEDED_OFFSET)[0] != 0
+
+    def record(self, row: int) -> Dict:
+        return json.loads(self._records[self._starts[row]:self._starts[row + 1] - 1].tobytes())
+
+    def records(self) -> list:
+        """Semua record dengan satu json.loads (blob records adalah array JSON)"""
+        return json.loads(self._records.tobytes())
+
+    def key_rows(self, value: str) -> List[int]:
+        """Baris dengan key = value, urut file (ID dobel tetap semua)"""
+        keys = _Strings(self.sections['key.blob'], self.sections['key.offsets'])
+        rows = self.sections['key.rows']
+        target = value.encode('utf-8')
+        index = bisect_left(keys, target)
+        found = []
+        while index < len(keys) and keys[index] == target:
+            found.append(rows[index])
+            index += 1
+        return found
+
+    def term_codes(self, field: str, values) -> Optional[set]:
+        """Kode nilai field yang ada di segment; None jika field tidak di-index"""
+        if f'{field}.blob' not in self.sections:
+            return None
+        terms = _Strings(self.sections[f'{field}.blob'], self.sections[f'{field}.offsets'])
+        codes = {terms.find(value) for value in values if isinstance(value, str)}
+        codes.discard(-1)
+        return codes
+
+    def posting_size(self, field: str, codes: set) -> int:
+        starts = self.sections[f'{field}.starts']
+        return sum(starts[code + 1] - starts[code] for code in codes)
+
+    def posting_rows(self, field: str, codes: set) -> List[int]:
+        starts = self.sections[f'{field}.starts']
+        rows = self.sections[f'{field}.rows']
+        merged = []
+        for code in codes:
+            merged.extend(rows[starts[code]:starts[code + 1]].tolist())
+        if len(codes) > 1:
+            merged.sort()
+        return merged
+
+    def select(self, key: Optional[str] = None, terms: Optional[Dict[str, tuple]] = None,
+               ranges: Optional[Dict[str, tuple]] = None) -> Iterator[Dict]:
+        """Record yang cocok, urut file
+
+        key = nilai key field; terms = {field: nilai yang diterima}; ranges =
+        {field: (min, max)} inklusif dengan perbandingan string seperti loader
+        JSON (None = tanpa batas). Kandidat diambil dari index paling
+        selektif; filter lain dicek lewat kolom sebelum record di-decode.
+        """
+        record_checks = []   # filter tanpa index, dicek setelah decode
+        candidates = None
+        if key is not None:
+            if 'key.blob' in self.sections:
+                candidates = self.key_rows(key)
+            else:
+                record_checks.append(lambda record: record.get(self.key_field) == key)
+
+        indexed = []
+        for field, values in (terms or {}).items():
+            if values is None:
+                continue
+            codes = self.term_codes(field, values)
+            if codes is None:
+                record_checks.append(lambda record, f=field, v=values: record.get(f) in v)
+            elif not codes:
+                return
+            else:
+                indexed.append((self.posting_size(field, codes), field, codes))
+        indexed.sort(key=lambda item: item[0])
+        if indexed and candidates is None:
+            _, field, codes = indexed.pop(0)
+            candidates = self.posting_rows(field, codes)
+        columns = [(self.sections[f'{field}.codes'], codes) for _, field, codes in indexed]
+
+        dates = []
+        for field, (low, high) in (ranges or {}).items():
+            column = self.sections.get(f'{field}.date')
+            low_value, high_value = _date_value(low), _date_value(high)
+            if column is not None and (low is None) == (low_value is None) and \
+                    (high is None) == (high_value is None):
+                dates.append((column, low_value, high_value))
+            elif low is not None or high is not None:
+                record_checks.append(lambda record, f=field, lo=low, hi=high:
+                                     (lo is None or record[f] >= lo) and (hi is None or record[f] <= hi))
+
+        for row in (range(self.count) if candidates is None else candidates):
+            if any(column[row] not in codes for column, codes in columns):
+                continue
+            if any((low is not None and column[row] < low) or (high is not None and column[row] > high)
+                   for column, low, high in dates):
+                continue
+            record = self.record(row)
+            if all(check(record) for check in record_checks):
+                yield record
+
+
+def open_segment(path: str) -> Optional[Segment]:
+    """Segment untuk file data jika ada dan masih sama dengan file di disk"""
+    if _directory is None or os.path.basename(path) not in SPECS:
+        return None
+    try:
+        signature = _signature(path)
+    except FileNotFoundError:
+        return None
+    segment = _segments.get(path)
+    if segment is not None and not segment.superseded and segment.signature == signature:
+        return segment
+    # Belum di-map, sudah diganti generation baru, atau tanda superseded belum terpasang
+    target = segment_path(path)
+    try:
+        if segment is not None and not segment.superseded and os.stat(target).st_ino == segment.inode:
+            return None   # file JSON diubah di luar penulis yang membangun segment
+        segment = Segment(target)
+    except (FileNotFoundError, ValueError):
+        _segments.pop(path, None)
+        return None
+    _segments[path] = segment
+    return segment if segment.signature == signature else None
+
+
+def select(path: str, key: Optional[str] = None, terms: Optional[Dict[str, tuple]] = None,
+           ranges: Optional[Dict[str, tuple]] = None) -> Optional[Iterator[Dict]]:
+    """Segment.select untuk file data, None jika segment tidak tersedia (pakai jalur JSON)"""
+    segment = open_segment(path)
+    if segment is None:
+        return None
+    return segment.select(key, terms, ranges)
+
+
+def load(path: str) -> Optional[list]:
+    """Semua record file data dari segment (parse cold tanpa membaca file JSON)"""
+    segment = open_segment(path)
+    return None if segment is None else segment.records()
+
+
+def stats() -> Dict:
+    """Segment yang di-map proses ini (untuk /logs/io)"""
+    return {
+        'enabled': _directory is not None,
+        'directory': _directory,
+        'segments': {path: {'generation': segment.generation, 'records': segment.count,
+                            'bytes': len(segment._map), 'superseded': segment.superseded}
+                     for path, segment in list(_segments.items())},
+    }
@@ -0,0 +1,164 @@
+"""
+Test script untuk arsip booking (hot -> segment gzip) dan lookup arsip
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+print("="*60)
+print("TEST ARSIP BOOKING")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='archive-')
+cwd = os.getcwd()
+os.chdir(scratch)
+shutil.copytree(source, 'data', ignore=shutil.ignore_patterns('*.tmp', '.lock'))
+
+import archive
+import utils
+
+TODAY = date.today()
+
+
+def booking(number, user_id, check_out, status):
+    check_out = TODAY + timedelta(days=check_out)
+    return {'booking_id': f"B{number:04d}", 'user_id': user_id, 'room_id': 'R001',
+            'check_in': (check_out - timedelta(days=1)).isoformat(), 'check_out': check_out.isoformat(),
+            'nights': 1, 'total_price': 500000, 'guest_name': 'Budi', 'guest_phone': '0812',
+            'status': status, 'created_at': '2025-01-01 10:00:00', 'hotel_id': 'main'}
+
+
+def write_bookings(records):
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+
+
+def hot_ids():
+    return [b.booking_id for b in utils.load_bookings()]
+
+
+def user_ids(user_id):
+    return sorted(b.booking_id for b in utils.get_user_bookings(user_id))
+
+
+opened = []
+read_segment = archive._read_segment
+
+
+def counting_read_segment(hotel_id, segment):
+    opened.append(segment['segment'])
+    return read_segment(hotel_id, segment)
+
+
+archive._read_segment = counting_read_segment
+
+try:
+    # Test 1: Booking closed yang lama pindah dari bookings.json ke segment
+    print("\n1. TEST PINDAH HOT -> ARSIP")
+    print("-" * 60)
+    write_bookings([booking(1, 'U001', -200, 'completed'), booking(2, 'U002', -150, 'cancelled'),
+                    booking(3, 'U002', 30, 'active'), booking(4, 'U002', -10, 'completed'),
+                    booking(5, 'U001', -120, 'completed')])
+    assert archive.archive_closed_bookings(days=90) == 3
+    assert hot_ids() == ['B0003', 'B0004']
+    index = archive.load_index()
+    assert [(s['segment'], s['count'], s['booking_id_min'], s['booking_id_max']) for s in index] == \
+        [('seg-000001.jsonl.gz', 3, 'B0001', 'B0005')]
+    assert index[0]['user_ids'] == ['U001', 'U002'] and index[0]['revenue'] == 1000000
+    assert archive.archive_closed_bookings(days=90) == 0
+    assert utils._next_booking_id(utils.load_bookings()) == 'B0006'
+    print("✅ BERHASIL: 3 booking diarsipkan, aktif & yang baru selesai tetap di hot")
+
+    # Test 2: Lookup jatuh ke arsip, segment di luar range tidak dibuka
+    print("\n2. TEST LOOKUP ARSIP")
+    print("-" * 60)
+    del opened[:]
+    assert utils.get_booking_by_id('B0004').status == 'completed' and opened == []
+    assert utils.get_booking_by_id('B0009') is None and opened == []
+    assert utils.get_booking_by_id('B0002').status == 'cancelled' and opened == ['seg-000001.jsonl.gz']
+    assert user_ids('U002') == ['B0002', 'B0003', 'B0004']
+    assert user_ids('U404') == [] and len(opened) == 2
+    assert utils.hotel_stats('main')['total_bookings'] == 5
+    print("✅ BERHASIL: detail & riwayat tamu menggabungkan hot + arsip")
+
+    # Test 3: Proses mati setelah segment ditulis -> hot menang, run berikutnya membereskan
+    print("\n3. TEST CRASH SEBELUM BOOKINGS.JSON DISIMPAN")
+    print("-" * 60)
+    write_bookings([booking(3, 'U002', 30, 'active'), booking(4, 'U002', -10, 'completed'),
+                    booking(6, 'U001', -100, 'completed')])
+    write_json = utils.write_json
+
+    def crashing_write_json(path, data):
+        if path == utils.bookings_file():
+            raise OSError("disk penuh")
+        write_json(path, data)
+
+    utils.write_json = crashing_write_json
+    try:
+        archive.archive_closed_bookings(days=90)
+        raise AssertionError("crash tidak naik")
+    except OSError:
+        pass
+    finally:
+        utils.write_json = write_json
+    assert len(archive.load_index()) == 2 and 'B0006' in hot_ids()
+    assert user_ids('U001') == ['B0001', 'B0005', 'B0006']
+    assert utils.update_booking_status('B0006', 'cancelled', 'admin')
+    assert utils.get_booking_by_id('B0006').status == 'cancelled'
+    assert [b.status for b in utils.get_user_bookings('U001') if b.booking_id == 'B0006'] == ['cancelled']
+
+    assert archive.archive_closed_bookings(days=90) == 1
+    assert hot_ids() == ['B0003', 'B0004']
+    assert [s['segment'] for s in archive.load_index()] == ['seg-000001.jsonl.gz', 'seg-000002.jsonl.gz']
+    archived = [b.booking_id for b in archive.iter_archived_bookings()]
+    assert sorted(archived) == ['B0001', 'B0002', 'B0005', 'B0006']
+    assert archive.find_archived_booking('B0006').status == 'cancelled'
+    assert utils.read_json(os.path.join(archive.archive_dir(), 'pending.json')) == []
+    print("✅ BERHASIL: record dobel dibaca sekali (hot menang), segment yang belum selesai diarsipkan ulang")
+
+    # Test 4: Proses mati setelah bookings.json disimpan -> segment satu-satunya salinan, dipertahankan
+    print("\n4. TEST CRASH SETELAH BOOKINGS.JSON DISIMPAN")
+    print("-" * 60)
+    pending_file = os.path.join(archive.archive_dir(), 'pending.json')
+    write_bookings([booking(3, 'U002', 30, 'active'), booking(4, 'U002', -10, 'completed'),
+                    booking(7, 'U001', -100, 'completed')])
+
+    def crashing_write_json(path, data):
+        if path == pending_file and data == []:
+            raise OSError("disk penuh")
+        write_json(path, data)
+
+    utils.write_json = crashing_write_json
+    try:
+        archive.archive_closed_bookings(days=90)
+        raise AssertionError("crash tidak naik")
+    except OSError:
+        pass
+    finally:
+        utils.write_json = write_json
+    assert hot_ids() == ['B0003', 'B0004']
+    assert utils.read_json(pending_file) == [{'segment': 'seg-000003.jsonl.gz', 'booking_ids': ['B0007']}]
+
+    write_bookings([booking(3, 'U002', 30, 'active'), booking(4, 'U002', -10, 'completed'),
+                    booking(8, 'U001', -100, 'cancelled')])
+    assert archive.archive_closed_bookings(days=90) == 1
+    assert [s['segment'] for s in archive.load_index()] == \
+        ['seg-000001.jsonl.gz', 'seg-000002.jsonl.gz', 'seg-000003.jsonl.gz', 'seg-000004.jsonl.gz']
+    assert archive.find_archived_booking('B0007').status == 'completed'
+    assert archive.find_archived_booking('B0008').status == 'cancelled'
+    assert user_ids('U001') == ['B0001', 'B0005', 'B0006', 'B0007', 'B0008']
+    assert utils.read_json(pending_file) == []
+    print("✅ BERHASIL: segment yang sudah lepas dari hot tetap di index, nama segment tidak dipakai ulang")
+finally:
+    archive._read_segment = read_segment
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST ARSIP BOOKING BERHASIL! ✅")
+print("="*60)
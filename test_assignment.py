@@ -0,0 +1,78 @@
+"""
+Test script untuk engine assignment kamar
+Sistem Pemesanan Hotel
+"""
+
+import random
+from itertools import combinations
+
+from assignment import Stay, assign_rooms, nightly_occupancy
+
+print("="*60)
+print("TEST ENGINE ASSIGNMENT KAMAR")
+print("="*60)
+
+
+def no_overlap(stays, assignment):
+    by_room = {}
+    for stay in stays:
+        if stay.key in assignment:
+            by_room.setdefault(assignment[stay.key], []).append((stay.start, stay.end))
+    for intervals in by_room.values():
+        intervals.sort()
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            if start < end:
+                return False
+    return True
+
+
+def brute_force_max(stays, rooms):
+    """Jumlah stay maksimal yang muat (cek semua subset, hanya untuk data kecil)"""
+    for size in range(len(stays), -1, -1):
+        for subset in combinations(stays, size):
+            if max(nightly_occupancy(subset, 0, 20), default=0) <= rooms:
+                return size
+    return 0
+
+
+# Test 1: Tidak ada double booking di satu kamar
+print("\n1. TEST TIDAK ADA OVERLAP PER KAMAR")
+print("-" * 60)
+rng = random.Random(1)
+stays = [Stay(i, s, s + rng.randint(1, 5)) for i, s in enumerate(rng.randrange(30) for _ in range(300))]
+assignment, unplaced = assign_rooms(stays, [f"R{i}" for i in range(15)])
+assert no_overlap(stays, assignment)
+assert len(assignment) + len(unplaced) == len(stays)
+print(f"✅ BERHASIL: {len(assignment)} stay ditempatkan tanpa overlap, {len(unplaced)} tidak muat")
+
+# Test 2: Jumlah stay yang muat optimal (dibanding brute force)
+print("\n2. TEST OPTIMALITAS VS BRUTE FORCE")
+print("-" * 60)
+for seed in range(30):
+    rng = random.Random(seed)
+    rooms = rng.randint(1, 3)
+    stays = []
+    for i in range(8):
+        start = rng.randrange(10)
+        stays.append(Stay(i, start, start + rng.randint(1, 4)))
+    assignment, _ = assign_rooms(stays, [f"R{i}" for i in range(rooms)])
+    assert len(assignment) == brute_force_max(stays, rooms), seed
+print("✅ BERHASIL: 30 kasus acak, jumlah stay selalu maksimal")
+
+# Test 3: Stay terkunci tetap di kamarnya dan celah satu malam terisi
+print("\n3. TEST STAY TERKUNCI & CELAH SATU MALAM")
+print("-" * 60)
+stays = [
+    Stay('pinned', 0, 2, 'R1'),
+    Stay('a', 2, 5),
+    Stay('b', 3, 4),
+    Stay('c', 4, 6),
+]
+assignment, unplaced = assign_rooms(stays, ['R1', 'R2'])
+assert assignment['pinned'] == 'R1'
+assert not unplaced and no_overlap(stays, assignment)
+print(f"✅ BERHASIL: {assignment}")
+
+print("\n" + "="*60)
+print("SEMUA TEST ASSIGNMENT BERHASIL! ✅")
+print("="*60)
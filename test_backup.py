@@ -0,0 +1,112 @@
+"""
+Test script untuk backup online & point-in-time restore
+Sistem Pemesanan Hotel
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+print("="*60)
+print("TEST BACKUP & RESTORE")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='backup-')
+cwd = os.getcwd()
+shutil.copytree(source, os.path.join(scratch, 'data'))
+os.chdir(scratch)
+
+import backup
+import utils
+
+
+def data_state():
+    """Isi semua file data (bytes) saat ini"""
+    state = {}
+    for path in backup._data_files():
+        with open(path, 'rb') as f:
+            state[backup._rel(path)] = f.read()
+    return state
+
+
+def restored_state(target):
+    state = {}
+    for dirpath, _, filenames in os.walk(target):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                state[os.path.relpath(path, target).replace(os.sep, '/')] = f.read()
+    return state
+
+
+def checkpoint():
+    backup.journal.flush()
+    time.sleep(0.01)
+    return time.time_ns(), data_state()
+
+
+try:
+    backup.install_journal()
+
+    # Test 1: Snapshot pertama + dedup snapshot kedua
+    print("\n1. TEST SNAPSHOT")
+    print("-" * 60)
+    first = backup.take_snapshot()
+    assert first['stats']['changed'] == first['stats']['files'] > 0
+    second = backup.take_snapshot()
+    assert second['stats']['changed'] == 0 and second['stats']['new_objects'] == 0
+    assert second['stats']['lock_ms'] < 50
+    print(f"✅ BERHASIL: {first['stats']['files']} file, snapshot kedua tidak menyalin ulang "
+          f"(lock {second['stats']['lock_ms']:.2f} ms)")
+
+    # Test 2: Mutasi dicatat per record di journal
+    print("\n2. TEST JOURNAL")
+    print("-" * 60)
+    points = [checkpoint()]
+    booking = utils.create_booking('U002', 'R001', '2026-11-01', '2026-11-03', 2, 'Budi', '0812', 'tamu1')
+    points.append(checkpoint())
+    utils.update_booking_status(booking.booking_id, 'completed', 'admin')
+    points.append(checkpoint())
+    utils.delete_booking('B0001', 'admin')
+    utils.create_room('Suite', '999', 'admin')
+    utils.write_json(os.path.join(utils.DATA_DIR, 'promo.json'), [{'kode': 'HEMAT10'}])   # file baru
+    points.append(checkpoint())
+    entries = list(backup.iter_journal(second['ts'], time.time_ns()))
+    bookings_entries = [e for e in entries if e['file'] == 'bookings.json']
+    # Tulis pertama menormalkan semua record lama (disimpan penuh); setelahnya hanya record yang berubah
+    assert [e['op'] for e in bookings_entries] == ['full', 'diff', 'diff']
+    assert [len(e['upsert']) for e in bookings_entries[1:]] == [1, 0]
+    assert bookings_entries[-1]['delete'] == [['B0001', 0]]
+    assert [e['op'] for e in entries if e['file'] == 'promo.json'] == ['full']
+    print(f"✅ BERHASIL: {len(entries)} mutasi tercatat, bookings.json sebagai diff per record")
+
+    # Test 3: Restore ke setiap titik waktu = isi data saat itu (byte per byte)
+    print("\n3. TEST POINT-IN-TIME RESTORE")
+    print("-" * 60)
+    for number, (ts, expected) in enumerate(points):
+        target = f"restored-{number}"
+        result = backup.restore(ts, target)
+        assert restored_state(target) == expected, f"titik {number} berbeda"
+    third = backup.take_snapshot()
+    assert 0 < third['stats']['changed'] < third['stats']['files']
+    print(f"✅ BERHASIL: {len(points)} titik waktu identik, restore terakhir "
+          f"{result['journal_entries']} mutasi dalam {result['duration_ms']:.0f} ms")
+
+    # Test 4: Prune menyisakan snapshot terbaru yang tetap bisa di-restore
+    print("\n4. TEST PRUNE")
+    print("-" * 60)
+    removed = backup.prune(keep=1)
+    assert removed['snapshots'] == 2
+    ts, expected = checkpoint()
+    backup.restore(ts, 'restored-after-prune')
+    assert restored_state('restored-after-prune') == expected
+    print(f"✅ BERHASIL: {removed}")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST BACKUP BERHASIL! ✅")
+print("="*60)
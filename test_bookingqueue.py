@@ -0,0 +1,188 @@
+"""
+Test script untuk antrian booking (single writer + admission control)
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+print("="*60)
+print("TEST ANTRIAN BOOKING")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='bookingqueue-')
+cwd = os.getcwd()
+os.chdir(scratch)
+
+import bookingqueue
+import utils
+from app import app
+
+
+def reset_data():
+    shutil.rmtree('data', ignore_errors=True)
+    shutil.copytree(source, 'data')
+    utils._json_cache.clear()
+
+
+def snapshot():
+    """Isi rooms + bookings tanpa created_at (waktu pembuatan pasti beda)"""
+    bookings = json.load(open(utils.BOOKINGS_FILE))
+    for booking in bookings:
+        booking.pop('created_at')
+    return json.load(open(utils.ROOMS_FILE)), bookings
+
+
+def request(room_id=None, room_type=None, check_in='2026-12-01', check_out='2026-12-03', guest='Budi'):
+    return {'user_id': 'U002', 'room_id': room_id, 'room_type': room_type, 'check_in': check_in,
+            'check_out': check_out, 'nights': 2, 'guest_name': guest, 'guest_phone': '0812',
+            'username': 'tamu1'}
+
+
+try:
+    # Test 1: Satu commit batch = hasil create_booking/create_booking_by_type berurutan
+    print("\n1. TEST BATCH = BERURUTAN")
+    print("-" * 60)
+    requests = [request(room_id='R001'), request(room_id='R001'), request(room_type='Suite', guest='A'),
+                request(room_type='Suite', guest='B'), request(room_type='Suite', guest='C'),
+                request(room_type='Deluxe'), request(room_type='Penthouse'), request(room_id='R404')]
+    reset_data()
+    sequential = []
+    for req in requests:
+        fields = {k: v for k, v in req.items() if k not in ('room_id', 'room_type')}
+        if req['room_type']:
+            sequential.append(utils.create_booking_by_type(room_type=req['room_type'], **fields))
+        else:
+            sequential.append(utils.create_booking(room_id=req['room_id'], **fields))
+    expected = snapshot()
+    reset_data()
+    batched = utils.create_bookings(requests)
+    assert [b and b.booking_id for b in batched] == [b and b.booking_id for b in sequential]
+    assert snapshot() == expected
+    created = sum(1 for b in batched if b)
+    print(f"✅ BERHASIL: {created} dari {len(requests)} request dibuat, file identik dengan jalur lama")
+
+    # Test 2: Request yang datang saat writer sibuk di-commit bersama
+    print("\n2. TEST BATCHING")
+    print("-" * 60)
+    reset_data()
+    writer = bookingqueue.BookingWriter(max_depth=16, batch_size=8)
+    lock = utils.partition_lock('main')
+    stays = [dict(check_in=f'2027-01-{day:02d}', check_out=f'2027-01-{day + 1:02d}') for day in range(1, 11)]
+    with lock:   # writer tertahan di commit pertama
+        futures = [writer.submit(**request(room_type='Standard', **stays[0]))]
+        time.sleep(0.1)
+        futures += [writer.submit(**request(room_type='Standard', **stay)) for stay in stays[1:]]
+        assert writer.stats()['committing'] == 1 and writer.stats()['depth'] == 9
+    results = [future.result(timeout=10) for future in futures]
+    stats = writer.stats()
+    assert all(results) and len({b.booking_id for b in results}) == 10
+    assert stats['batch_sizes'] == {1: 2, 8: 1}
+    assert stats['batches'] == 3 and stats['peak_depth'] == 9 and stats['created'] == 10
+    print(f"✅ BERHASIL: 10 request dalam {stats['batches']} commit, ukuran batch {stats['batch_sizes']}")
+
+    # Test 3: Antrian penuh ditolak langsung, request yang diterima tetap selesai
+    print("\n3. TEST ADMISSION CONTROL")
+    print("-" * 60)
+    writer = bookingqueue.BookingWriter(max_depth=2, batch_size=8)
+    with lock:
+        accepted = [writer.submit(**request(room_type='Deluxe', check_in='2027-02-01', check_out='2027-02-02'))]
+        time.sleep(0.1)
+        accepted += [writer.submit(**request(room_type='Deluxe', check_in='2027-02-01',
+                                             check_out='2027-02-02')) for _ in range(2)]
+        started = time.perf_counter()
+        try:
+            writer.submit(**request(room_type='Deluxe'))
+            assert False, "antrian penuh harus ditolak"
+        except bookingqueue.QueueFull:
+            rejected_ms = (time.perf_counter() - started) * 1000
+    outcome = [future.result(timeout=10) for future in accepted]
+    assert [bool(b) for b in outcome] == [True, True, False]   # Deluxe hanya 2 kamar
+    assert writer.stats()['rejected'] == 1 and writer.stats()['unavailable'] == 1
+    print(f"✅ BERHASIL: request ke-4 ditolak dalam {rejected_ms:.2f} ms, sisanya selesai")
+
+    # Test 4: Route /bookings/add -> 429 + Retry-After saat antrian penuh
+    print("\n4. TEST ROUTE")
+    print("-" * 60)
+    form = {'room_type': 'Suite', 'check_in': '2027-03-01', 'check_out': '2027-03-02',
+            'guest_name': 'Budi', 'guest_phone': '0812'}
+    with app.test_client() as client:
+        client.post('/login', data={'username': 'tamu1', 'password': 'tamu123'})
+        assert client.post('/bookings/add', data=form).status_code == 302
+        bookingqueue.writer.max_depth = 0
+        response = client.post('/bookings/add', data=form)
+        bookingqueue.writer.max_depth = bookingqueue.QUEUE_DEPTH
+        assert response.status_code == 429 and response.headers['Retry-After']
+        assert 'coba lagi' in response.get_data(as_text=True)
+    print("✅ BERHASIL: booking lewat antrian, antrian penuh = 429 dengan Retry-After")
+
+    # Test 5: Batch yang error tidak mematikan writer; event/log yang gagal tidak menggagalkan commit
+    print("\n5. TEST WRITER TAHAN ERROR")
+    print("-" * 60)
+    writer = bookingqueue.BookingWriter()
+    commit = writer._commit
+
+    def broken_commit(batch):
+        writer._commit = commit   # hanya batch pertama
+        raise RuntimeError("writer rusak")
+
+    writer._commit = broken_commit
+    try:
+        writer.submit(**request(room_type='Suite', check_in='2027-04-01', check_out='2027-04-02')).result(timeout=10)
+        assert False, "error batch harus diteruskan ke Future"
+    except RuntimeError:
+        pass
+    assert writer.submit(**request(room_type='Suite', check_in='2027-04-01', check_out='2027-04-02')
+                         ).result(timeout=10) is not None
+    assert writer.stats()['failed'] == 1 and writer.stats()['committing'] == 0
+
+    log_activity = utils.log_activity
+
+    def broken_log(*args, **kwargs):
+        raise OSError("log penuh")
+
+    utils.log_activity = broken_log
+    try:
+        saved = writer.submit(**request(room_type='Suite', check_in='2027-04-05', check_out='2027-04-06',
+                                        guest='Rina')).result(timeout=10)
+    finally:
+        utils.log_activity = log_activity
+    assert saved is not None and utils.get_booking_by_id(saved.booking_id).to_dict()['guest_name'] == 'Rina'
+    print("✅ BERHASIL: writer tetap jalan setelah error, booking tersimpan dilaporkan berhasil")
+
+    # Test 6: Commit yang terlalu lama -> CommitTimeout / HTTP 503, request di antrian dibatalkan
+    print("\n6. TEST TIMEOUT")
+    print("-" * 60)
+    bookingqueue.COMMIT_TIMEOUT = 0.2
+    try:
+        with lock:   # writer tertahan di commit
+            for guest in ('Tono', 'Tini'):
+                try:
+                    bookingqueue.create_booking(**request(room_type='Standard', check_in='2027-05-01',
+                                                          check_out='2027-05-02', guest=guest))
+                    assert False, "commit yang tertahan harus timeout"
+                except bookingqueue.CommitTimeout:
+                    pass
+            with app.test_client() as client:
+                client.post('/login', data={'username': 'tamu1', 'password': 'tamu123'})
+                response = client.post('/bookings/add', data=form)
+                assert response.status_code == 503 and response.headers['Retry-After']
+                assert 'periksa daftar booking' in response.get_data(as_text=True)
+    finally:
+        bookingqueue.COMMIT_TIMEOUT = 30
+    while bookingqueue.writer.stats()['committing'] or bookingqueue.writer.stats()['depth']:
+        time.sleep(0.01)
+    guests = [b.to_dict()['guest_name'] for b in utils.load_bookings() if b._check_in == '2027-05-01']
+    assert guests == ['Tono']   # sudah di-commit saat timeout; Tini dibatalkan dari antrian
+    print("✅ BERHASIL: pemanggil tidak menunggu selamanya, 503 + Retry-After dari route")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST ANTRIAN BOOKING BERHASIL! ✅")
+print("="*60)
@@ -0,0 +1,147 @@
+"""
+Test script untuk forecast okupansi per tipe kamar
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+print("="*60)
+print("TEST FORECAST OKUPANSI")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='forecast-')
+cwd = os.getcwd()
+os.chdir(scratch)
+shutil.copytree(source, 'data')
+
+import archive
+import forecast
+import utils
+from app import app
+
+TODAY = date.today()
+ROOMS = {'R001': 'Standard', 'R002': 'Standard', 'R003': 'Standard', 'R004': 'Standard',
+         'R005': 'Suite', 'R006': 'Suite'}
+
+
+def day(offset):
+    return (TODAY + timedelta(days=offset)).isoformat()
+
+
+def write_data(bookings):
+    rooms = [{'room_id': room_id, 'room_number': str(100 + i), 'room_type': room_type, 'capacity': 2,
+              'base_price': 500000, 'is_available': True, 'amenities': []}
+             for i, (room_id, room_type) in enumerate(ROOMS.items())]
+    shutil.rmtree('data/archive', ignore_errors=True)
+    with open(utils.ROOMS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(rooms, f, indent=4)
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(bookings, f, indent=4)
+    utils._json_cache.clear()
+
+
+def booking(number, room_id, check_in, nights, created, status='active'):
+    return {'booking_id': f"B{number:05d}", 'user_id': 'U002', 'room_id': room_id, 'check_in': day(check_in),
+            'check_out': day(check_in + nights), 'nights': nights, 'total_price': 500000 * nights,
+            'guest_name': 'Budi', 'guest_phone': '0812', 'status': status,
+            'created_at': f"{day(created)} 10:00:00", 'hotel_id': 'main'}
+
+
+try:
+    # Test 1: Hasil vektor = hitungan brute force per malam
+    print("\n1. TEST VEKTOR = BRUTE FORCE")
+    print("-" * 60)
+    rng = random.Random(7)
+    bookings = []
+    for number in range(1, 601):
+        check_in = rng.randrange(-420, 200)
+        bookings.append(booking(number, rng.choice(list(ROOMS)), check_in, rng.randint(1, 6),
+                                check_in - rng.randrange(0, 260), rng.choice(['active', 'completed', 'cancelled'])))
+    bookings[0]['check_in'] = '2026-02-30'   # tanggal rusak dilewati
+    write_data(bookings)
+    result = forecast.compute(today=TODAY)
+
+    stays = [(ROOMS[b['room_id']], date.fromisoformat(b['check_in']), date.fromisoformat(b['check_out']),
+              date.fromisoformat(b['created_at'][:10])) for b in bookings[1:] if b['status'] != 'cancelled']
+
+    def occupied(room_type, night, lead=0):
+        return sum(1 for t, check_in, check_out, created in stays
+                   if t == room_type and check_in <= night < check_out and (night - created).days >= lead)
+
+    assert result['bookings'] == len(stays)
+    for room_type, data in result['room_types'].items():
+        for i in range(0, forecast.MAX_HORIZON, 7):
+            night = TODAY + timedelta(days=i)
+            assert data['on_books'][i] == occupied(room_type, night)
+            assert data['last_year_on_books'][i] == occupied(room_type, night - timedelta(days=364), lead=i)
+        history = [TODAY - timedelta(days=n) for n in range(1, forecast.PICKUP_NIGHTS + 1)]
+        for lead in (0, 1, 7, 30, 180):
+            pickup = sum(occupied(room_type, h) - occupied(room_type, h, lead) for h in history) / len(history)
+            assert abs(data['pickup_curve'][lead] - pickup) < 0.01
+    print(f"✅ BERHASIL: OTB, pace tahun lalu, dan kurva pickup sama ({result['compute_ms']} ms)")
+
+    # Test 2: Pola stabil -> forecast tepat, termasuk histori yang sudah diarsipkan
+    print("\n2. TEST POLA STABIL + ARSIP")
+    print("-" * 60)
+    # Setiap malam Standard terisi 3 kamar: 2 dipesan 30 hari sebelumnya, 1 dipesan 5 hari sebelumnya
+    bookings = []
+    for night in range(-730, forecast.MAX_HORIZON):
+        for room_id, lead in (('R001', 30), ('R002', 30), ('R003', 5)):
+            if night - lead <= 0:
+                status = 'completed' if night < -1 else 'active'
+                bookings.append(booking(len(bookings) + 1, room_id, night, 1, night - lead, status))
+    write_data(bookings)
+    result = forecast.view(forecast.compute(today=TODAY), 180)
+    standard, suite = result['room_types']['Standard'], result['room_types']['Suite']
+    assert standard['on_books'][3] == 3 and standard['on_books'][10] == 2 and standard['on_books'][40] == 0
+    assert standard['forecast'] == [3.0] * 180 and standard['baseline'] == [3.0] * 180
+    assert standard['occupancy_pct'][0] == 75.0 and standard['summary']['pace_vs_last_year'] == 0
+    assert suite['forecast'] == [0.0] * 180 and suite['summary']['avg_occupancy_pct'] == 0.0
+    assert result['trend']['room_types']['Standard']['ma28'][-1] == 3.0
+
+    moved = archive.archive_closed_bookings(days=90)
+    utils._json_cache.clear()
+    assert moved and forecast.view(forecast.compute(today=TODAY), 180)['room_types'] == result['room_types']
+    print(f"✅ BERHASIL: forecast Standard 3/4 kamar tiap malam, sama setelah {moved} booking diarsipkan")
+
+    # Test 3: Cache per hari, refresh, dan batas horizon
+    print("\n3. TEST CACHE")
+    print("-" * 60)
+    first = forecast.get_forecast(today=TODAY)
+    cached = forecast._cache['main']
+    utils.create_booking('U002', 'R005', day(2), day(4), 2, 'Ani', '0813', 'tamu1')
+    assert forecast.get_forecast(today=TODAY) == first and forecast._cache['main'] is cached
+    refreshed = forecast.get_forecast(today=TODAY, refresh=True)
+    assert refreshed['room_types']['Suite']['on_books'][2:4] == [1, 1]
+    forecast.get_forecast(today=TODAY + timedelta(days=1))
+    assert forecast._cache['main']['as_of'] == day(1)
+    assert len(forecast.get_forecast(days=5, today=TODAY + timedelta(days=1))['dates']) == 30
+    assert len(forecast.get_forecast(days=999, today=TODAY + timedelta(days=1))['dates']) == 180
+    print("✅ BERHASIL: dihitung sekali per hari, refresh=True menghitung ulang")
+
+    # Test 4: Halaman admin & JSON
+    print("\n4. TEST ROUTE")
+    print("-" * 60)
+    with app.test_client() as client:
+        client.post('/login', data={'username': 'tamu1', 'password': 'tamu123'})
+        assert client.get('/forecast').status_code == 302
+        client.get('/logout')
+        client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+        page = client.get('/forecast?days=60')
+        assert page.status_code == 200 and 'Standard' in page.get_data(as_text=True)
+        data = client.get('/forecast/json?days=30').get_json()
+        assert data['days'] == 30 and len(data['room_types']['Standard']['forecast']) == 30
+    print("✅ BERHASIL: /forecast (admin) dan /forecast/json")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST FORECAST BERHASIL! ✅")
+print("="*60)
@@ -0,0 +1,126 @@
+"""
+Test script untuk group booking (semua kamar atau tidak sama sekali)
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+print("="*60)
+print("TEST GROUP BOOKING")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='group-')
+cwd = os.getcwd()
+os.chdir(scratch)
+shutil.copytree(source, 'data', ignore=shutil.ignore_patterns('*.tmp', '.lock'))
+
+import utils
+
+TODAY = date.today()
+ROOMS = {'R001': 'Standard', 'R002': 'Standard', 'R003': 'Suite'}
+
+
+def day(offset):
+    return (TODAY + timedelta(days=offset)).isoformat()
+
+
+def snapshot():
+    """Isi mentah rooms/bookings/groups untuk memastikan tidak ada yang berubah"""
+    result = []
+    for path in (utils.rooms_file(), utils.bookings_file(), utils.groups_file()):
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                result.append(f.read())
+        else:
+            result.append(None)
+    return result
+
+
+def group(room_requests, room_ids, check_in, check_out):
+    return utils.create_group_booking('U002', 'Rombongan', room_requests, room_ids, day(check_in),
+                                      day(check_out), check_out - check_in, 'Budi', '0812', 'tamu1')
+
+
+def statuses(group_id):
+    return [b.status for b in utils.load_bookings() if b.group_id == group_id]
+
+
+try:
+    with open(utils.ROOMS_FILE, 'w', encoding='utf-8') as f:
+        json.dump([{'room_id': room_id, 'room_number': str(101 + i), 'room_type': room_type, 'capacity': 2,
+                    'base_price': 500000, 'is_available': True, 'amenities': []}
+                   for i, (room_id, room_type) in enumerate(ROOMS.items())], f, indent=4)
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump([], f)
+    utils._json_cache.clear()
+
+    # Test 1: Satu kamar bentrok -> seluruh group batal, tidak ada file yang berubah
+    print("\n1. TEST ROLLBACK SEMUA ATAU TIDAK SAMA SEKALI")
+    print("-" * 60)
+    suite = utils.create_booking('U001', 'R003', day(10), day(12), 2, 'Siti', '0813', 'tamu1')
+    utils.update_room_availability('R003', True, 'admin')   # flag kamar tidak menjamin tanggal kosong
+    before = snapshot()
+    assert group({'Standard': 1}, ['R003'], 11, 13) is None          # kamar spesifik bentrok tanggal
+    assert group({'Standard': 3}, [], 20, 22) is None                # tipe kurang kamar
+    assert group({'Standard': 1}, ['R003', 'R003'], 20, 22) is None  # kamar dobel
+    assert group({'Standard': 1}, ['R404'], 20, 22) is None          # kamar tidak ada
+    assert snapshot() == before
+    print("✅ BERHASIL: 4 group gagal, rooms/bookings/groups tidak berubah sama sekali")
+
+    # Test 2: Group yang muat dibuat dalam satu tulis
+    print("\n2. TEST GROUP BERHASIL")
+    print("-" * 60)
+    created = group({'Standard': 2}, ['R003'], 12, 14)   # R003 kosong lagi mulai check-out booking Siti
+    assert created is not None and len(created.booking_ids) == 3
+    members = [b for b in utils.load_bookings() if b.group_id == created.group_id]
+    assert sorted(b.room_id for b in members) == ['R001', 'R002', 'R003']
+    assert not any(room.is_available for room in utils.load_rooms())
+    assert group({'Standard': 1}, [], 13, 15) is None
+    print(f"✅ BERHASIL: {created.group_id} menempati 3 kamar, group berikutnya di tanggal sama ditolak")
+
+    # Test 3: Group batal lalu diaktifkan lagi setelah kamarnya dipakai booking lain
+    print("\n3. TEST AKTIFKAN LAGI GROUP YANG DIBATALKAN")
+    print("-" * 60)
+    assert utils.update_group_status(created.group_id, 'cancelled', 'admin')
+    assert statuses(created.group_id) == ['cancelled'] * 3
+    blocker = utils.create_booking_by_type('U001', 'Standard', day(13), day(14), 1, 'Ani', '0814', 'tamu1')
+    assert blocker is not None
+    before = snapshot()
+    assert not utils.update_group_status(created.group_id, 'active', 'admin')
+    assert snapshot() == before and statuses(created.group_id) == ['cancelled'] * 3
+    assert utils.update_booking_status(blocker.booking_id, 'cancelled', 'admin')
+    assert utils.update_group_status(created.group_id, 'active', 'admin')
+    assert statuses(created.group_id) == ['active'] * 3
+    assert utils.update_group_status(created.group_id, 'completed', 'admin')
+    assert not utils.update_group_status(created.group_id, '<script>', 'admin')
+    print("✅ BERHASIL: diaktifkan lagi hanya jika semua kamar masih muat di tanggalnya")
+
+    # Test 4: Kamar yang ditutup admin tidak dipakai penempatan per tipe
+    print("\n4. TEST KAMAR DITUTUP")
+    print("-" * 60)
+    assert utils.get_room_by_id('R001').is_available and utils.get_room_by_id('R002').is_available
+    assert utils.update_room_availability('R002', False, 'admin')   # tanpa booking aktif: ditutup
+    assert utils.room_type_inventory('Standard', day(30), day(32))['total'] == 1
+    first = utils.create_booking_by_type('U001', 'Standard', day(30), day(32), 2, 'Ani', '0814', 'tamu1')
+    assert first.room_id == 'R001'
+    assert utils.create_booking_by_type('U001', 'Standard', day(30), day(32), 2, 'Ani', '0814', 'tamu1') is None
+    assert group({'Standard': 1}, [], 31, 33) is None
+    assert group({'Standard': 1}, [], 40, 42) is not None
+    assert utils.update_booking_dates(first.booking_id, day(50), day(52), '', 'tamu1')
+    assert {b.room_id for b in utils.load_bookings() if b.status == 'active' and b.room_id != 'R003'} == {'R001'}
+    assert not utils.get_room_by_id('R002').is_available   # sinkronisasi flag tidak membukanya lagi
+    assert utils.update_room_availability('R002', True, 'admin')
+    assert utils.create_booking_by_type('U001', 'Standard', day(30), day(32), 2, 'Ani', '0814', 'tamu1').room_id == 'R002'
+    print("✅ BERHASIL: R002 ditutup dilewati engine, dipakai lagi setelah dibuka")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST GROUP BOOKING BERHASIL! ✅")
+print("="*60)
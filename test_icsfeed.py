@@ -0,0 +1,152 @@
+"""
+Test script untuk feed iCalendar (ICS) per kamar / tipe kamar
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+print("="*60)
+print("TEST FEED ICS")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='icsfeed-')
+cwd = os.getcwd()
+os.chdir(scratch)
+shutil.copytree(source, 'data')
+
+import icsfeed
+import search
+import utils
+from app import app, calendar_token
+
+START, END = '2025-12-01', '2027-01-01'
+
+
+def feeds():
+    """(isi, ETag) semua feed kamar + tipe kamar pada jendela test"""
+    result = {}
+    for room in utils.load_rooms():
+        result[room.room_id] = icsfeed.get_feed('room', room.room_id, START, END)
+        result[room.get_room_type()] = icsfeed.get_feed('type', room.get_room_type(), START, END)
+    return result
+
+
+def uids(body):
+    return [line[4:].split('@')[0] for line in body.split('\r\n') if line.startswith('UID:')]
+
+
+def rewrite(path, change):
+    """Ubah file data langsung (seperti worker lain), pastikan signature berubah"""
+    with open(path, encoding='utf-8') as f:
+        records = json.load(f)
+    change(records)
+    time.sleep(0.01)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+
+
+try:
+    # Test 1: Isi feed per kamar & tipe kamar
+    print("\n1. TEST ISI FEED")
+    print("-" * 60)
+    created = utils.create_booking('U002', 'R001', '2026-12-01', '2026-12-03', 2, 'Budi', '0812', 'tamu1')
+    cancelled = utils.create_booking('U002', 'R007', '2026-12-05', '2026-12-06', 1, 'Siti', '0813', 'tamu1')
+    utils.update_booking_status(cancelled.booking_id, 'cancelled', 'admin')
+    index = icsfeed.get_index()
+    body, etag = icsfeed.get_feed('room', 'R001', START, END)
+    assert body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n')
+    assert uids(body) == [created.booking_id]
+    assert 'DTSTART;VALUE=DATE:20261201\r\nDTEND;VALUE=DATE:20261203' in body
+    assert 'SUMMARY:Kamar 101 terisi' in body
+    assert uids(icsfeed.get_feed('room', 'R001', '2026-12-03', '2027-01-01')[0]) == []   # check-out eksklusif
+    assert uids(icsfeed.get_feed('type', 'Suite', START, END)[0]) == ['B0003~2', 'B0003']   # R005, R007
+    assert uids(icsfeed.get_feed('type', 'Standard', START, END)[0]) == [created.booking_id]
+    assert icsfeed.get_feed('room', 'R404', START, END) is None
+    assert all(len(line.encode()) <= 75 for line in body.split('\r\n'))
+    print("✅ BERHASIL: booking aktif/completed tampil, cancelled & di luar jendela tidak")
+
+    # Test 2: Mutasi lewat events.bus hanya merender ulang kamar yang disentuh
+    print("\n2. TEST UPDATE INCREMENTAL")
+    print("-" * 60)
+    before = feeds()
+    renders, syncs = index.renders, index.syncs
+    assert feeds() == before and index.renders == renders   # poll ulang: semua dari cache
+    moved = utils.create_booking('U002', 'R003', '2026-12-10', '2026-12-12', 2, 'Ani', '0814', 'tamu1')
+    after = feeds()
+    assert index.renders == renders + 1
+    assert {key for key in after if after[key] != before[key]} == {'R003', 'Deluxe'}
+    utils.update_booking_dates(moved.booking_id, '2026-12-20', '2026-12-21', '', 'tamu1')
+    assert 'DTSTART;VALUE=DATE:20261220' in icsfeed.get_feed('room', 'R003', START, END)[0]
+    assert index.renders == renders + 2 and index.syncs == syncs   # tanpa baca ulang file
+    print(f"✅ BERHASIL: {len(after)} feed, tiap mutasi hanya 1 kamar dirender ulang")
+
+    # Test 3: Perubahan dari proses lain terdeteksi lewat signature, di-diff per kamar
+    print("\n3. TEST PERUBAHAN PROSES LAIN")
+    print("-" * 60)
+    before = feeds()
+    renders, syncs = index.renders, index.syncs
+    rewrite(utils.BOOKINGS_FILE, lambda records: records[0].update(check_out='2025-12-26'))   # B0001, R004
+    after = feeds()
+    assert {key for key in after if after[key] != before[key]} == {'R004', 'Deluxe'}
+    rewrite(utils.ROOMS_FILE, lambda records: records[4].update(room_number='303'))   # R005
+    assert 'SUMMARY:Kamar 303 terisi' in icsfeed.get_feed('room', 'R005', START, END)[0]
+    assert index.renders == renders + 2 and index.syncs == syncs + 2
+
+    # Worker lain menulis, lalu proses ini menulis sebelum feed diminta lagi
+    rewrite(utils.BOOKINGS_FILE, lambda records: records[0].update(check_out='2025-12-27'))   # B0001, R004
+    utils.update_booking_dates(moved.booking_id, '2026-12-22', '2026-12-23', '', 'tamu1')   # R003
+    assert 'DTEND;VALUE=DATE:20251227' in icsfeed.get_feed('room', 'R004', START, END)[0]
+    assert 'DTSTART;VALUE=DATE:20261222' in icsfeed.get_feed('room', 'R003', START, END)[0]
+    assert index.syncs == syncs + 3
+    print("✅ BERHASIL: hanya kamar yang berubah dirender ulang setelah diff file")
+
+    # Test 4: Route .ics dengan token, ETag/304, dan jendela tanggal
+    print("\n4. TEST ROUTE")
+    print("-" * 60)
+    token = calendar_token('main', 'room', 'R001')
+    url = f"/calendar/main/room/R001.ics?start={START}&end={END}&token={token}"
+    with app.test_client() as client:
+        assert client.get(f"/calendar/main/room/R001.ics?token={'0' * 32}").status_code == 403
+        response = client.get(url)
+        assert response.status_code == 200 and response.mimetype == 'text/calendar'
+        etag = response.headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        assert client.get(url.replace(END, '2025-01-01')).status_code == 400
+        assert client.get(f"/calendar/main/room/R404.ics?token={calendar_token('main', 'room', 'R404')}"
+                          ).status_code == 404
+        utils.update_booking_status(created.booking_id, 'cancelled', 'admin')
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.headers['ETag'] != etag
+        assert uids(response.get_data(as_text=True)) == []
+    print("✅ BERHASIL: 403 tanpa token, 304 saat ETag cocok, 200 setelah mutasi")
+
+    # Test 5: Edit tanggal memindahkan booking per tipe ke kamar lain
+    print("\n5. TEST EDIT TANGGAL PINDAH KAMAR")
+    print("-" * 60)
+    typed = utils.create_booking_by_type('U002', 'Deluxe', '2026-11-01', '2026-11-03', 2, 'Rudi', '0815', 'tamu1')
+    first, other = typed.room_id, ({'R003', 'R004'} - {typed.room_id}).pop()
+    utils.update_room_availability(first, True, 'admin')
+    pinned = utils.create_booking('U001', first, '2026-11-10', '2026-11-12', 2, 'Dewi', '0816', 'tamu1')
+    assert search.search_bookings('Rudi').results[0]['room_id'] == first
+    assert typed.booking_id in uids(icsfeed.get_feed('room', first, START, END)[0])
+    syncs = index.syncs
+    assert utils.update_booking_dates(typed.booking_id, '2026-11-10', '2026-11-11', '', 'tamu1')
+    assert utils.get_booking_by_id(typed.booking_id).room_id == other
+    assert typed.booking_id not in uids(icsfeed.get_feed('room', first, START, END)[0])
+    assert typed.booking_id in uids(icsfeed.get_feed('room', other, START, END)[0])
+    assert pinned.booking_id in uids(icsfeed.get_feed('room', first, START, END)[0])
+    assert search.search_bookings('Rudi').results[0]['room_id'] == other
+    assert index.syncs == syncs   # diterapkan dari event, tanpa baca ulang file
+    print(f"✅ BERHASIL: {typed.booking_id} pindah {first} -> {other}, feed & pencarian ikut")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST FEED ICS BERHASIL! ✅")
+print("="*60)
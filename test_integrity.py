@@ -0,0 +1,103 @@
+"""
+Test script untuk cek integritas & repair data
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+print("="*60)
+print("TEST INTEGRITAS DATA")
+print("="*60)
+
+scratch = tempfile.mkdtemp(prefix='integrity-')
+cwd = os.getcwd()
+os.chdir(scratch)
+os.makedirs('data')
+
+import integrity
+import utils
+
+
+def booking(booking_id, room_id, check_in, check_out, nights, price, status='active', user_id='U002', **extra):
+    return dict({'booking_id': booking_id, 'user_id': user_id, 'room_id': room_id, 'check_in': check_in,
+                 'check_out': check_out, 'nights': nights, 'total_price': price, 'guest_name': 'Budi',
+                 'guest_phone': '0812', 'status': status, 'created_at': '2026-01-01 10:00:00'}, **extra)
+
+
+def room(room_id, room_type, is_available):
+    return {'room_id': room_id, 'room_number': room_id[1:], 'room_type': room_type, 'capacity': 2,
+            'base_price': 500000, 'is_available': is_available, 'amenities': []}
+
+
+def write(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+
+
+try:
+    write('data/hotels.json', [{'hotel_id': 'main', 'name': 'Hotel Test', 'address': ''}])
+    write('data/users.json', [{'user_id': 'U001', 'username': 'admin', 'password': 'x', 'role': 'admin',
+                               'full_name': 'Admin'},
+                              {'user_id': 'U002', 'username': 'tamu1', 'password': 'x', 'role': 'tamu',
+                               'full_name': 'Tamu'}])
+    write('data/rooms.json', [room('R001', 'Standard', False), room('R002', 'Deluxe', False),
+                              room('R003', 'Suite', True)])
+    write('data/bookings.json', [
+        booking('B0001', 'R001', '2026-03-01', '2026-03-03', 2, 1000000),
+        booking('B0002', 'R001', '2026-03-02', '2026-03-05', 3, 1500000),          # tabrakan dengan B0001
+        booking('B0002', 'R003', '2026-02-01', '2026-02-02', 1, 1200000, 'completed'),  # ID dobel
+        booking('B0003', 'R009', '2026-02-01', '2026-02-03', 5, 1000000, 'completed'),  # orphan + nights + harga
+        booking('B0004', 'R001', '2026-04-01', '2026-04-02', 1, 500000, user_id='U999'),
+        booking('B0005', 'R001', '2026-04-01', '2026-04-02', 1, 500000, notes='x'),  # field asing
+    ])
+
+    # Test 1: Reader streaming = json.load, juga di batas chunk kecil
+    print("\n1. TEST STREAMING READER")
+    print("-" * 60)
+    expected = json.load(open('data/bookings.json'))
+    streamed = [value for _, value, error in utils.iter_json_array('data/bookings.json', chunk_size=7)]
+    assert streamed == expected
+    with open('data/broken.json', 'w') as f:
+        f.write('[\n    {"a": 1},\n    {"a": 2, "b": },\n    {"a": 3}\n')
+    items = list(utils.iter_json_array('data/broken.json', chunk_size=5))
+    assert [v for _, v, e in items if e is None] == [{'a': 1}, {'a': 3}]
+    assert [line for line, _, e in items if e] == [3]
+    print("✅ BERHASIL: hasil sama dengan json.load; record rusak dilewati, sisanya tetap terbaca")
+
+    # Test 2: Semua kategori terdeteksi
+    print("\n2. TEST CEK")
+    print("-" * 60)
+    report = integrity.Report()
+    integrity.check(['main'], report)
+    report.print()
+    assert report.counts == {'unparsable': 1, 'duplicate_id': 1, 'orphan_room': 1, 'orphan_user': 1,
+                             'overlap': 1, 'availability': 1, 'nights': 1, 'price': 1}, report.counts
+    print("✅ BERHASIL: semua kategori terdeteksi")
+
+    # Test 3: Repair atomik, backup, dan rejected
+    print("\n3. TEST REPAIR")
+    print("-" * 60)
+    dropped = integrity.repair(['main'], integrity.Report())
+    assert dropped == {'main': 1}
+    bookings = json.load(open('data/bookings.json'))
+    ids = [b['booking_id'] for b in bookings]
+    assert ids == ['B0001', 'B0002', 'B0006', 'B0003', 'B0004'], ids
+    assert bookings[3]['nights'] == 2 and bookings[3]['total_price'] == 1000000
+    assert {r['room_id']: r['is_available'] for r in json.load(open('data/rooms.json'))} == \
+        {'R001': False, 'R002': True, 'R003': True}
+    assert any(name.startswith('bookings.json.bak-') for name in os.listdir('data'))
+    assert len(utils.load_bookings()) == 5
+    after = integrity.Report()
+    integrity.check(['main'], after)
+    assert set(after.counts) == {'orphan_room', 'orphan_user', 'overlap'}, after.counts
+    print(f"✅ BERHASIL: sisa temuan manual: {dict(after.counts)}")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST INTEGRITAS BERHASIL! ✅")
+print("="*60)
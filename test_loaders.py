@@ -0,0 +1,92 @@
+"""
+Test script untuk loader streaming (iter_bookings / iter_rooms)
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+print("="*60)
+print("TEST LOADER STREAMING")
+print("="*60)
+
+scratch = tempfile.mkdtemp(prefix='loaders-')
+cwd = os.getcwd()
+os.chdir(scratch)
+os.makedirs('data')
+
+import utils
+
+
+def booking(booking_id, user_id, check_in, check_out, status='active'):
+    return {'booking_id': booking_id, 'user_id': user_id, 'room_id': 'R001', 'check_in': check_in,
+            'check_out': check_out, 'nights': 1, 'total_price': 500000, 'guest_name': 'Budi',
+            'guest_phone': '0812', 'status': status, 'created_at': '2026-01-01 10:00:00'}
+
+
+try:
+    records = [booking(f"B{i:04d}", f"U{i % 3:03d}", f"2026-01-{i % 28 + 1:02d}", f"2026-01-{i % 28 + 2:02d}",
+                       'active' if i % 2 else 'completed') for i in range(1, 301)]
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    with open(utils.ROOMS_FILE, 'w', encoding='utf-8') as f:
+        json.dump([{'room_id': 'R001', 'room_number': '101', 'room_type': 'Standard', 'is_available': True},
+                   {'room_id': 'R002', 'room_number': '201', 'room_type': 'Suite', 'is_available': False}], f)
+
+    # Test 1: Filter sama dengan filter manual atas load_bookings()
+    print("\n1. TEST FILTER")
+    print("-" * 60)
+    everything = utils.load_bookings()
+    assert [b.booking_id for b in utils.iter_bookings(user_id='U001')] == \
+        [b.booking_id for b in everything if b.user_id == 'U001']
+    window = [b.booking_id for b in everything
+              if b.status == 'active' and b._check_out >= '2026-01-10' and b._check_in <= '2026-01-12']
+    assert [b.booking_id for b in utils.iter_bookings(status='active', start='2026-01-10', end='2026-01-12')] == window
+    assert len(list(utils.iter_bookings(status=('active', 'completed')))) == 300
+    assert [r.room_id for r in utils.iter_rooms(room_type='Suite')] == ['R002']
+    print(f"✅ BERHASIL: user, status, dan rentang tanggal ({len(window)} booking) sesuai")
+
+    # Test 2: Streaming dari disk (cache dingin) = hasil dari cache
+    print("\n2. TEST STREAMING VS CACHE")
+    print("-" * 60)
+    utils._json_cache.clear()
+    streamed = [b.booking_id for b in utils.iter_bookings(user_id='U002')]
+    assert utils.BOOKINGS_FILE not in utils._json_cache   # streaming tidak mengisi cache
+    utils.load_bookings()
+    assert utils.BOOKINGS_FILE in utils._json_cache
+    assert [b.booking_id for b in utils.iter_bookings(user_id='U002')] == streamed
+    print("✅ BERHASIL: hasil sama, streaming tidak menahan seluruh file di memory")
+
+    # Test 3: Point lookup berhenti di record pertama yang cocok
+    print("\n3. TEST POINT LOOKUP")
+    print("-" * 60)
+    utils._json_cache.clear()
+    assert utils.get_booking_by_id('B0150').user_id == 'U000'
+    assert utils.get_room_by_id('R002').get_room_type() == 'Suite'
+    with open(utils.BOOKINGS_FILE, 'r+', encoding='utf-8') as f:
+        f.truncate(os.path.getsize(utils.BOOKINGS_FILE) - 100)   # ekor file rusak
+    utils._json_cache.clear()
+    assert utils.get_booking_by_id('B0001') is not None   # tidak pernah membaca sampai akhir file
+    assert utils.load_bookings() == []
+    print("✅ BERHASIL: lookup ID tidak membaca sisa file")
+
+    # Test 4: Record rusak = perilaku lama (log + kosong), bukan data parsial
+    print("\n4. TEST RECORD RUSAK")
+    print("-" * 60)
+    records[150]['catatan'] = 'field asing'
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    utils._json_cache.clear()
+    assert utils.load_bookings() == []
+    assert utils.get_user_bookings('U001') == []
+    assert utils.get_booking_by_id('B0001') is not None
+    print("✅ BERHASIL: load_bookings() tetap [] + log, lookup sebelum record rusak tetap jalan")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST LOADER BERHASIL! ✅")
+print("="*60)
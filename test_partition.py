@@ -0,0 +1,122 @@
+"""
+Test script untuk partisi data per property dan lock partisi
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+print("="*60)
+print("TEST PARTISI PROPERTY")
+print("="*60)
+
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='partition-')
+cwd = os.getcwd()
+os.chdir(scratch)
+shutil.copytree(source, 'data', ignore=shutil.ignore_patterns('*.tmp', '.lock'))
+
+import utils
+
+WORKERS, PER_WORKER = 4, 5
+
+
+def book_rooms(hotel_id, room_ids):
+    """Booking satu per kamar di partisi tertentu (thread/proses terpisah)"""
+    with utils.use_hotel(hotel_id):
+        for room_id in room_ids:
+            assert utils.create_booking('U002', room_id, '2026-12-01', '2026-12-02', 1, 'Budi', '0812', 'tamu1')
+
+
+def bookings_of(hotel_id):
+    with open(utils.bookings_file(hotel_id), encoding='utf-8') as f:
+        return json.load(f)
+
+
+try:
+    # Test 1: Dua property, data terpisah di data/ dan data/<hotel_id>/
+    print("\n1. TEST ISOLASI DATA")
+    print("-" * 60)
+    with open(utils.BOOKINGS_FILE, encoding='utf-8') as f:
+        main_before = f.read()
+    main_rooms = [room.room_id for room in utils.load_rooms()]
+    assert utils.create_hotel('Cabang', 'Hotel Sedna Cabang', 'Bandung', 'admin').hotel_id == 'cabang'
+    assert utils.create_hotel('cabang', 'Duplikat', '', 'admin') is None
+    assert utils.bookings_file('cabang') == os.path.join('data', 'cabang', 'bookings.json')
+    assert utils.bookings_file('main') == utils.BOOKINGS_FILE
+    with utils.use_hotel('cabang'):
+        assert utils.load_rooms() == [] and utils.load_bookings() == []
+        rooms = [utils.create_room('Standard', str(100 + i), 'admin')
+                 for i in range(1 + WORKERS * PER_WORKER * 2)]
+        booking = utils.create_booking('U002', rooms[0].room_id, '2026-12-01', '2026-12-02', 1, 'Ani', '0813', 'tamu1')
+        assert booking.booking_id == 'B0001' and booking.hotel_id == 'cabang'
+        assert utils.get_booking_by_id('B0001').to_dict()['guest_name'] == 'Ani'
+    assert utils.get_current_hotel() == 'main'
+    assert utils.get_booking_by_id('B0001').to_dict()['guest_name'] != 'Ani'
+    assert [room.room_id for room in utils.load_rooms()] == main_rooms
+    with open(utils.BOOKINGS_FILE, encoding='utf-8') as f:
+        assert f.read() == main_before
+    assert [b['booking_id'] for b in bookings_of('cabang')] == ['B0001']
+    print("✅ BERHASIL: property 'cabang' di data/cabang/, data property 'main' tidak tersentuh")
+
+    # Test 2: Penulis paralel (thread) pada satu partisi diserialkan oleh lock
+    print("\n2. TEST PENULIS PARALEL (THREAD)")
+    print("-" * 60)
+    assert utils.partition_lock('cabang') is utils.partition_lock('cabang')
+    assert utils.partition_lock('cabang') is not utils.partition_lock('main')
+    free = [room.room_id for room in rooms[1:]]
+    threads = [threading.Thread(target=book_rooms, args=('cabang', free[i::WORKERS * 2]))
+               for i in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [b['booking_id'] for b in bookings_of('cabang')]
+    assert len(ids) == 1 + WORKERS * PER_WORKER and len(set(ids)) == len(ids)
+    print(f"✅ BERHASIL: {len(ids)} booking, tidak ada tulisan hilang atau ID dobel")
+
+    # Test 3: Penulis paralel (proses prefork) diserialkan oleh flock
+    print("\n3. TEST PENULIS PARALEL (PROSES)")
+    print("-" * 60)
+    pids = []
+    for i in range(WORKERS):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                book_rooms('cabang', free[WORKERS + i::WORKERS * 2])
+                os._exit(0)
+            except BaseException:
+                os._exit(1)
+        pids.append(pid)
+    assert all(os.waitpid(pid, 0)[1] == 0 for pid in pids), "worker gagal membuat booking"
+    ids = [b['booking_id'] for b in bookings_of('cabang')]
+    assert len(ids) == 1 + 2 * WORKERS * PER_WORKER and len(set(ids)) == len(ids)
+    with utils.use_hotel('cabang'):
+        assert not any(room.is_available for room in utils.load_rooms())
+    print(f"✅ BERHASIL: {len(ids)} booking dari {WORKERS} proses, semua kamar tercatat terisi")
+
+    # Test 4: Lock satu partisi tidak menahan partisi lain
+    print("\n4. TEST LOCK PER PARTISI")
+    print("-" * 60)
+    done = threading.Event()
+
+    def write_other():
+        with utils.partition_lock('cabang'):
+            done.set()
+
+    with utils.partition_lock('main'):
+        writer = threading.Thread(target=write_other)
+        writer.start()
+        assert done.wait(5), "partisi 'cabang' tertahan oleh lock 'main'"
+    writer.join()
+    print("✅ BERHASIL: penulis 'cabang' jalan saat lock 'main' dipegang")
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST PARTISI PROPERTY BERHASIL! ✅")
+print("="*60)
@@ -0,0 +1,120 @@
+"""
+Test script untuk index pencarian tamu
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+
+import search
+import utils
+from models import Booking
+from search import GuestIndex, normalize_phone, normalize_text
+
+print("="*60)
+print("TEST PENCARIAN TAMU")
+print("="*60)
+
+
+def booking(booking_id, name, phone, status='active', user_id='U002'):
+    return Booking(booking_id, user_id, 'R001', '2026-01-01', '2026-01-02', 1, 500000, name, phone, status)
+
+
+# Test 1: Normalisasi nama & telepon
+print("\n1. TEST NORMALISASI")
+print("-" * 60)
+assert normalize_text("  José  Ñandú-Putra ") == "jose nandu putra"
+assert normalize_phone("+62 812-3456-789") == "08123456789"
+assert normalize_phone("0812 3456 789") == "08123456789"
+print("✅ BERHASIL: aksen, tanda baca, dan +62 dinormalisasi")
+
+# Test 2: Ranking exact > prefix > substring, aktif dulu, terbaru dulu
+print("\n2. TEST RANKING")
+print("-" * 60)
+index = GuestIndex('test').build([
+    booking('B0001', 'Budi Santoso', '081111'),
+    booking('B0002', 'Budiman Halim', '082222'),
+    booking('B0003', 'Ahmad Subudi', '083333'),
+    booking('B0004', 'Budi Wijaya', '084444', status='completed'),
+    booking('B0005', 'Budi Lestari', '085555'),
+])
+result = index.search('budi')
+assert [r['booking_id'] for r in result.results] == ['B0005', 'B0001', 'B0004', 'B0002', 'B0003']
+assert index.search('bu').total == 4  # 2 huruf = awal kata saja
+assert index.search('B0003').results[0]['booking_id'] == 'B0003'
+assert index.search('budi santoso').results[0]['booking_id'] == 'B0001'
+print(f"✅ BERHASIL: {[r['booking_id'] for r in result.results]}")
+
+# Test 3: Telepon parsial & format berbeda
+print("\n3. TEST TELEPON")
+print("-" * 60)
+assert index.search('+6282222').results[0]['booking_id'] == 'B0002'
+assert index.search('3333').results[0]['booking_id'] == 'B0003'
+print("✅ BERHASIL: nomor parsial dan format +62 ditemukan")
+
+# Test 4: Update incremental
+print("\n4. TEST UPDATE INCREMENTAL")
+print("-" * 60)
+index.add(booking_id='B0006', user_id='U003', guest_name='Siti Budiarti', guest_phone='086666',
+          room_id='R002', check_in='2026-02-01', check_out='2026-02-02', status='active')
+assert index.search('budiarti').results[0]['booking_id'] == 'B0006'
+index.update('B0005', status='cancelled')
+assert index.search('budi').results[0]['booking_id'] == 'B0001'
+index.remove('B0001')
+assert 'B0001' not in [r['booking_id'] for r in index.search('budi').results]
+assert index.search('budi', user_id='U003').total == 1
+print("✅ BERHASIL: tambah, ubah status, hapus, dan filter user")
+
+# Test 5: Pagination sama dengan hasil lengkap
+print("\n5. TEST PAGINATION")
+print("-" * 60)
+rng = random.Random(3)
+names = ['Dewi', 'Dewanti', 'Andewi', 'Rina']
+index = GuestIndex('page').build(
+    booking(f"B{i:04d}", f"{rng.choice(names)} {rng.choice(names)}", f"08{i:08d}",
+            status=rng.choice(['active', 'completed']))
+    for i in range(500))
+full = index.search('dew', per_page=500)
+pages = index.search('dew', per_page=20).pages
+paged = [r['booking_id'] for page in range(1, pages + 1)
+         for r in index.search('dew', page=page, per_page=20).results]
+assert paged == [r['booking_id'] for r in full.results]
+assert index.search('dew', page=2).total == full.total
+print(f"✅ BERHASIL: {full.total} hasil, halaman 20-an identik dengan hasil lengkap")
+
+# Test 6: Tulisan worker lain tidak tertutup oleh event tulisan sendiri
+print("\n6. TEST TULISAN WORKER LAIN + EVENT LOKAL")
+print("-" * 60)
+source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+scratch = tempfile.mkdtemp(prefix='search-')
+cwd = os.getcwd()
+os.chdir(scratch)
+try:
+    shutil.copytree(source, 'data', ignore=shutil.ignore_patterns('*.tmp', '.lock'))
+    assert search.search_bookings('fadli').total == 1
+    # Worker lain menambah booking langsung ke file (tanpa event di proses ini)
+    with open(utils.BOOKINGS_FILE, encoding='utf-8') as f:
+        records = json.load(f)
+    records.append(dict(records[0], booking_id='B0900', guest_name='Wulan Sari', guest_phone='0899'))
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    # Lalu proses ini menulis: event diterapkan, signature tidak boleh menutupi tulisan di atas
+    assert utils.update_booking_status('B0001', 'completed', 'admin')
+    assert [r['booking_id'] for r in search.search_bookings('wulan').results] == ['B0900']
+    assert search.search_bookings('fadli').results[0]['status'] == 'completed'
+    # Tanpa tulisan pihak lain, event lokal cukup memajukan signature (tanpa refresh)
+    index = search.get_index()
+    assert utils.update_booking_status('B0900', 'cancelled', 'admin')
+    assert index.signature == search._signature('main')
+    assert search.search_bookings('wulan').results[0]['status'] == 'cancelled'
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+print("✅ BERHASIL: booking dari worker lain tetap ditemukan setelah mutasi lokal")
+
+print("\n" + "="*60)
+print("SEMUA TEST PENCARIAN BERHASIL! ✅")
+print("="*60)
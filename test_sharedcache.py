@@ -0,0 +1,133 @@
+"""
+Test script untuk cache bersama (shared memory) antar worker
+Sistem Pemesanan Hotel
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+print("="*60)
+print("TEST CACHE BERSAMA")
+print("="*60)
+
+scratch = tempfile.mkdtemp(prefix='sharedcache-')
+cwd = os.getcwd()
+os.chdir(scratch)
+os.makedirs('data')
+
+import sharedcache
+import utils
+
+
+def booking(booking_id, user_id, check_in, check_out, status='active'):
+    return {'booking_id': booking_id, 'user_id': user_id, 'room_id': 'R001', 'check_in': check_in,
+            'check_out': check_out, 'nights': 1, 'total_price': 500000, 'guest_name': 'Budi',
+            'guest_phone': '0812', 'status': status, 'created_at': '2026-01-01 10:00:00', 'hotel_id': 'main'}
+
+
+def queries():
+    """Hasil beberapa query loader (ID booking / kamar)"""
+    return [
+        [b.booking_id for b in utils.iter_bookings(booking_id='B0007')],
+        [b.user_id for b in utils.iter_bookings(booking_id='B0100')],
+        [b.booking_id for b in utils.iter_bookings(booking_id='B9999')],
+        [b.booking_id for b in utils.iter_bookings(user_id='U001')],
+        [b.booking_id for b in utils.iter_bookings(user_id='U001', status='completed')],
+        [b.booking_id for b in utils.iter_bookings(status=('active', 'cancelled'), start='2026-01-10', end='2026-01-12')],
+        [b.booking_id for b in utils.iter_bookings(end='2026-01-03')],
+        [b.booking_id for b in utils.iter_bookings(start='2026-1-9')],   # format tidak standar: banding string
+        [b.booking_id for b in utils.iter_bookings(user_id='U404')],
+        [b.booking_id for b in utils.iter_bookings()],
+        [r.room_id for r in utils.iter_rooms(room_type='Suite')],
+        [r.room_id for r in utils.iter_rooms(room_id='R001')],
+    ]
+
+
+try:
+    records = [booking(f"B{i:04d}", f"U{i % 3:03d}", f"2026-01-{i % 28 + 1:02d}", f"2026-01-{i % 28 + 2:02d}",
+                       ['active', 'completed', 'cancelled'][i % 3]) for i in range(1, 201)]
+    records.append(booking('B0007', 'U002', '2026-02-01', '2026-02-02'))   # ID dobel
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    with open(utils.ROOMS_FILE, 'w', encoding='utf-8') as f:
+        json.dump([{'room_id': 'R001', 'room_number': '101', 'room_type': 'Standard', 'is_available': True},
+                   {'room_id': 'R002', 'room_number': '201', 'room_type': 'Suite', 'is_available': False}], f)
+    expected = queries()
+
+    # Test 1: Query lewat index segment = query lewat file JSON
+    print("\n1. TEST INDEX SEGMENT")
+    print("-" * 60)
+    sharedcache.enable(os.path.join(scratch, 'shm'))
+    published = sharedcache.publish_all()
+    assert published == {'rooms.json': 2, 'bookings.json': 201}, published
+    utils._json_cache.clear()
+    assert queries() == expected
+    assert expected[0] == ['B0007', 'B0007']
+    assert utils.BOOKINGS_FILE not in utils._json_cache   # tidak ada parse per proses
+    assert utils.read_json(utils.BOOKINGS_FILE) == records   # parse cold dari segment
+    print(f"✅ BERHASIL: {len(expected)} query sama, lookup tanpa parse file")
+
+    # Test 2: Worker lain melihat generation baru setelah mutasi
+    print("\n2. TEST GENERATION ANTAR PROSES")
+    print("-" * 60)
+    segment = sharedcache.open_segment(utils.BOOKINGS_FILE)
+    utils._json_cache.clear()
+    reader, writer = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Worker: tunggu mutasi dari proses lain, lalu lookup lewat segment
+        os.close(writer)
+        os.read(reader, 1)
+        result = utils.get_booking_by_id('B0002').status
+        cold = utils.BOOKINGS_FILE not in utils._json_cache
+        generation = sharedcache.open_segment(utils.BOOKINGS_FILE).generation
+        os._exit(0 if (result, cold, generation) == ('cancelled', True, segment.generation + 1) else 1)
+    os.close(reader)
+    assert utils.update_booking_status('B0002', 'cancelled', 'admin')
+    os.write(writer, b'x')
+    os.close(writer)
+    assert os.waitpid(pid, 0)[1] == 0, "worker tidak melihat mutasi"
+    assert segment.superseded
+    print(f"✅ BERHASIL: generation {segment.generation} -> {segment.generation + 1}, worker map ulang")
+
+    # Test 3: File diubah di luar aplikasi -> segment diabaikan, hasil tetap benar
+    print("\n3. TEST SEGMENT BASI")
+    print("-" * 60)
+    records[0]['status'] = 'completed'
+    with open(utils.BOOKINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    assert sharedcache.select(utils.BOOKINGS_FILE, key='B0001') is None
+    assert utils.get_booking_by_id('B0001').status == 'completed'
+    sharedcache.disable()
+    expected = queries()
+    sharedcache.enable(os.path.join(scratch, 'shm'))
+    sharedcache.publish_all()
+    assert queries() == expected
+    print("✅ BERHASIL: fallback ke file JSON, hasil sama setelah segment dibangun ulang")
+
+    # Test 4: Tulisan berukuran sama dalam satu tick mtime tetap terdeteksi (inode baru)
+    print("\n4. TEST TULISAN UKURAN SAMA")
+    print("-" * 60)
+    assert utils.get_booking_by_id('B0001').status == 'completed'
+    assert utils.read_json(utils.BOOKINGS_FILE)[0]['status'] == 'completed'   # parse masuk cache
+    stat = os.stat(utils.BOOKINGS_FILE)
+    records[0]['status'] = 'cancelled'   # panjang sama dengan 'completed'
+    with open(utils.BOOKINGS_FILE + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4)
+    os.utime(utils.BOOKINGS_FILE + '.tmp', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(utils.BOOKINGS_FILE + '.tmp', utils.BOOKINGS_FILE)
+    assert os.path.getsize(utils.BOOKINGS_FILE) == stat.st_size
+    assert sharedcache.select(utils.BOOKINGS_FILE, key='B0001') is None
+    assert utils.get_booking_by_id('B0001').status == 'cancelled'
+    assert utils.read_json(utils.BOOKINGS_FILE)[0]['status'] == 'cancelled'
+    print("✅ BERHASIL: mtime & size sama, cache JSON dan segment tetap dianggap basi")
+finally:
+    sharedcache.disable()
+    os.chdir(cwd)
+    shutil.rmtree(scratch)
+
+print("\n" + "="*60)
+print("SEMUA TEST CACHE BERSAMA BERHASIL! ✅")
+print("="*60)
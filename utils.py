@@ -1,20 +1,379 @@
+import contextvars
 import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
-from models import Room, StandardRoom, DeluxeRoom, SuiteRoom, User, Booking
+from functools import wraps
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import events
+import sharedcache
+from assignment import Stay, assign_rooms, date_ordinal, nightly_occupancy
+from models import (Room, StandardRoom, DeluxeRoom, SuiteRoom, User, Booking, BookingGroup,
+                    Hotel, DEFAULT_HOTEL_ID)
+
+try:
+    import fcntl
+except ImportError:  # Windows - hanya lock antar-thread
+    fcntl = None
+
+ROOM_TYPES = ['Standard', 'Deluxe', 'Suite']
+BOOKING_STATUSES = ('active', 'completed', 'cancelled')
 
 # File paths
 DATA_DIR = 'data'
+HOTELS_FILE = os.path.join(DATA_DIR, 'hotels.json')
 USERS_FILE = os.path.join(DATA_DIR, 'users.json')
+# Data kamar & booking property default; property lain di data/<hotel_id>/
 ROOMS_FILE = os.path.join(DATA_DIR, 'rooms.json')
 BOOKINGS_FILE = os.path.join(DATA_DIR, 'bookings.json')
 LOG_FILE = 'app.log'
 
-def ensure_data_dir():
-    """Ensure data directory exists"""
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+# Streaming JSON: ukuran chunk baca dan batas satu record (lebih besar = dianggap rusak)
+JSON_CHUNK_SIZE = 1 << 16
+JSON_MAX_RECORD = 1 << 20
+
+# Property yang sedang aktif untuk request/thread ini
+_current_hotel = contextvars.ContextVar('current_hotel', default=DEFAULT_HOTEL_ID)
+
+# Cache hasil parse JSON per file, divalidasi dengan (mtime, size, inode) file.
+# Inode ikut dicek karena tulisan berukuran sama dalam satu tick mtime tidak
+# terlihat dari (mtime, size); write_json selalu rename file temp (inode baru).
+_json_cache: Dict[str, tuple] = {}
+_json_cache_lock = threading.Lock()
+
+# (signature sebelum, signature sesudah) tulisan terakhir proses ini per file
+_last_writes: Dict[str, tuple] = {}
+
+_partition_locks: Dict[str, 'PartitionLock'] = {}
+_partition_locks_lock = threading.Lock()
+
+# Listener penulisan file data (mis. journal backup), lihat subscribe_writes
+_write_listeners: List = []
+
+def ensure_data_dir(hotel_id: Optional[str] = None):
+    """Ensure data directory (and the property partition) exists"""
+    path = hotel_data_dir(hotel_id)
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+def _file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def file_signature(path: str) -> Optional[tuple]:
+    """Signature file untuk deteksi perubahan, None jika file belum ada"""
+    try:
+        return _file_signature(path)
+    except FileNotFoundError:
+        return None
+
+def advance_signature(known: Optional[tuple], path: str) -> Optional[tuple]:
+    """Signature path sekarang jika perubahan sejak `known` hanya tulisan terakhir proses ini
+    
+    Untuk cache turunan yang sudah menerapkan event tulisan sendiri. Jika file
+    juga diubah proses lain, `known` dikembalikan apa adanya supaya cache tetap
+    terlihat basi dan disamakan ulang dari file.
+    """
+    current = file_signature(path)
+    if known == current:
+        return known
+    last = _last_writes.get(path)
+    if last is not None and last == (known, current):
+        return current
+    return known
+
+def read_json(path: str) -> list:
+    """Read a JSON file, reusing the cached parse while the file is unchanged"""
+    signature = _file_signature(path)
+    cached = _json_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    # Worker prefork: segment shared memory (JSON compact) lebih cepat di-parse dari file
+    data = sharedcache.load(path)
+    if data is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    with _json_cache_lock:
+        _json_cache[path] = (signature, data)
+    return data
+
+def _stage_json(path: str, data: list) -> str:
+    """Tulis data ke file temp di samping path, return path temp tersebut"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path
+
+def _install_json(tmp_path: str, path: str, data: list):
+    previous = None
+    if _write_listeners and os.path.exists(path):
+        # Isi lama hanya diketahui jika cache masih sama dengan file di disk
+        cached = _json_cache.get(path)
+        if cached and cached[0] == _file_signature(path):
+            previous = cached[1]
+    before = file_signature(path)
+    os.replace(tmp_path, path)
+    after = _file_signature(path)
+    with _json_cache_lock:
+        _json_cache[path] = (after, data)
+        _last_writes[path] = (before, after)
+    notify_write(path, previous, data)
+
+def subscribe_writes(callback):
+    """Daftarkan callback(path, previous, data) setiap kali file data selesai ditulis
+    
+    Dipanggil setelah rename, masih di dalam lock penulis. previous = isi lama
+    (None jika tidak diketahui); data = None untuk file yang bukan JSON list.
+    """
+    global _write_listeners
+    _write_listeners = _write_listeners + [callback]
+
+def notify_write(path: str, previous: Optional[list] = None, data: Optional[list] = None):
+    for callback in _write_listeners:
+        try:
+            callback(path, previous, data)
+        except Exception:
+            # Listener yang error tidak boleh menggagalkan penulisan data
+            pass
+
+def write_json(path: str, data: list):
+    """Write a JSON file atomically (temp file + rename) and refresh the cache"""
+    _install_json(_stage_json(path, data), path, data)
+
+def write_json_files(files: Dict[str, list]):
+    """Write several JSON files as one unit: stage all, then rename all
+    
+    Jika salah satu gagal ditulis, file temp dibuang dan tidak ada file yang berubah.
+    """
+    staged = []
+    try:
+        for path, data in files.items():
+            staged.append((_stage_json(path, data), path, data))
+    except Exception:
+        for tmp_path, _, _ in staged:
+            os.remove(tmp_path)
+        raise
+    
+    for tmp_path, path, data in staged:
+        _install_json(tmp_path, path, data)
+
+def iter_json_array(path: str, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """Stream elemen array JSON top-level satu per satu: yield (line, value, error)
+    
+    Elemen yang rusak di-yield sebagai (line, potongan teks, pesan error), lalu
+    pembacaan dilanjutkan dari '{' berikutnya sehingga satu record rusak tidak
+    menghilangkan seluruh file. Memory dibatasi oleh chunk_size + JSON_MAX_RECORD,
+    bukan oleh ukuran file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        line = 1        # nomor baris posisi `counted` di buffer
+        counted = 0
+        eof = False
+        started = False
+        damaged = False
+    
+        while True:
+            # Lewati whitespace dan koma, baca chunk berikutnya bila buffer habis
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                line += buffer.count('\n', counted, pos)
+                buffer, pos, counted = buffer[pos:], 0, 0
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+    
+            # Hitung baris secara inkremental (bukan dari awal buffer tiap record)
+            line += buffer.count('\n', counted, pos)
+            counted = pos
+            if pos >= len(buffer):
+                if not started:
+                    yield line, '', "file kosong"
+                elif not damaged:
+                    yield line, '', "array tidak ditutup dengan ']' (file terpotong?)"
+                return
+    
+            if not started:
+                if buffer[pos] != '[':
+                    yield line, buffer[pos:pos + 200], "isi file bukan array JSON"
+                    return
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+    
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # Mungkin record terpotong di batas chunk: baca lagi lalu coba ulang
+                if not eof and len(buffer) - pos < JSON_MAX_RECORD:
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buffer += chunk
+                    continue
+                damaged = True
+                yield line, buffer[pos:pos + 200], e.msg
+                pos += 1
+                while True:
+                    found = buffer.find('{', pos)
+                    if found >= 0:
+                        pos = found
+                        break
+                    pos = len(buffer)
+                    if eof:
+                        break
+                    line += buffer.count('\n', counted)
+                    buffer, pos, counted = '', 0, 0
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buffer += chunk
+                continue
+    
+            yield line, value, None
+            pos = end
+            if pos > chunk_size:
+                line += buffer.count('\n', counted, pos)
+                buffer, pos, counted = buffer[pos:], 0, 0
+
+def _fresh_cache(path: str) -> Optional[list]:
+    """Parse di cache jika file belum berubah, tanpa membaca file"""
+    entry = _json_cache.get(path)
+    if entry and entry[0] == _file_signature(path):
+        return entry[1]
+    return None
+
+def _iter_json_records(path: str, cached: bool = False) -> Iterator[Dict]:
+    """Record file array JSON satu per satu (dasar loader iter_*)
+    
+    Jika parse file masih ada di cache dan file belum berubah, cache dipakai
+    tanpa I/O. Kalau tidak, file di-stream dari disk tanpa mengisi cache, jadi
+    memory tidak ikut membesar dengan ukuran file. cached=True memaksa lewat
+    read_json (untuk full load yang akan diulang). Record rusak = ValueError.
+    """
+    if cached:
+        yield from read_json(path)
+        return
+    records = _fresh_cache(path)
+    if records is not None:
+        yield from records
+        return
+    for line, value, error in iter_json_array(path):
+        if error:
+            raise ValueError(f"{path} baris {line}: {error}")
+        yield value
+
+def preload_caches() -> Dict[str, int]:
+    """Parse all data files into the cache (dipakai sebelum fork worker)"""
+    ensure_data_dir()
+    paths = [HOTELS_FILE, USERS_FILE]
+    for hotel in load_hotels():
+        paths += [rooms_file(hotel.hotel_id), bookings_file(hotel.hotel_id),
+                  os.path.join(hotel_data_dir(hotel.hotel_id), 'archive', 'index.json')]
+    
+    loaded = {}
+    for path in paths:
+        if os.path.exists(path):
+            loaded[os.path.relpath(path, DATA_DIR)] = len(read_json(path))
+    return loaded
+
+# ==================== PROPERTY PARTITIONING ====================
+
+def get_current_hotel() -> str:
+    """Return hotel_id yang aktif di context ini"""
+    return _current_hotel.get()
+
+def set_current_hotel(hotel_id: str):
+    """Set property aktif, return token untuk reset_current_hotel()"""
+    return _current_hotel.set(hotel_id)
+
+def reset_current_hotel(token):
+    _current_hotel.reset(token)
+
+@contextmanager
+def use_hotel(hotel_id: str):
+    """Jalankan operasi utils terhadap partisi property tertentu"""
+    token = _current_hotel.set(hotel_id)
+    try:
+        yield hotel_id
+    finally:
+        _current_hotel.reset(token)
+
+def hotel_data_dir(hotel_id: Optional[str] = None) -> str:
+    """Folder data sebuah property; property default memakai data/ langsung"""
+    hotel_id = hotel_id or get_current_hotel()
+    if hotel_id == DEFAULT_HOTEL_ID:
+        return DATA_DIR
+    return os.path.join(DATA_DIR, hotel_id)
+
+def rooms_file(hotel_id: Optional[str] = None) -> str:
+    return os.path.join(hotel_data_dir(hotel_id), 'rooms.json')
+
+def bookings_file(hotel_id: Optional[str] = None) -> str:
+    return os.path.join(hotel_data_dir(hotel_id), 'bookings.json')
+
+def groups_file(hotel_id: Optional[str] = None) -> str:
+    return os.path.join(hotel_data_dir(hotel_id), 'groups.json')
+
+class PartitionLock:
+    """Lock per property: RLock antar-thread + flock antar-proses (worker prefork)"""
+    
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+    
+    def __enter__(self):
+        self._lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and fcntl is not None:
+            self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+def partition_lock(hotel_id: Optional[str] = None) -> PartitionLock:
+    """Return lock partisi property (dibuat sekali per proses)"""
+    hotel_id = hotel_id or get_current_hotel()
+    lock = _partition_locks.get(hotel_id)
+    if lock is None:
+        with _partition_locks_lock:
+            lock = _partition_locks.get(hotel_id)
+            if lock is None:
+                ensure_data_dir(hotel_id)
+                lock = PartitionLock(os.path.join(hotel_data_dir(hotel_id), '.lock'))
+                _partition_locks[hotel_id] = lock
+    return lock
+
+def locked_partition(f):
+    """Decorator: jalankan read-modify-write di bawah lock partisi property aktif"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with partition_lock():
+            return f(*args, **kwargs)
+    return decorated_function
 
 def log_activity(activity: str, user: str = "System", status: str = "INFO"):
     """Log activities to file"""
@@ -24,6 +383,85 @@ def log_activity(activity: str, user: str = "System", status: str = "INFO"):
     with open(LOG_FILE, 'a', encoding='utf-8') as f:
         f.write(log_entry)
 
+# ==================== PROPERTY MANAGEMENT ====================
+
+def load_hotels() -> List[Hotel]:
+    """Load daftar property; tanpa hotels.json hanya ada property default"""
+    if not os.path.exists(HOTELS_FILE):
+        return [Hotel(DEFAULT_HOTEL_ID, 'Hotel Sedna')]
+    
+    try:
+        data = read_json(HOTELS_FILE)
+        return [Hotel(**hotel_data) for hotel_data in data]
+    except Exception as e:
+        log_activity(f"Error loading hotels: {str(e)}", status="ERROR")
+        return [Hotel(DEFAULT_HOTEL_ID, 'Hotel Sedna')]
+
+def get_hotel_by_id(hotel_id: str) -> Optional[Hotel]:
+    """Get hotel by ID"""
+    for hotel in load_hotels():
+        if hotel.hotel_id == hotel_id:
+            return hotel
+    return None
+
+def create_hotel(hotel_id: str, name: str, address: str, user: str) -> Optional[Hotel]:
+    """Create new property beserta folder partisinya"""
+    hotel_id = hotel_id.strip().lower()
+    if not re.fullmatch(r'[a-z0-9][a-z0-9_-]{0,31}', hotel_id):
+        return None
+    
+    hotels = load_hotels()
+    if any(hotel.hotel_id == hotel_id for hotel in hotels):
+        return None
+    
+    new_hotel = Hotel(hotel_id, name, address)
+    hotels.append(new_hotel)
+    ensure_data_dir(hotel_id)
+    write_json(HOTELS_FILE, [hotel.to_dict() for hotel in hotels])
+    
+    log_activity(f"Property baru dibuat: {hotel_id} - {name}", user=user, status="CREATE")
+    return new_hotel
+
+def hotel_stats(hotel_id: str) -> Dict:
+    """Statistik satu partisi property"""
+    import archive
+    
+    with use_hotel(hotel_id):
+        rooms = load_rooms()
+        archived = archive.archive_summary()
+        # Agregasi streaming: booking tidak perlu ditampung di list
+        total = active = 0
+        revenue = 0.0
+        try:
+            for booking in iter_bookings(hotel_id=hotel_id):
+                total += 1
+                active += booking.status == 'active'
+                if booking.status != 'cancelled':
+                    revenue += booking._total_price
+        except Exception as e:
+            log_activity(f"Error loading bookings: {str(e)}", status="ERROR")
+            total = active = 0
+            revenue = 0.0
+    
+    return {
+        'hotel_id': hotel_id,
+        'total_rooms': len(rooms),
+        'available_rooms': len([r for r in rooms if r.is_available]),
+        'total_bookings': total + archived['count'],
+        'active_bookings': active,
+        'revenue': revenue + archived['revenue'],
+    }
+
+def rollup_stats() -> List[Dict]:
+    """Agregasi statistik semua property, tiap partisi dibaca paralel"""
+    hotels = load_hotels()
+    with ThreadPoolExecutor(max_workers=min(8, len(hotels))) as executor:
+        stats = list(executor.map(hotel_stats, [hotel.hotel_id for hotel in hotels]))
+    
+    for hotel, hotel_stat in zip(hotels, stats):
+        hotel_stat['name'] = hotel.name
+    return stats
+
 # ==================== USER MANAGEMENT ====================
 
 def load_users() -> List[User]:
@@ -33,9 +471,8 @@ def load_users() -> List[User]:
         return []
     
     try:
-        with open(USERS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return [User(**user_data) for user_data in data]
+        data = read_json(USERS_FILE)
+        return [User(**user_data) for user_data in data]
     except Exception as e:
         log_activity(f"Error loading users: {str(e)}", status="ERROR")
         return []
@@ -44,8 +481,7 @@ def save_users(users: List[User]):
     """Save users to JSON file"""
     ensure_data_dir()
     try:
-        with open(USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump([user.to_dict() for user in users], f, indent=4, ensure_ascii=False)
+        write_json(USERS_FILE, [user.to_dict() for user in users])
     except Exception as e:
         log_activity(f"Error saving users: {str(e)}", status="ERROR")
 
@@ -70,56 +506,81 @@ def get_user_by_id(user_id: str) -> Optional[User]:
 
 # ==================== ROOM MANAGEMENT ====================
 
-def load_rooms() -> List[Room]:
-    """Load rooms from JSON file and create appropriate Room objects"""
-    ensure_data_dir()
-    if not os.path.exists(ROOMS_FILE):
-        return []
+def _room_from_dict(room_data: Dict) -> Optional[Room]:
+    room_type = room_data['room_type']
+    room_id = room_data['room_id']
+    room_number = room_data['room_number']
+    hotel_id = room_data.get('hotel_id', get_current_hotel())
+    
+    # Polymorphism - create appropriate room type
+    if room_type == 'Standard':
+        room = StandardRoom(room_id, room_number, hotel_id)
+    elif room_type == 'Deluxe':
+        room = DeluxeRoom(room_id, room_number, hotel_id)
+    elif room_type == 'Suite':
+        room = SuiteRoom(room_id, room_number, hotel_id)
+    else:
+        return None
     
+    room.is_available = room_data['is_available']
+    return room
+
+def iter_rooms(room_id: Optional[str] = None, room_type: Optional[str] = None,
+               hotel_id: Optional[str] = None, cached: bool = False) -> Iterator[Room]:
+    """Stream kamar satu per satu; filter dicek sebelum object Room dibuat"""
+    path = rooms_file(hotel_id)
+    if not os.path.exists(path):
+        return
+    shared = None
+    if not cached and (room_id is not None or room_type is not None or _fresh_cache(path) is None):
+        # Index di shared memory (mode prefork); None = segment tidak tersedia
+        shared = sharedcache.select(path, key=room_id,
+                                    terms={'room_type': None if room_type is None else (room_type,)})
+    if shared is not None:
+        for room_data in shared:
+            room = _room_from_dict(room_data)
+            if room is not None:
+                yield room
+        return
+    for room_data in _iter_json_records(path, cached):
+        if room_id is not None and room_data['room_id'] != room_id:
+            continue
+        if room_type is not None and room_data['room_type'] != room_type:
+            continue
+        room = _room_from_dict(room_data)
+        if room is not None:
+            yield room
+
+def _collect(items: Iterator, label: str) -> list:
+    """list(items); data yang gagal dibaca dicatat ke log dan dianggap kosong"""
     try:
-        with open(ROOMS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            rooms = []
-            for room_data in data:
-                room_type = room_data['room_type']
-                room_id = room_data['room_id']
-                room_number = room_data['room_number']
-                
-                # Polymorphism - create appropriate room type
-                if room_type == 'Standard':
-                    room = StandardRoom(room_id, room_number)
-                elif room_type == 'Deluxe':
-                    room = DeluxeRoom(room_id, room_number)
-                elif room_type == 'Suite':
-                    room = SuiteRoom(room_id, room_number)
-                else:
-                    continue
-                
-                room.is_available = room_data['is_available']
-                rooms.append(room)
-            
-            return rooms
+        return list(items)
     except Exception as e:
-        log_activity(f"Error loading rooms: {str(e)}", status="ERROR")
+        log_activity(f"Error loading {label}: {str(e)}", status="ERROR")
         return []
 
+def load_rooms() -> List[Room]:
+    """Load rooms from JSON file and create appropriate Room objects"""
+    ensure_data_dir()
+    return _collect(iter_rooms(cached=True), 'rooms')
+
 def save_rooms(rooms: List[Room]):
     """Save rooms to JSON file"""
     ensure_data_dir()
     try:
-        with open(ROOMS_FILE, 'w', encoding='utf-8') as f:
-            json.dump([room.to_dict() for room in rooms], f, indent=4, ensure_ascii=False)
+        write_json(rooms_file(), [room.to_dict() for room in rooms])
     except Exception as e:
         log_activity(f"Error saving rooms: {str(e)}", status="ERROR")
 
 def get_room_by_id(room_id: str) -> Optional[Room]:
-    """Get room by ID"""
-    rooms = load_rooms()
-    for room in rooms:
-        if room.room_id == room_id:
-            return room
-    return None
+    """Get room by ID (berhenti di record pertama yang cocok)"""
+    try:
+        return next(iter_rooms(room_id=room_id), None)
+    except Exception as e:
+        log_activity(f"Error loading rooms: {str(e)}", status="ERROR")
+        return None
 
+@locked_partition
 def create_room(room_type: str, room_number: str, user: str) -> Optional[Room]:
     """Create new room - CRUD: Create"""
     rooms = load_rooms()
@@ -133,21 +594,25 @@ def create_room(room_type: str, room_number: str, user: str) -> Optional[Room]:
     room_id = f"R{len(rooms) + 1:03d}"
     
     # Create room based on type
+    hotel_id = get_current_hotel()
     if room_type == 'Standard':
-        new_room = StandardRoom(room_id, room_number)
+        new_room = StandardRoom(room_id, room_number, hotel_id)
     elif room_type == 'Deluxe':
-        new_room = DeluxeRoom(room_id, room_number)
+        new_room = DeluxeRoom(room_id, room_number, hotel_id)
     elif room_type == 'Suite':
-        new_room = SuiteRoom(room_id, room_number)
+        new_room = SuiteRoom(room_id, room_number, hotel_id)
     else:
         return None
     
     rooms.append(new_room)
     save_rooms(rooms)
+    events.publish('room.created', hotel_id, room_id=room_id, room_number=room_number,
+                   room_type=room_type, is_available=new_room.is_available)
     
     log_activity(f"Kamar baru dibuat: {room_type} - {room_number}", user=user, status="CREATE")
     return new_room
 
+@locked_partition
 def update_room_availability(room_id: str, is_available: bool, user: str):
     """Update room availability - CRUD: Update"""
     rooms = load_rooms()
@@ -155,11 +620,13 @@ def update_room_availability(room_id: str, is_available: bool, user: str):
         if room.room_id == room_id:
             room.is_available = is_available
             save_rooms(rooms)
+            events.publish('room.updated', get_current_hotel(), room_id=room_id, is_available=is_available)
             log_activity(f"Kamar {room.room_number} diupdate - Available: {is_available}", 
                         user=user, status="UPDATE")
             return True
     return False
 
+@locked_partition
 def delete_room(room_id: str, user: str) -> bool:
     """Delete room - CRUD: Delete"""
     rooms = load_rooms()
@@ -168,35 +635,65 @@ def delete_room(room_id: str, user: str) -> bool:
     
     if len(rooms) < initial_count:
         save_rooms(rooms)
+        events.publish('room.deleted', get_current_hotel(), room_id=room_id)
         log_activity(f"Kamar {room_id} dihapus", user=user, status="DELETE")
         return True
     return False
 
 # ==================== BOOKING MANAGEMENT ====================
 
+def iter_bookings(user_id: Optional[str] = None, booking_id: Optional[str] = None,
+                  status=None, start: Optional[str] = None, end: Optional[str] = None,
+                  hotel_id: Optional[str] = None, cached: bool = False) -> Iterator[Booking]:
+    """Stream booking (hot) satu per satu, filter sama dengan archive.iter_archived_bookings
+    
+    Filter dicek pada record mentah sebelum object Booking dibuat; status boleh
+    string atau tuple. Untuk point lookup cukup next(iter_bookings(...)) -
+    pembacaan berhenti di record yang cocok. cached=True: lihat _iter_json_records.
+    """
+    path = bookings_file(hotel_id)
+    if not os.path.exists(path):
+        return
+    statuses = (status,) if isinstance(status, str) else status
+    filtered = any(value is not None for value in (user_id, booking_id, status, start, end))
+    shared = None
+    if not cached and (filtered or _fresh_cache(path) is None):
+        # Index di shared memory (mode prefork); None = segment tidak tersedia
+        shared = sharedcache.select(path, key=booking_id,
+                                    terms={'user_id': None if user_id is None else (user_id,),
+                                           'status': statuses},
+                                    ranges={'check_out': (start, None), 'check_in': (None, end)})
+    if shared is not None:
+        for record in shared:
+            yield Booking(**record)
+        return
+    for record in _iter_json_records(path, cached):
+        if booking_id is not None and record['booking_id'] != booking_id:
+            continue
+        if user_id is not None and record['user_id'] != user_id:
+            continue
+        if statuses is not None and record['status'] not in statuses:
+            continue
+        if start is not None and record['check_out'] < start:
+            continue
+        if end is not None and record['check_in'] > end:
+            continue
+        yield Booking(**record)
+
 def load_bookings() -> List[Booking]:
     """Load bookings from JSON file"""
     ensure_data_dir()
-    if not os.path.exists(BOOKINGS_FILE):
-        return []
-    
-    try:
-        with open(BOOKINGS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return [Booking(**booking_data) for booking_data in data]
-    except Exception as e:
-        log_activity(f"Error loading bookings: {str(e)}", status="ERROR")
-        return []
+    return _collect(iter_bookings(cached=True), 'bookings')
 
 def save_bookings(bookings: List[Booking]):
     """Save bookings to JSON file"""
     ensure_data_dir()
     try:
-        with open(BOOKINGS_FILE, 'w', encoding='utf-8') as f:
-            json.dump([booking.to_dict() for booking in bookings], f, indent=4, ensure_ascii=False)
+        write_json(bookings_file(), [booking.to_dict() for booking in bookings])
     except Exception as e:
         log_activity(f"Error saving bookings: {str(e)}", status="ERROR")
 
+@locked_partition
 def create_booking(user_id: str, room_id: str, check_in: str, check_out: str, 
                   nights: int, guest_name: str, guest_phone: str, username: str) -> Optional[Booking]:
     """Create new booking - CRUD: Create"""
@@ -209,7 +706,7 @@ def create_booking(user_id: str, room_id: str, check_in: str, check_out: str,
     
     # Generate booking ID
     bookings = load_bookings()
-    booking_id = f"B{len(bookings) + 1:04d}"
+    booking_id = _next_booking_id(bookings)
     
     # Create booking
     new_booking = Booking(
@@ -221,7 +718,8 @@ def create_booking(user_id: str, room_id: str, check_in: str, check_out: str,
         nights=nights,
         total_price=total_price,
         guest_name=guest_name,
-        guest_phone=guest_phone
+        guest_phone=guest_phone,
+        hotel_id=get_current_hotel()
     )
     
     # Update room availability
@@ -230,38 +728,58 @@ def create_booking(user_id: str, room_id: str, check_in: str, check_out: str,
     # Save booking
     bookings.append(new_booking)
     save_bookings(bookings)
+    events.publish('booking.created', new_booking.hotel_id, booking_id=booking_id, user_id=user_id,
+                   room_id=room_id, status=new_booking.status, check_in=check_in, check_out=check_out,
+                   guest_name=guest_name, guest_phone=guest_phone, created_at=new_booking._created_at)
     
     log_activity(f"Booking baru dibuat: {booking_id} untuk kamar {room.room_number}", 
                 user=username, status="CREATE")
     
     return new_booking
 
+def _next_booking_id(bookings: List[Booking]) -> str:
+    """Generate booking ID berikutnya dari ID terbesar (hot + arsip)"""
+    import archive
+    
+    numbers = [int(b.booking_id[1:]) for b in bookings if b.booking_id[1:].isdigit()]
+    archived_max = archive.max_archived_booking_id()
+    if archived_max and archived_max[1:].isdigit():
+        numbers.append(int(archived_max[1:]))
+    return f"B{max(numbers, default=0) + 1:04d}"
+
 def get_booking_by_id(booking_id: str) -> Optional[Booking]:
-    """Get booking by ID"""
-    bookings = load_bookings()
-    for booking in bookings:
-        if booking.booking_id == booking_id:
-            return booking
-    return None
+    """Get booking by ID (booking aktif dulu, lalu arsip)"""
+    import archive
+    
+    try:
+        booking = next(iter_bookings(booking_id=booking_id), None)
+    except Exception as e:
+        log_activity(f"Error loading bookings: {str(e)}", status="ERROR")
+        booking = None
+    return booking or archive.find_archived_booking(booking_id)
 
+@locked_partition
 def update_booking_status(booking_id: str, status: str, user: str) -> bool:
     """Update booking status - CRUD: Update"""
+    if status not in BOOKING_STATUSES:
+        return False
     bookings = load_bookings()
     for booking in bookings:
         if booking.booking_id == booking_id:
             old_status = booking.status
             booking.status = status
             
-            # If cancelled or completed, make room available again
-            if status in ['cancelled', 'completed']:
-                update_room_availability(booking.room_id, True, user)
-            
             save_bookings(bookings)
+            events.publish('booking.updated', get_current_hotel(), booking_id=booking_id,
+                           user_id=booking.user_id, status=status)
+            # Kamar bisa punya beberapa stay aktif (booking per tipe kamar): hitung ulang
+            _sync_room_flags({booking.room_id}, bookings, user)
             log_activity(f"Booking {booking_id} status diupdate: {old_status} -> {status}", 
                         user=user, status="UPDATE")
             return True
     return False
 
+@locked_partition
 def update_booking_dates(booking_id: str, check_in: str, check_out: str, notes: str, user: str) -> bool:
     """Update booking check-in and check-out dates - User self-edit"""
     bookings = load_bookings()
@@ -286,31 +804,537 @@ def update_booking_dates(booking_id: str, check_in: str, check_out: str, notes:
             if room:
                 booking._total_price = room.calculate_price(booking._nights)
             
+            # Booking per tipe kamar: susun ulang penempatan, tolak jika tidak muat
+            moved, closed = [], set()
+            if booking.room_type:
+                closed = _closed_rooms(_rooms_of_type(booking.room_type), bookings)
+                moved = _assign_room_type(bookings, booking.room_type, target=booking, closed=closed)
+                if moved is None:
+                    return False
+            
             save_bookings(bookings)
+            _publish_reassigned(moved, exclude=booking)
+            if booking.room_type:
+                _sync_room_availability(booking.room_type, bookings, user, closed)
+            # room_id ikut dikirim: edit tanggal bisa memindahkan booking ke kamar lain
+            events.publish('booking.updated', get_current_hotel(), booking_id=booking_id,
+                           user_id=booking.user_id, check_in=check_in, check_out=check_out,
+                           nights=booking._nights, total_price=booking._total_price,
+                           **_room_fields(booking.room_id))
             log_activity(f"Booking {booking_id} tanggal diupdate: {old_check_in} - {old_check_out} -> {check_in} - {check_out}", 
                         user=user, status="UPDATE")
             return True
     return False
 
+@locked_partition
 def delete_booking(booking_id: str, user: str) -> bool:
     """Delete booking - CRUD: Delete"""
     bookings = load_bookings()
-    booking = get_booking_by_id(booking_id)
-    
-    if booking:
-        # Make room available again
-        update_room_availability(booking.room_id, True, user)
-    
-    initial_count = len(bookings)
-    bookings = [b for b in bookings if b.booking_id != booking_id]
+    deleted = [b for b in bookings if b.booking_id == booking_id]
     
-    if len(bookings) < initial_count:
+    if deleted:
+        bookings = [b for b in bookings if b.booking_id != booking_id]
         save_bookings(bookings)
+        events.publish('booking.deleted', get_current_hotel(), booking_id=booking_id,
+                       user_id=deleted[0].user_id)
+        # Kamar hanya tersedia lagi jika tidak ada booking aktif lain di kamar itu
+        _sync_room_flags({b.room_id for b in deleted}, bookings, user)
         log_activity(f"Booking {booking_id} dihapus", user=user, status="DELETE")
         return True
     return False
 
 def get_user_bookings(user_id: str) -> List[Booking]:
-    """Get all bookings for a specific user"""
+    """Get all bookings for a specific user (termasuk yang sudah diarsipkan)"""
+    import archive
+    
+    hot = _collect(iter_bookings(user_id=user_id), 'bookings')
+    return list(archive.merge_hot(archive.iter_archived_bookings(user_id=user_id), hot))
+
+# ==================== ROOM TYPE INVENTORY ====================
+
+def _rooms_of_type(room_type: str) -> List[Room]:
+    return _collect(iter_rooms(room_type=room_type), 'rooms')
+
+def _closed_rooms(rooms: Iterable[Room], bookings: Iterable[Booking]) -> set:
+    """Kamar yang ditutup admin: tidak tersedia padahal tidak punya booking aktif
+    
+    Hitung sebelum bookings diubah. Kamar ini tidak dipakai engine assignment
+    dan tidak dibuka lagi oleh sinkronisasi is_available.
+    """
+    occupied = {b.room_id for b in bookings if b.status == 'active'}
+    return {room.room_id for room in rooms if not room.is_available and room.room_id not in occupied}
+
+def _type_stays(bookings: List[Booking], room_type: str, room_ids: set) -> List[Stay]:
+    """Booking aktif satu tipe kamar sebagai interval; key = id(booking)"""
+    today = datetime.now().date().toordinal()
+    stays = []
+    for booking in bookings:
+        if booking.status != 'active':
+            continue
+        if booking.room_type != room_type and booking.room_id not in room_ids:
+            continue
+        start = date_ordinal(booking._check_in)
+        end = date_ordinal(booking._check_out)
+        # Terkunci: booking lama yang memilih kamar spesifik, atau tamu sudah check-in
+        pinned = bool(booking.room_id) and (booking.room_type is None or start <= today)
+        stays.append(Stay(id(booking), start, end, booking.room_id if pinned else None))
+    return stays
+
+def _assign_room_type(bookings: List[Booking], room_type: str, target: Optional[Booking] = None,
+                      required: Iterable[Booking] = (), closed: Iterable[str] = ()) -> Optional[List[Booking]]:
+    """Jalankan engine assignment untuk satu tipe kamar dan terapkan hasilnya ke bookings
+    
+    Return daftar booking yang pindah kamar, atau None (bookings tidak diubah)
+    jika target, booking di required, atau booking per tipe lain jadi tidak
+    muat. Booking di required yang sudah punya kamar ikut dikunci di kamar itu;
+    taruh di akhir bookings supaya blok yang sudah ada dipasang lebih dulu.
+    Kamar di closed (lihat _closed_rooms) tidak diberi booking.
+    """
+    room_ids = {room.room_id for room in _rooms_of_type(room_type)} - set(closed)
+    stays = _type_stays(bookings, room_type, room_ids)
+    assignment, unplaced = assign_rooms(stays, sorted(room_ids))
+    
+    floating = {stay.key for stay in stays if stay.room_id is None}
+    if target is not None and id(target) not in assignment:
+        return None
+    if any(id(booking) not in assignment for booking in required):
+        return None
+    if any(key in floating for key in unplaced):
+        return None
+    
+    moved = []
+    for booking in bookings:
+        room_id = assignment.get(id(booking))
+        if room_id and room_id != booking.room_id:
+            booking.room_id = room_id
+            moved.append(booking)
+    return moved
+
+def _room_fields(room_id: str, rooms: Optional[Dict[str, Room]] = None) -> Dict:
+    """Field kamar untuk payload event booking (room_id + nomor & tipe untuk tampilan live)"""
+    room = (rooms or {room.room_id: room for room in load_rooms()}).get(room_id)
+    if room is None:
+        return {'room_id': room_id}
+    return {'room_id': room_id, 'room_number': room.room_number, 'room_type': room.get_room_type()}
+
+def _publish_reassigned(moved: List[Booking], exclude: Optional[Booking] = None):
+    rooms = {room.room_id: room for room in load_rooms()} if moved else {}
+    for booking in moved:
+        if booking is not exclude:
+            events.publish('booking.updated', get_current_hotel(), booking_id=booking.booking_id,
+                           user_id=booking.user_id, **_room_fields(booking.room_id, rooms))
+
+def _sync_room_availability(room_type: str, bookings: List[Booking], user: str, closed: Iterable[str] = ()):
+    """Kamar tidak tersedia selama masih punya booking aktif (satu kali tulis); kamar closed tetap ditutup"""
+    room_ids = {room.room_id for room in load_rooms() if room.get_room_type() == room_type}
+    _sync_room_flags(room_ids - set(closed), bookings, user)
+
+def _sync_room_flags(room_ids: set, bookings: List[Booking], user: str):
+    """Samakan is_available kamar di room_ids dengan booking aktif, simpan + publish yang berubah"""
+    rooms = load_rooms()
+    changed = _refresh_room_flags(rooms, bookings, room_ids)
+    
+    if changed:
+        save_rooms(rooms)
+        for room in changed:
+            events.publish('room.updated', get_current_hotel(), room_id=room.room_id,
+                           is_available=room.is_available)
+        log_activity(f"Status kamar {', '.join(r.room_number for r in changed)} disesuaikan dengan booking",
+                     user=user, status="UPDATE")
+
+def room_type_inventory(room_type: str, check_in: str, check_out: str) -> Dict:
+    """Inventory per malam untuk satu tipe kamar pada rentang [check_in, check_out)"""
+    type_rooms = _rooms_of_type(room_type)
+    closed = _closed_rooms(type_rooms, iter_bookings(status='active'))
+    rooms = [room for room in type_rooms if room.room_id not in closed]
+    room_ids = {room.room_id for room in rooms}
+    start = date_ordinal(check_in)
+    end = date_ordinal(check_out)
+    active = _collect(iter_bookings(status='active', start=check_in, end=check_out), 'bookings')
+    booked = nightly_occupancy(_type_stays(active, room_type, room_ids), start, end)
+    
+    nights = []
+    for offset, count in enumerate(booked):
+        nights.append({
+            'date': datetime.fromordinal(start + offset).strftime('%Y-%m-%d'),
+            'booked': count,
+            'available': max(len(rooms) - count, 0),
+        })
+    return {
+        'room_type': room_type,
+        'total': len(rooms),
+        'nights': nights,
+        'available': min((night['available'] for night in nights), default=len(rooms)),
+    }
+
+@locked_partition
+def create_booking_by_type(user_id: str, room_type: str, check_in: str, check_out: str,
+                           nights: int, guest_name: str, guest_phone: str, username: str) -> Optional[Booking]:
+    """Create booking untuk tipe kamar; kamar fisik dipilih engine assignment"""
+    rooms = _rooms_of_type(room_type)
+    if not rooms:
+        return None
+    
+    bookings = load_bookings()
+    closed = _closed_rooms(rooms, bookings)
+    new_booking = Booking(
+        booking_id=_next_booking_id(bookings),
+        user_id=user_id,
+        room_id='',
+        check_in=check_in,
+        check_out=check_out,
+        nights=nights,
+        total_price=rooms[0].calculate_price(nights),
+        guest_name=guest_name,
+        guest_phone=guest_phone,
+        hotel_id=get_current_hotel(),
+        room_type=room_type
+    )
+    bookings.append(new_booking)
+    
+    moved = _assign_room_type(bookings, room_type, target=new_booking, closed=closed)
+    if moved is None:
+        return None
+    
+    save_bookings(bookings)
+    events.publish('booking.created', new_booking.hotel_id, booking_id=new_booking.booking_id,
+                   user_id=user_id, room_id=new_booking.room_id, status=new_booking.status,
+                   check_in=check_in, check_out=check_out, guest_name=guest_name, guest_phone=guest_phone,
+                   created_at=new_booking._created_at)
+    _publish_reassigned(moved, exclude=new_booking)
+    _sync_room_availability(room_type, bookings, username, closed)
+    
+    room_number = next(room.room_number for room in rooms if room.room_id == new_booking.room_id)
+    log_activity(f"Booking baru dibuat: {new_booking.booking_id} untuk {room_type} (kamar {room_number})",
+                user=username, status="CREATE")
+    return new_booking
+
+# ==================== BATCH BOOKING ====================
+
+@locked_partition
+def create_bookings(requests: List[Dict]) -> List[Optional[Booking]]:
+    """Buat beberapa booking dalam satu read-modify-write (dipakai antrian booking)
+    
+    Setiap request berisi user_id, room_id atau room_type, check_in, check_out,
+    nights, guest_name, guest_phone, username. Request divalidasi berurutan
+    dengan aturan yang sama seperti create_booking / create_booking_by_type,
+    terhadap state yang sudah memuat booking sebelumnya di batch ini. Booking
+    dan kamar ditulis sekali untuk seluruh batch. Return Booking atau None
+    (kamar tidak tersedia) per request. Event dan log aktivitas dikirim setelah
+    commit; jika gagal, hasil commit tetap dikembalikan.
+    """
+    hotel_id = get_current_hotel()
+    rooms = load_rooms()
+    rooms_by_id = {room.room_id: room for room in rooms}
+    bookings = load_bookings()
+    next_number = int(_next_booking_id(bookings)[1:])
+    results = []
+    moved = {}
+    changed_rooms = {}
+    
+    for req in requests:
+        room_type = req.get('room_type')
+        if room_type:
+            type_rooms = [room for room in rooms if room.get_room_type() == room_type]
+            if not type_rooms:
+                results.append(None)
+                continue
+            closed = _closed_rooms(type_rooms, bookings)
+            room_id, total_price = '', type_rooms[0].calculate_price(req['nights'])
+        else:
+            room = rooms_by_id.get(req.get('room_id'))
+            if not room or not room.is_available:
+                results.append(None)
+                continue
+            room_id, total_price = room.room_id, room.calculate_price(req['nights'])
+        
+        new_booking = Booking(
+            booking_id=f"B{next_number:04d}",
+            user_id=req['user_id'],
+            room_id=room_id,
+            check_in=req['check_in'],
+            check_out=req['check_out'],
+            nights=req['nights'],
+            total_price=total_price,
+            guest_name=req['guest_name'],
+            guest_phone=req['guest_phone'],
+            hotel_id=hotel_id,
+            room_type=room_type or None
+        )
+        bookings.append(new_booking)
+        
+        if room_type:
+            reassigned = _assign_room_type(bookings, room_type, target=new_booking, closed=closed)
+            if reassigned is None:
+                bookings.pop()
+                results.append(None)
+                continue
+            moved.update((id(booking), booking) for booking in reassigned)
+            # Sama dengan _sync_room_availability, tapi pada state batch di memory
+            occupied = {b.room_id for b in bookings if b.status == 'active'}
+            for room in type_rooms:
+                if room.room_id not in closed and room.is_available != (room.room_id not in occupied):
+                    room.is_available = room.room_id not in occupied
+                    changed_rooms[room.room_id] = room
+        else:
+            room.is_available = False
+            changed_rooms[room.room_id] = room
+        
+        next_number += 1
+        results.append(new_booking)
+    
+    created = [booking for booking in results if booking is not None]
+    if not created:
+        return results
+    files = {bookings_file(): [booking.to_dict() for booking in bookings]}
+    if changed_rooms:
+        files[rooms_file()] = [room.to_dict() for room in rooms]
+    write_json_files(files)
+    
+    try:
+        _announce_created_bookings(hotel_id, requests, results, list(moved.values()), changed_rooms, rooms_by_id)
+    except Exception:
+        # Booking sudah tersimpan: event/log yang gagal tidak boleh membuat commit dilaporkan gagal
+        pass
+    return results
+
+def _announce_created_bookings(hotel_id: str, requests: List[Dict], results: List[Optional[Booking]],
+                               moved: List[Booking], changed_rooms: Dict[str, Room], rooms_by_id: Dict[str, Room]):
+    """Event + log aktivitas untuk batch create_bookings yang sudah di-commit"""
+    created = [booking for booking in results if booking is not None]
+    for req, booking in zip(requests, results):
+        if booking is not None:
+            events.publish('booking.created', hotel_id, booking_id=booking.booking_id, user_id=req['user_id'],
+                           room_id=booking.room_id, status=booking.status, check_in=req['check_in'],
+                           check_out=req['check_out'], guest_name=req['guest_name'],
+                           guest_phone=req['guest_phone'], created_at=booking._created_at)
+    created_ids = {id(booking) for booking in created}
+    _publish_reassigned([booking for booking in moved if id(booking) not in created_ids])
+    for room in changed_rooms.values():
+        events.publish('room.updated', hotel_id, room_id=room.room_id, is_available=room.is_available)
+    
+    for req, booking in zip(requests, results):
+        if booking is None:
+            continue
+        room_number = rooms_by_id[booking.room_id].room_number
+        target = f"{booking.room_type} (kamar {room_number})" if booking.room_type else f"kamar {room_number}"
+        log_activity(f"Booking baru dibuat: {booking.booking_id} untuk {target}",
+                     user=req['username'], status="CREATE")
+    if len(requests) > 1:
+        log_activity(f"Batch booking: {len(created)} dari {len(requests)} request dibuat dalam satu commit",
+                     status="INFO")
+
+# ==================== GROUP BOOKING ====================
+
+def load_groups() -> List[BookingGroup]:
+    """Load group bookings from JSON file"""
+    ensure_data_dir()
+    path = groups_file()
+    if not os.path.exists(path):
+        return []
+    
+    try:
+        data = read_json(path)
+        return [BookingGroup(**group_data) for group_data in data]
+    except Exception as e:
+        log_activity(f"Error loading groups: {str(e)}", status="ERROR")
+        return []
+
+def get_group_by_id(group_id: str) -> Optional[BookingGroup]:
+    """Get group by ID"""
+    for group in load_groups():
+        if group.group_id == group_id:
+            return group
+    return None
+
+def get_user_groups(user_id: str) -> List[BookingGroup]:
+    """Get all group bookings for a specific user"""
+    return [g for g in load_groups() if g.user_id == user_id]
+
+def _next_group_id(groups: List[BookingGroup]) -> str:
+    numbers = [int(g.group_id[1:]) for g in groups if g.group_id[1:].isdigit()]
+    return f"G{max(numbers, default=0) + 1:04d}"
+
+def _refresh_room_flags(rooms: List[Room], bookings: List[Booking], room_ids: set) -> List[Room]:
+    """Set is_available kamar di room_ids sesuai booking aktif, return kamar yang berubah"""
+    occupied = {b.room_id for b in bookings if b.status == 'active'}
+    changed = []
+    for room in rooms:
+        if room.room_id in room_ids and room.is_available != (room.room_id not in occupied):
+            room.is_available = room.room_id not in occupied
+            changed.append(room)
+    return changed
+
+def _assign_group(bookings: List[Booking], members: List[Booking], room_types: set,
+                  rooms_by_id: Dict[str, Room], closed: set) -> Optional[List[Booking]]:
+    """Assignment per tipe untuk anggota group; None jika ada satu anggota yang tidak muat"""
+    moved = []
+    for room_type in sorted(room_types):
+        required = [b for b in members
+                    if (b.room_type or rooms_by_id[b.room_id].get_room_type()) == room_type]
+        result = _assign_room_type(bookings, room_type, required=required, closed=closed)
+        if result is None:
+            return None
+        moved += result
+    return moved
+
+@locked_partition
+def create_group_booking(user_id: str, name: str, room_requests: Dict[str, int], room_ids: List[str],
+                         check_in: str, check_out: str, nights: int, guest_name: str, guest_phone: str,
+                         username: str) -> Optional[BookingGroup]:
+    """Reserve banyak kamar (per tipe dan/atau kamar spesifik) dalam satu transaksi
+    
+    Semua kamar divalidasi dalam satu pass; rooms, bookings dan groups ditulis
+    sekali. Jika ada satu kamar saja yang tidak tersedia, tidak ada yang berubah.
+    """
+    rooms = load_rooms()
+    rooms_by_id = {room.room_id: room for room in rooms}
+    bookings = load_bookings()
+    groups = load_groups()
+    hotel_id = get_current_hotel()
+    group_id = _next_group_id(groups)
+    
+    # Validasi request
+    requested_types = {t: c for t, c in room_requests.items() if c}
+    if not requested_types and not room_ids:
+        return None
+    if len(set(room_ids)) != len(room_ids):
+        return None
+    if any(t not in ROOM_TYPES or c < 0 for t, c in requested_types.items()):
+        return None
+    for room_id in room_ids:
+        room = rooms_by_id.get(room_id)
+        if not room or not room.is_available:
+            return None
+    
+    closed = _closed_rooms(rooms, bookings)
+    next_number = int(_next_booking_id(bookings)[1:])
+    new_bookings = []
+    
+    def add_booking(room_id: str, room_type: Optional[str], price_room: Room):
+        nonlocal next_number
+        new_bookings.append(Booking(
+            booking_id=f"B{next_number:04d}",
+            user_id=user_id,
+            room_id=room_id,
+            check_in=check_in,
+            check_out=check_out,
+            nights=nights,
+            total_price=price_room.calculate_price(nights),
+            guest_name=guest_name,
+            guest_phone=guest_phone,
+            hotel_id=hotel_id,
+            room_type=room_type,
+            group_id=group_id
+        ))
+        next_number += 1
+    
+    for room_id in room_ids:
+        add_booking(room_id, None, rooms_by_id[room_id])
+    for room_type, count in requested_types.items():
+        sample = next((room for room in rooms if room.get_room_type() == room_type), None)
+        if sample is None:
+            return None
+        for _ in range(count):
+            add_booking('', room_type, sample)
+    bookings.extend(new_bookings)
+    
+    # Tempatkan semua booking per tipe, kamar spesifik ikut dikunci dan dicek
+    # bentrok tanggalnya; gagal satu = batal semua
+    assigned_types = set(requested_types) | {rooms_by_id[room_id].get_room_type() for room_id in room_ids}
+    moved = _assign_group(bookings, new_bookings, assigned_types, rooms_by_id, closed)
+    if moved is None:
+        return None
+    
+    affected = {room.room_id for room in rooms if room.get_room_type() in assigned_types} - closed
+    changed_rooms = _refresh_room_flags(rooms, bookings, affected)
+    
+    group = BookingGroup(group_id, user_id, name, check_in, check_out,
+                         [b.booking_id for b in new_bookings], hotel_id=hotel_id)
+    groups.append(group)
+    
+    try:
+        write_json_files({
+            rooms_file(): [room.to_dict() for room in rooms],
+            bookings_file(): [booking.to_dict() for booking in bookings],
+            groups_file(): [g.to_dict() for g in groups],
+        })
+    except Exception as e:
+        log_activity(f"Error saving group booking {group_id}: {str(e)}", user=username, status="ERROR")
+        return None
+    
+    for booking in new_bookings:
+        events.publish('booking.created', hotel_id, booking_id=booking.booking_id, user_id=user_id,
+                       room_id=booking.room_id, status=booking.status, check_in=check_in,
+                       check_out=check_out, group_id=group_id, guest_name=guest_name,
+                       guest_phone=guest_phone, created_at=booking._created_at)
+    _publish_reassigned([b for b in moved if b.group_id != group_id])
+    for room in changed_rooms:
+        events.publish('room.updated', hotel_id, room_id=room.room_id, is_available=room.is_available)
+    
+    log_activity(f"Group booking baru dibuat: {group_id} ({name}) - {len(new_bookings)} kamar",
+                user=username, status="CREATE")
+    return group
+
+@locked_partition
+def update_group_status(group_id: str, status: str, user: str) -> bool:
+    """Update status semua booking dalam satu group sekaligus"""
+    if status not in BOOKING_STATUSES:
+        return False
+    groups = load_groups()
+    group = next((g for g in groups if g.group_id == group_id), None)
+    if not group:
+        return False
+    
+    rooms = load_rooms()
+    rooms_by_id = {room.room_id: room for room in rooms}
     bookings = load_bookings()
-    return [b for b in bookings if b.user_id == user_id]
+    members = [b for b in bookings if b.group_id == group_id]
+    closed = _closed_rooms(rooms, bookings)
+    old_status = group.status
+    group.status = status
+    reactivated = [b for b in members if b.status != 'active' and status == 'active']
+    for booking in members:
+        booking.status = status
+    
+    # Anggota yang diaktifkan lagi harus muat di tanggalnya (kamarnya bisa sudah dipakai booking lain)
+    moved = []
+    room_types = set()
+    if reactivated:
+        if any(not b.room_type and b.room_id not in rooms_by_id for b in reactivated):
+            return False
+        # Diurutkan ke akhir supaya blok booking lain dipasang lebih dulu
+        keys = {id(b) for b in reactivated}
+        ordered = [b for b in bookings if id(b) not in keys] + reactivated
+        room_types = {b.room_type or rooms_by_id[b.room_id].get_room_type() for b in reactivated}
+        moved = _assign_group(ordered, reactivated, room_types, rooms_by_id, closed)
+        if moved is None:
+            log_activity(f"Group {group_id} tidak bisa diaktifkan lagi: kamar sudah terpakai",
+                         user=user, status="ERROR")
+            return False
+    
+    affected = {b.room_id for b in members} | {room.room_id for room in rooms if room.get_room_type() in room_types}
+    affected -= closed
+    changed_rooms = _refresh_room_flags(rooms, bookings, affected)
+    
+    try:
+        write_json_files({
+            rooms_file(): [room.to_dict() for room in rooms],
+            bookings_file(): [booking.to_dict() for booking in bookings],
+            groups_file(): [g.to_dict() for g in groups],
+        })
+    except Exception as e:
+        log_activity(f"Error saving group {group_id}: {str(e)}", user=user, status="ERROR")
+        return False
+    
+    hotel_id = get_current_hotel()
+    for booking in members:
+        events.publish('booking.updated', hotel_id, booking_id=booking.booking_id,
+                       user_id=booking.user_id, status=status, room_id=booking.room_id)
+    _publish_reassigned([b for b in moved if b.group_id != group_id])
+    for room in changed_rooms:
+        events.publish('room.updated', hotel_id, room_id=room.room_id, is_available=room.is_available)
+    
+    log_activity(f"Group {group_id} status diupdate: {old_status} -> {status} ({len(members)} booking)",
+                user=user, status="UPDATE")
+    return True